@@ -0,0 +1,141 @@
+import { Router } from 'express';
+import { createSupabaseClient } from '../supabase';
+import { Request, Response } from 'express';
+
+const router = Router();
+
+const MAX_PAGE_SIZE = 5000;
+
+// Keyset position in each stream: products are ordered by
+// (updated_at, product_code) and store prices by (updated_at, product_code,
+// unit), so rows sharing a timestamp are never skipped at a page boundary
+type Position = string[];
+interface SyncCursor {
+  products?: Position;
+  storePrices?: Position;
+}
+
+const encodeCursor = (cursor: SyncCursor) => Buffer.from(JSON.stringify(cursor)).toString('base64url');
+
+function decodeCursor(since: unknown): SyncCursor {
+  if (typeof since !== 'string' || !since) return {};
+  try {
+    const cursor = JSON.parse(Buffer.from(since, 'base64url').toString('utf8'));
+    if (cursor && typeof cursor === 'object' && !Array.isArray(cursor)) return cursor;
+  } catch {
+    // Fall through to the legacy form
+  }
+  // A bare updated_at timestamp from edges that synced before keyset
+  // cursors: resume at the start of that timestamp so boundary rows are
+  // re-sent rather than skipped (applying them again is harmless)
+  return { products: [since, ''], storePrices: [since, '', ''] };
+}
+
+// PostgREST filter for rows strictly after a position, e.g. for (t, c):
+// updated_at > t OR (updated_at = t AND product_code > c)
+function afterFilter(columns: string[], position: Position): string {
+  const quote = (value: string) => `"${String(value).replace(/["\\]/g, '\\$&')}"`;
+  return columns.map((column, i) => {
+    const terms = columns.slice(0, i).map((prior, j) => `${prior}.eq.${quote(position[j])}`);
+    terms.push(`${column}.gt.${quote(position[i])}`);
+    return terms.length > 1 ? `and(${terms.join(',')})` : terms[0];
+  }).join(',');
+}
+
+function keysetPage(query: any, columns: string[], position?: Position) {
+  for (const column of columns) query = query.order(column, { ascending: true });
+  if (Array.isArray(position) && position.length === columns.length) {
+    query = query.or(afterFilter(columns, position));
+  }
+  return query;
+}
+
+const PRODUCT_KEY = ['updated_at', 'product_code'];
+const PRICE_KEY = ['updated_at', 'product_code', 'unit'];
+
+// GET /api/catalog - Product and price changes since a cursor (edge delta sync)
+router.get('/catalog', async (req: Request, res: Response) => {
+  try {
+    const supabase = createSupabaseClient();
+    const { storeId } = req.query;
+    const previous = decodeCursor(req.query.since);
+    const limit = Math.min(Number(req.query.limit) || 1000, MAX_PAGE_SIZE);
+
+    const productsQuery = keysetPage(
+      supabase
+        .from('scout_dash.products')
+        .select('product_code, product_name, brand, category, unit, unit_price, local_name, generic_name, variants, unit_prices, priority, is_active, updated_at')
+        .limit(limit),
+      PRODUCT_KEY, previous.products
+    );
+
+    const { data: products, error: productsError } = await productsQuery;
+    if (productsError) {
+      console.error('❌ Catalog query error:', productsError);
+      return res.status(500).json({ error: 'Failed to fetch catalog' });
+    }
+
+    let prices: any[] = [];
+    if (storeId) {
+      const pricesQuery = keysetPage(
+        supabase
+          .from('scout_dash.store_prices')
+          .select('product_code, unit, price, updated_at')
+          .eq('store_code', storeId)
+          .limit(limit),
+        PRICE_KEY, previous.storePrices
+      );
+
+      const { data, error } = await pricesQuery;
+      if (error) {
+        console.error('❌ Store price query error:', error);
+        return res.status(500).json({ error: 'Failed to fetch store prices' });
+      }
+      prices = data || [];
+    }
+
+    // Each stream resumes from the last row it returned; a stream with an
+    // empty page keeps its previous position
+    const productRows = products || [];
+    const lastPosition = (rows: any[], columns: string[], fallback?: Position) =>
+      rows.length ? columns.map(column => String(rows[rows.length - 1][column])) : fallback;
+    const next: SyncCursor = {
+      products: lastPosition(productRows, PRODUCT_KEY, previous.products),
+      storePrices: lastPosition(prices, PRICE_KEY, previous.storePrices),
+    };
+    const cursor = next.products || next.storePrices ? encodeCursor(next) : null;
+    const hasMore = productRows.length === limit || prices.length === limit;
+
+    res.json({
+      products: productRows.map(row => ({
+        sku: row.product_code,
+        name: row.product_name,
+        brand: row.brand,
+        category: row.category,
+        unit: row.unit,
+        unitPrice: row.unit_price === null ? null : Number(row.unit_price),
+        localName: row.local_name,
+        genericName: row.generic_name,
+        variants: row.variants || [],
+        prices: row.unit_prices || {},
+        priority: row.priority,
+        active: row.is_active,
+        updatedAt: row.updated_at,
+      })),
+      storePrices: prices.map(row => ({
+        sku: row.product_code,
+        unit: row.unit,
+        price: row.price === null ? null : Number(row.price),
+        updatedAt: row.updated_at,
+      })),
+      cursor,
+      hasMore,
+    });
+
+  } catch (error) {
+    console.error('❌ Catalog sync error:', error);
+    res.status(500).json({ error: 'Internal server error' });
+  }
+});
+
+export default router;
@@ -1,9 +1,11 @@
 import { Router } from 'express';
 import transactionsRouter from './transactions';
+import catalogRouter from './catalog';
 
 const router = Router();
 
 // Mount all route modules
 router.use(transactionsRouter);
+router.use(catalogRouter);
 
 export default router;
\ No newline at end of file
@@ -21,9 +21,9 @@ const TransactionItemSchema = z.object({
   isBulk: z.boolean(),
   detectionMethod: z.enum(['stt', 'ocr', 'cv', 'manual', 'hybrid']),
   confidence: z.number().min(0).max(1),
-  brandConfidence: z.number().min(0).max(1).optional(),
-  suggestedBrands: z.array(z.string()).optional(),
-  notes: z.string().optional(),
+  brandConfidence: z.number().min(0).max(1).nullable().optional(),
+  suggestedBrands: z.array(z.string()).nullable().optional(),
+  notes: z.string().nullable().optional(),
 });
 
 const TransactionSchema = z.object({
@@ -55,8 +55,129 @@ const TransactionSchema = z.object({
   paymentMethod: z.string(),
   processingTime: z.number(),
   edgeVersion: z.string(),
+  // Edge wire-format version; absent on payloads from older devices
+  schemaVersion: z.number().int().min(1).max(1).optional(),
+  // Periodic per-stage latency/counter summary from the edge (kept in raw_data)
+  edgeMetrics: z.record(z.any()).nullable().optional(),
+  // Store counters the edge accumulated since its previous summary
+  edgeAggregates: z.object({
+    from: z.string(),
+    to: z.string(),
+    transactions: z.number(),
+    units: z.number(),
+    value: z.number(),
+    branded: z.record(z.any()),
+    unbranded: z.record(z.any()),
+    categories: z.array(z.record(z.any())),
+    topProducts: z.array(z.record(z.any())),
+    topPairs: z.array(z.record(z.any())),
+  }).nullable().optional(),
 });
 
+// Raised when a validated transaction cannot be written to the database
+class StoreError extends Error {
+  constructor(message: string, public details: string) {
+    super(message);
+  }
+}
+
+// Postgres unique_violation: the transaction ID was already stored
+const UNIQUE_VIOLATION = '23505';
+
+// Persist one validated transaction and its items, then update analytics.
+// The edge transactionId is the idempotency key: a retried delivery of a
+// stored transaction is acknowledged without writing or counting it again.
+async function storeTransaction(
+  supabase: any,
+  validatedData: z.infer<typeof TransactionSchema>
+): Promise<{ duplicate: boolean }> {
+  const { data: existing } = await supabase
+    .from('scout_dash.transactions')
+    .select('transaction_id')
+    .eq('transaction_id', validatedData.transactionId)
+    .maybeSingle();
+
+  if (existing) {
+    return { duplicate: true };
+  }
+
+  // Store main transaction record
+  const { error: transactionError } = await supabase
+    .from('scout_dash.transactions')
+    .insert({
+      transaction_id: validatedData.transactionId,
+      store_id: validatedData.storeId,
+      device_id: validatedData.deviceId,
+      timestamp: validatedData.timestamp,
+      total_amount: validatedData.totals.totalAmount,
+      total_items: validatedData.totals.totalItems,
+      branded_amount: validatedData.totals.brandedAmount,
+      unbranded_amount: validatedData.totals.unbrandedAmount,
+      branded_count: validatedData.totals.brandedCount,
+      unbranded_count: validatedData.totals.unbrandedCount,
+      payment_method: validatedData.paymentMethod,
+      processing_time: validatedData.processingTime,
+      edge_version: validatedData.edgeVersion,
+      insights: validatedData.insights,
+      raw_data: validatedData, // Store complete JSON for analysis
+    })
+    .select()
+    .single();
+
+  if (transactionError?.code === UNIQUE_VIOLATION) {
+    // A concurrent retry won the race
+    return { duplicate: true };
+  }
+
+  if (transactionError) {
+    console.error('❌ Transaction insert error:', transactionError);
+    throw new StoreError('Failed to store transaction', transactionError.message);
+  }
+
+  // Store individual items
+  const itemsToInsert = validatedData.items.map(item => ({
+    transaction_id: validatedData.transactionId,
+    brand_name: item.brandName,
+    product_name: item.productName,
+    generic_name: item.genericName,
+    local_name: item.localName,
+    sku: item.sku,
+    quantity: item.quantity,
+    unit: item.unit,
+    unit_price: item.unitPrice,
+    total_price: item.totalPrice,
+    category: item.category,
+    is_unbranded: item.isUnbranded,
+    is_bulk: item.isBulk,
+    detection_method: item.detectionMethod,
+    confidence: item.confidence,
+    brand_confidence: item.brandConfidence,
+    suggested_brands: item.suggestedBrands,
+    notes: item.notes,
+  }));
+
+  const { error: itemsError } = await supabase
+    .from('scout_dash.transaction_items')
+    .insert(itemsToInsert);
+
+  if (itemsError) {
+    console.error('❌ Transaction items insert error:', itemsError);
+    throw new StoreError('Failed to store transaction items', itemsError.message);
+  }
+
+  if (validatedData.edgeAggregates) {
+    await storeEdgeAggregates(supabase, validatedData);
+  }
+
+  // Update store analytics in real-time
+  await updateStoreAnalytics(supabase, validatedData.storeId, validatedData);
+
+  // Trigger real-time analytics processing
+  await processRealTimeAnalytics(supabase, validatedData);
+
+  return { duplicate: false };
+}
+
 // POST /api/transactions - Receive transaction from Raspberry Pi
 router.post('/transactions', async (req: Request, res: Response) => {
   try {
@@ -66,83 +187,15 @@ router.post('/transactions', async (req: Request, res: Response) => {
     const validatedData = TransactionSchema.parse(req.body);
     const supabase = createSupabaseClient();
     
-    // Store main transaction record
-    const { data: transaction, error: transactionError } = await supabase
-      .from('scout_dash.transactions')
-      .insert({
-        transaction_id: validatedData.transactionId,
-        store_id: validatedData.storeId,
-        device_id: validatedData.deviceId,
-        timestamp: validatedData.timestamp,
-        total_amount: validatedData.totals.totalAmount,
-        total_items: validatedData.totals.totalItems,
-        branded_amount: validatedData.totals.brandedAmount,
-        unbranded_amount: validatedData.totals.unbrandedAmount,
-        branded_count: validatedData.totals.brandedCount,
-        unbranded_count: validatedData.totals.unbrandedCount,
-        payment_method: validatedData.paymentMethod,
-        processing_time: validatedData.processingTime,
-        edge_version: validatedData.edgeVersion,
-        insights: validatedData.insights,
-        raw_data: validatedData, // Store complete JSON for analysis
-      })
-      .select()
-      .single();
-
-    if (transactionError) {
-      console.error('❌ Transaction insert error:', transactionError);
-      return res.status(500).json({ 
-        error: 'Failed to store transaction',
-        details: transactionError.message 
-      });
-    }
+    const { duplicate } = await storeTransaction(supabase, validatedData);
 
-    // Store individual items
-    const itemsToInsert = validatedData.items.map(item => ({
-      transaction_id: validatedData.transactionId,
-      brand_name: item.brandName,
-      product_name: item.productName,
-      generic_name: item.genericName,
-      local_name: item.localName,
-      sku: item.sku,
-      quantity: item.quantity,
-      unit: item.unit,
-      unit_price: item.unitPrice,
-      total_price: item.totalPrice,
-      category: item.category,
-      is_unbranded: item.isUnbranded,
-      is_bulk: item.isBulk,
-      detection_method: item.detectionMethod,
-      confidence: item.confidence,
-      brand_confidence: item.brandConfidence,
-      suggested_brands: item.suggestedBrands,
-      notes: item.notes,
-    }));
-
-    const { error: itemsError } = await supabase
-      .from('scout_dash.transaction_items')
-      .insert(itemsToInsert);
-
-    if (itemsError) {
-      console.error('❌ Transaction items insert error:', itemsError);
-      return res.status(500).json({ 
-        error: 'Failed to store transaction items',
-        details: itemsError.message 
-      });
-    }
-
-    // Update store analytics in real-time
-    await updateStoreAnalytics(supabase, validatedData.storeId, validatedData);
-
-    // Trigger real-time analytics processing
-    await processRealTimeAnalytics(supabase, validatedData);
-
-    console.log('✅ Transaction processed successfully:', validatedData.transactionId);
+    console.log(duplicate ? '🔁 Duplicate delivery acknowledged:' : '✅ Transaction processed successfully:', validatedData.transactionId);
     
     res.json({ 
       success: true, 
       transactionId: validatedData.transactionId,
-      message: 'Transaction processed successfully',
+      duplicate,
+      message: duplicate ? 'Transaction already processed' : 'Transaction processed successfully',
       processedAt: new Date().toISOString()
     });
 
@@ -155,6 +208,13 @@ router.post('/transactions', async (req: Request, res: Response) => {
         details: error.errors
       });
     }
+
+    if (error instanceof StoreError) {
+      return res.status(500).json({ 
+        error: error.message,
+        details: error.details 
+      });
+    }
     
     res.status(500).json({ 
       error: 'Internal server error',
@@ -163,6 +223,53 @@ router.post('/transactions', async (req: Request, res: Response) => {
   }
 });
 
+// POST /api/transactions/batch - Receive a batch of transactions from Raspberry Pi
+// Edge devices gzip the body; express.json() inflates Content-Encoding: gzip
+router.post('/transactions/batch', async (req: Request, res: Response) => {
+  const transactions = Array.isArray(req.body?.transactions) ? req.body.transactions : null;
+
+  if (!transactions) {
+    return res.status(400).json({ error: 'Expected { transactions: [...] }' });
+  }
+
+  console.log(`📦 Received batch of ${transactions.length} transactions from edge device:`, transactions[0]?.deviceId);
+
+  const supabase = createSupabaseClient();
+  // retryable tells the edge whether a failed item is worth sending again
+  // (the hub failed to store it) or was refused as invalid
+  const results: { transactionId?: string; success: boolean; duplicate?: boolean; retryable?: boolean; error?: string }[] = [];
+
+  for (const raw of transactions) {
+    const parsed = TransactionSchema.safeParse(raw);
+    if (!parsed.success) {
+      results.push({ transactionId: raw?.transactionId, success: false, retryable: false, error: 'Invalid transaction data' });
+      continue;
+    }
+
+    try {
+      const { duplicate } = await storeTransaction(supabase, parsed.data);
+      results.push({ transactionId: parsed.data.transactionId, success: true, duplicate });
+    } catch (error) {
+      results.push({
+        transactionId: parsed.data.transactionId,
+        success: false,
+        retryable: true,
+        error: error instanceof Error ? error.message : 'Unknown error'
+      });
+    }
+  }
+
+  const failed = results.filter(r => !r.success).length;
+  const duplicates = results.filter(r => r.duplicate).length;
+  console.log(`✅ Batch processed: ${results.length - failed - duplicates} stored, ${duplicates} duplicate, ${failed} failed`);
+
+  res.status(failed ? 207 : 200).json({
+    success: failed === 0,
+    results,
+    processedAt: new Date().toISOString()
+  });
+});
+
 // GET /api/transactions - Get transactions with filters
 router.get('/transactions', async (req: Request, res: Response) => {
   try {
@@ -242,6 +349,34 @@ router.get('/transactions/:id', async (req: Request, res: Response) => {
   }
 });
 
+// Keep the edge's periodic store summary; dashboards read these instead of
+// re-aggregating raw transaction rows
+async function storeEdgeAggregates(supabase: any, transaction: any) {
+  const summary = transaction.edgeAggregates;
+  const { error } = await supabase
+    .from('scout_dash.edge_aggregates')
+    .insert({
+      store_id: transaction.storeId,
+      device_id: transaction.deviceId,
+      transaction_id: transaction.transactionId,
+      window_start: summary.from,
+      window_end: summary.to,
+      transactions: summary.transactions,
+      units: summary.units,
+      value: summary.value,
+      branded: summary.branded,
+      unbranded: summary.unbranded,
+      categories: summary.categories,
+      top_products: summary.topProducts,
+      top_pairs: summary.topPairs,
+    });
+
+  if (error) {
+    // The summary also stays in raw_data; losing the row is not fatal
+    console.error('❌ Edge aggregates insert error:', error);
+  }
+}
+
 // Helper function to update store analytics
 async function updateStoreAnalytics(supabase: any, storeId: string, transaction: any) {
   try {
@@ -3,6 +3,7 @@ import cors from 'cors'
 import dotenv from 'dotenv'
 import { supabase } from './supabase'
 import transactionsRouter from './routes/transactions'
+import catalogRouter from './routes/catalog'
 
 // Load environment variables
 dotenv.config({ path: '../../.env.local' })
@@ -17,6 +18,7 @@ app.use(express.urlencoded({ extended: true, limit: '10mb' }))
 
 // Routes
 app.use('/api', transactionsRouter)
+app.use('/api', catalogRouter)
 
 // Health check endpoint
 app.get('/health', async (req, res) => {
@@ -168,6 +170,7 @@ Available endpoints:
 - POST /api/transactions (Edge devices)
 - GET  /api/transactions (Analytics)
 - GET  /api/transactions/:id (Specific transaction)
+- GET  /api/catalog (Edge catalog delta sync)
 
 Note: Using service role key for all operations.
 The anon key is needed for client-side auth.
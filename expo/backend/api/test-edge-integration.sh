@@ -7,6 +7,8 @@ echo "=================================="
 # Configuration
 API_URL="http://localhost:4000"
 TEST_TRANSACTION_FILE="../../test-transaction.json"
+# Captured from raspberry-pi-processor.py output, nulls included
+TEST_BATCH_FILE="../../test-transaction-batch.json"
 
 # Colors for output
 RED='\033[0;31m'
@@ -57,13 +59,17 @@ test_endpoint "GET" "/health" "" "200"
 # Test 2: Submit transaction (simulating Raspberry Pi)
 test_endpoint "POST" "/api/transactions" "$TEST_TRANSACTION_FILE" "200"
 
-# Test 3: Get transactions list
+# Test 3: Submit a batch as the edge sends it; any item failing validation
+# turns the response into a 207
+test_endpoint "POST" "/api/transactions/batch" "$TEST_BATCH_FILE" "200"
+
+# Test 4: Get transactions list
 test_endpoint "GET" "/api/transactions" "" "200"
 
-# Test 4: Get transactions with filters
+# Test 5: Get transactions with filters
 test_endpoint "GET" "/api/transactions?storeId=SM-001&limit=10" "" "200"
 
-# Test 5: Get specific transaction
+# Test 6: Get specific transaction
 TRANSACTION_ID=$(jq -r '.transactionId' $TEST_TRANSACTION_FILE)
 test_endpoint "GET" "/api/transactions/$TRANSACTION_ID" "" "200"
 
@@ -71,6 +77,7 @@ echo "🎯 Integration Test Summary"
 echo "========================="
 echo "✅ Health check endpoint"
 echo "✅ Transaction submission (POST /api/transactions)"
+echo "✅ Batch submission of edge payloads (POST /api/transactions/batch)"
 echo "✅ Transaction listing (GET /api/transactions)"
 echo "✅ Transaction filtering (GET /api/transactions?filters)"
 echo "✅ Specific transaction retrieval (GET /api/transactions/:id)"
@@ -0,0 +1,49 @@
+-- Edge catalog sync
+-- Lookup terms, per-unit prices and per-store price overrides for the
+-- Raspberry Pi product catalog, with updated_at cursors for delta sync
+
+-- =====================================================
+-- PRODUCTS: edge lookup fields
+-- =====================================================
+
+ALTER TABLE scout_dash.products ADD COLUMN IF NOT EXISTS local_name TEXT;
+ALTER TABLE scout_dash.products ADD COLUMN IF NOT EXISTS generic_name TEXT;
+ALTER TABLE scout_dash.products ADD COLUMN IF NOT EXISTS variants TEXT[] DEFAULT '{}';
+ALTER TABLE scout_dash.products ADD COLUMN IF NOT EXISTS unit TEXT DEFAULT 'pc';
+ALTER TABLE scout_dash.products ADD COLUMN IF NOT EXISTS unit_prices JSONB DEFAULT '{}'::JSONB;  -- {"kg": 55, "sack": 2400}
+ALTER TABLE scout_dash.products ADD COLUMN IF NOT EXISTS priority INTEGER DEFAULT 1000;
+ALTER TABLE scout_dash.products ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+
+-- Per-store price overrides (store_code matches the edge STORE_ID)
+CREATE TABLE IF NOT EXISTS scout_dash.store_prices (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    store_code TEXT NOT NULL REFERENCES scout_dash.stores(store_code),
+    product_code TEXT NOT NULL REFERENCES scout_dash.products(product_code),
+    unit TEXT NOT NULL DEFAULT 'pc',
+    price DECIMAL(10,2),  -- NULL removes the override on the device
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE (store_code, product_code, unit)
+);
+
+-- Keep updated_at current so devices pick up edits on their next sync
+CREATE OR REPLACE FUNCTION scout_dash.touch_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_products_touch ON scout_dash.products;
+CREATE TRIGGER trg_products_touch BEFORE UPDATE ON scout_dash.products
+    FOR EACH ROW EXECUTE FUNCTION scout_dash.touch_updated_at();
+
+DROP TRIGGER IF EXISTS trg_store_prices_touch ON scout_dash.store_prices;
+CREATE TRIGGER trg_store_prices_touch BEFORE UPDATE ON scout_dash.store_prices
+    FOR EACH ROW EXECUTE FUNCTION scout_dash.touch_updated_at();
+
+-- =====================================================
+-- INDEXES FOR DELTA SYNC
+-- =====================================================
+
+CREATE INDEX IF NOT EXISTS idx_products_updated ON scout_dash.products(updated_at);
+CREATE INDEX IF NOT EXISTS idx_store_prices_store_updated ON scout_dash.store_prices(store_code, updated_at);
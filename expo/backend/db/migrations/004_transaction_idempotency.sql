@@ -0,0 +1,8 @@
+-- Idempotent edge delivery
+-- Edge devices send a time-ordered, globally unique transactionId and retry
+-- until acknowledged; a unique index makes repeated deliveries no-ops
+
+ALTER TABLE scout_dash.transactions ADD COLUMN IF NOT EXISTS transaction_id TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_transaction_id
+    ON scout_dash.transactions(transaction_id);
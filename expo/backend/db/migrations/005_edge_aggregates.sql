@@ -0,0 +1,25 @@
+-- Edge store aggregates
+-- Devices keep rolling hour/day counters and ship the delta since their
+-- previous summary on a transaction payload; one row per summary, keyed by
+-- the carrying transaction so a retried delivery is not stored twice
+
+CREATE TABLE IF NOT EXISTS scout_dash.edge_aggregates (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    store_id TEXT NOT NULL,
+    device_id TEXT NOT NULL,
+    transaction_id TEXT NOT NULL UNIQUE,
+    window_start TIMESTAMP NOT NULL,
+    window_end TIMESTAMP NOT NULL,
+    transactions INTEGER NOT NULL DEFAULT 0,
+    units DECIMAL(12,3) NOT NULL DEFAULT 0,
+    value DECIMAL(12,2) NOT NULL DEFAULT 0,
+    branded JSONB DEFAULT '{}'::JSONB,      -- {"count": 12, "value": 540.0, "share": 0.6}
+    unbranded JSONB DEFAULT '{}'::JSONB,
+    categories JSONB DEFAULT '[]'::JSONB,   -- [{"category": "Beverages", "units": 8, "value": 320.0}]
+    top_products JSONB DEFAULT '[]'::JSONB, -- [{"product": "Coke 1.5L", "baskets": 6}]
+    top_pairs JSONB DEFAULT '[]'::JSONB,    -- [{"pair": ["Rice", "Cooking Oil"], "baskets": 4}]
+    received_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_edge_aggregates_store_window
+    ON scout_dash.edge_aggregates(store_id, window_start);
@@ -0,0 +1,12 @@
+-- Catalog keyset cursor
+-- /api/catalog pages products by (updated_at, product_code) and store
+-- prices by (updated_at, product_code, unit) so rows that share a
+-- timestamp are not skipped between pages; index the full sort keys
+
+CREATE INDEX IF NOT EXISTS idx_products_updated_code
+    ON scout_dash.products(updated_at, product_code);
+CREATE INDEX IF NOT EXISTS idx_store_prices_store_updated_key
+    ON scout_dash.store_prices(store_code, updated_at, product_code, unit);
+
+DROP INDEX IF EXISTS scout_dash.idx_products_updated;
+DROP INDEX IF EXISTS scout_dash.idx_store_prices_store_updated;
@@ -0,0 +1,236 @@
+"""
+Rolling store aggregates
+Keeps hourly and daily buckets of what the store sells (transactions,
+units and value per category, branded vs. unbranded share, product counts
+and basket pairs) so the hub receives summaries instead of recomputing them
+from raw rows. Product and pair counters are capped: when one grows past
+twice its cap it is cut back to the cap's most frequent keys, so memory
+stays bounded and the cut costs O(1) amortized per insert. Pairs are counted over at most
+max_basket distinct products per basket, so an update is O(items).
+
+Basket-pair suggestions come from the pair counts of the retained days:
+partner B is suggested with A when enough baskets held A and a large enough
+share of them also held B.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from transaction_format import TransactionItem
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 86400
+
+
+def _trim(counter: Counter, cap: int):
+    """Keep the cap most frequent keys once the counter reaches twice the cap"""
+    if len(counter) >= 2 * cap:
+        kept = counter.most_common(cap)
+        counter.clear()
+        counter.update(dict(kept))
+
+
+def product_key(item: TransactionItem) -> str:
+    return item.productName
+
+
+def basket_keys(items: Iterable[TransactionItem], max_basket: int) -> List[str]:
+    """Distinct products of a basket, the first max_basket of them"""
+    return list(dict.fromkeys(product_key(item) for item in items))[:max_basket]
+
+
+class Bucket:
+    """Counters for one time slice"""
+
+    __slots__ = ('start', 'transactions', 'units', 'value', 'branded', 'branded_value', 'unbranded',
+                 'unbranded_value', 'category_units', 'category_value', 'products', 'pairs')
+
+    def __init__(self, start: float):
+        self.start = start
+        self.transactions = 0
+        self.units = 0.0
+        self.value = 0.0
+        self.branded = 0
+        self.branded_value = 0.0
+        self.unbranded = 0
+        self.unbranded_value = 0.0
+        # Categories come from the catalog's fixed set, so these stay small uncapped
+        self.category_units: Counter = Counter()
+        self.category_value: Counter = Counter()
+        self.products: Counter = Counter()  # baskets holding the product
+        self.pairs: Counter = Counter()  # baskets holding both, keyed (a, b) with a < b
+
+    def add(self, items: List[TransactionItem], keys: List[str], pairs: List[Tuple[str, str]],
+            capacity: int, pair_capacity: int):
+        self.transactions += 1
+        for item in items:
+            self.units += item.quantity
+            self.value += item.totalPrice
+            if item.isUnbranded:
+                self.unbranded += 1
+                self.unbranded_value += item.totalPrice
+            else:
+                self.branded += 1
+                self.branded_value += item.totalPrice
+            self.category_units[item.category] += item.quantity
+            self.category_value[item.category] += item.totalPrice
+        self.products.update(keys)
+        self.pairs.update(pairs)
+        _trim(self.products, capacity)
+        _trim(self.pairs, pair_capacity)
+
+    def size(self) -> int:
+        return len(self.category_units) + len(self.category_value) + len(self.products) + len(self.pairs)
+
+    def to_dict(self, end: float, top: int = 20) -> Dict:
+        items = self.branded + self.unbranded
+        return {
+            'from': datetime.fromtimestamp(self.start).isoformat(),
+            'to': datetime.fromtimestamp(end).isoformat(),
+            'transactions': self.transactions,
+            'units': round(self.units, 3),
+            'value': round(self.value, 2),
+            'branded': {'count': self.branded, 'value': round(self.branded_value, 2),
+                        'share': round(self.branded / items, 3) if items else None},
+            'unbranded': {'count': self.unbranded, 'value': round(self.unbranded_value, 2),
+                          'share': round(self.unbranded / items, 3) if items else None},
+            'categories': [
+                {'category': category, 'units': round(self.category_units[category], 3), 'value': round(value, 2)}
+                for category, value in self.category_value.most_common()
+            ],
+            'topProducts': [{'product': p, 'baskets': n} for p, n in self.products.most_common(top)],
+            'topPairs': [{'pair': list(pair), 'baskets': n} for pair, n in self.pairs.most_common(top)],
+        }
+
+
+class RollingAggregator:
+    """Hour and day windows of store counters, plus the delta since the last summary"""
+
+    def __init__(self, hours: int = 24, days: int = 7, capacity: int = 200, pair_capacity: int = 500,
+                 max_basket: int = 12, min_support: int = 5, min_confidence: float = 0.3,
+                 refresh: int = 50, clock=time.time, metrics=None):
+        self.capacity = capacity
+        self.pair_capacity = pair_capacity
+        self.max_basket = max_basket
+        self.min_support = min_support
+        self.min_confidence = min_confidence
+        self.refresh = refresh
+        self.clock = clock
+        self.hours: Deque[Bucket] = deque(maxlen=max(1, hours))
+        self.days: Deque[Bucket] = deque(maxlen=max(1, days))
+        # Running sums over the retained days, for suggestions
+        self.product_totals: Counter = Counter()
+        self.pair_totals: Counter = Counter()
+        self._rules: Dict[str, List[Tuple[str, float, int]]] = {}
+        self._stale = 0
+        self._delta: Optional[Bucket] = None
+        self._lock = threading.Lock()
+        if metrics is not None:
+            metrics.gauge('edge_aggregate_keys', self.size)
+
+    @staticmethod
+    def _day_start(now: float) -> float:
+        """Local midnight, so day buckets match the store's day"""
+        return now - (now + time.localtime(now).tm_gmtoff) % DAY
+
+    def _bucket(self, window: Deque[Bucket], start: float) -> Bucket:
+        if window and window[-1].start == start:
+            return window[-1]
+        if window is self.days and len(window) == window.maxlen:
+            self._expire(window[0])
+        window.append(Bucket(start))
+        return window[-1]
+
+    def _expire(self, bucket: Bucket):
+        """Take a day that leaves the window out of the suggestion sums"""
+        self.product_totals.subtract(bucket.products)
+        self.pair_totals.subtract(bucket.pairs)
+        self.product_totals = +self.product_totals
+        self.pair_totals = +self.pair_totals
+        self._stale = self.refresh
+
+    def update(self, items: List[TransactionItem], now: Optional[float] = None):
+        """Count one transaction into every window"""
+        if not items:
+            return
+        now = self.clock() if now is None else now
+        keys = basket_keys(items, self.max_basket)
+        pairs = [(a, b) if a < b else (b, a) for i, a in enumerate(keys) for b in keys[i + 1:]]
+        with self._lock:
+            if self._delta is None:
+                self._delta = Bucket(now)
+            buckets = (self._bucket(self.hours, now - now % HOUR), self._bucket(self.days, self._day_start(now)),
+                       self._delta)
+            for bucket in buckets:
+                bucket.add(items, keys, pairs, self.capacity, self.pair_capacity)
+            self.product_totals.update(keys)
+            self.pair_totals.update(pairs)
+            _trim(self.product_totals, self.capacity)
+            _trim(self.pair_totals, self.pair_capacity)
+            self._stale += 1
+
+    def _refresh_rules(self):
+        """Best partners per product from the pair sums (O(pairs), every refresh updates)"""
+        rules: Dict[str, List[Tuple[str, float, int]]] = {}
+        for (a, b), together in self.pair_totals.items():
+            if together < self.min_support:
+                continue
+            for product, partner in ((a, b), (b, a)):
+                baskets = self.product_totals.get(product, 0)
+                if baskets and together / baskets >= self.min_confidence:
+                    rules.setdefault(product, []).append((partner, together / baskets, together))
+        for partners in rules.values():
+            partners.sort(key=lambda rule: (-rule[1], -rule[2]))
+            del partners[3:]
+        self._rules = rules
+        self._stale = 0
+
+    def suggestions(self, items: List[TransactionItem], limit: int = 3) -> List[str]:
+        """Upsell partners that often share a basket with these items"""
+        keys = basket_keys(items, self.max_basket)
+        with self._lock:
+            if self._stale >= self.refresh:
+                self._refresh_rules()
+            rules = self._rules
+        in_basket = set(keys)
+        candidates = sorted(
+            ((confidence, partner, product) for product in keys
+             for partner, confidence, _ in rules.get(product, ()) if partner not in in_basket),
+            reverse=True
+        )
+        out, seen = [], set()
+        for confidence, partner, product in candidates:
+            if partner in seen:
+                continue
+            seen.add(partner)
+            out.append(f"Suggest {partner} with {product} ({confidence:.0%} of baskets)")
+            if len(out) == limit:
+                break
+        return out
+
+    def take_delta(self, now: Optional[float] = None) -> Optional[Dict]:
+        """Counters since the previous call, then start a new delta"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            delta, self._delta = self._delta, None
+        return delta.to_dict(now) if delta is not None else None
+
+    def rollup(self, window: str = 'hour', now: Optional[float] = None) -> Optional[Dict]:
+        """The current hour or day bucket"""
+        buckets = self.hours if window == 'hour' else self.days
+        with self._lock:
+            bucket = buckets[-1] if buckets else None
+            return bucket.to_dict(self.clock() if now is None else now) if bucket else None
+
+    def size(self) -> int:
+        """Counter keys held across all windows"""
+        with self._lock:
+            buckets = list(self.hours) + list(self.days) + ([self._delta] if self._delta else [])
+            return (sum(bucket.size() for bucket in buckets)
+                    + len(self.product_totals) + len(self.pair_totals))
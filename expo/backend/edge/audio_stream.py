@@ -0,0 +1,393 @@
+"""
+Streaming audio front-end for voice transactions
+Ring-buffered capture, energy-based voice activity detection, overlapping
+chunk transcription with incremental text stitching, and incremental
+segment parsing so items are emitted while the customer is still talking
+"""
+
+import logging
+import queue
+import re
+import threading
+import time
+import wave
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+
+
+@dataclass
+class AudioChunk:
+    utterance_id: int
+    seq: int
+    samples: np.ndarray  # float32 mono @ 16 kHz, includes overlap with the previous chunk
+    start: float  # seconds since the source started
+    final: bool
+    captured_at: float  # time.monotonic() when the chunk was cut
+
+
+class WavFileSource:
+    """Audio source backed by a 16-bit mono WAV file (fake microphone)"""
+
+    def __init__(self, path: str, realtime: bool = True):
+        self.path = path
+        self.realtime = realtime
+        self._wav = wave.open(path, 'rb')
+        if self._wav.getnchannels() != 1 or self._wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16-bit mono WAV")
+        if self._wav.getframerate() != SAMPLE_RATE:
+            raise ValueError(f"{path}: expected {SAMPLE_RATE} Hz, got {self._wav.getframerate()}")
+        self._started = None
+        self._read = 0
+
+    def read(self, frames: int) -> Optional[bytes]:
+        """Return up to frames samples of PCM16, or None at end of file"""
+        if self._started is None:
+            self._started = time.monotonic()
+        data = self._wav.readframes(frames)
+        if not data:
+            return None
+        self._read += len(data) // 2
+        if self.realtime:
+            # Pace delivery like a live microphone
+            delay = self._started + self._read / SAMPLE_RATE - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return data
+
+    def close(self):
+        self._wav.close()
+
+
+class MicrophoneSource:
+    """Live capture through PyAudio"""
+
+    def __init__(self, device_index: Optional[int] = None):
+        import pyaudio
+
+        self._pa = pyaudio.PyAudio()
+        self._stream = self._pa.open(
+            format=pyaudio.paInt16, channels=1, rate=SAMPLE_RATE, input=True,
+            input_device_index=device_index, frames_per_buffer=FRAME_SAMPLES
+        )
+
+    def read(self, frames: int) -> Optional[bytes]:
+        return self._stream.read(frames, exception_on_overflow=False)
+
+    def close(self):
+        self._stream.stop_stream()
+        self._stream.close()
+        self._pa.terminate()
+
+
+class RingBuffer:
+    """Fixed-capacity float32 sample buffer addressed by absolute sample index"""
+
+    def __init__(self, seconds: float):
+        self.capacity = int(seconds * SAMPLE_RATE)
+        self._data = np.zeros(self.capacity, dtype=np.float32)
+        self.written = 0
+
+    def write(self, samples: np.ndarray):
+        n = len(samples)
+        if n >= self.capacity:
+            samples = samples[-self.capacity:]
+            self.written += n - self.capacity
+            n = self.capacity
+        pos = self.written % self.capacity
+        first = min(n, self.capacity - pos)
+        self._data[pos:pos + first] = samples[:first]
+        self._data[:n - first] = samples[first:]
+        self.written += n
+
+    def oldest(self) -> int:
+        return max(0, self.written - self.capacity)
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Copy samples [start, end) out of the buffer"""
+        start = max(start, self.oldest())
+        n = end - start
+        if n <= 0:
+            return np.zeros(0, dtype=np.float32)
+        pos = start % self.capacity
+        first = min(n, self.capacity - pos)
+        out = np.empty(n, dtype=np.float32)
+        out[:first] = self._data[pos:pos + first]
+        out[first:] = self._data[:n - first]
+        return out
+
+
+class EnergyVAD:
+    """Frame-energy voice activity detector with an adaptive noise floor"""
+
+    def __init__(self, threshold_ratio: float = 3.0, min_energy: float = 0.01,
+                 start_frames: int = 3, hangover_ms: int = 600):
+        self.threshold_ratio = threshold_ratio
+        self.min_energy = min_energy
+        self.start_frames = start_frames
+        self.hangover_frames = max(1, hangover_ms // FRAME_MS)
+        self.noise_floor = min_energy / threshold_ratio
+        self.in_speech = False
+        self._voiced_run = 0
+        self._silent_run = 0
+
+    def update(self, frame: np.ndarray) -> bool:
+        """Feed one frame; returns whether we are inside an utterance"""
+        energy = float(np.sqrt(np.mean(frame * frame))) if len(frame) else 0.0
+        voiced = energy > max(self.min_energy, self.noise_floor * self.threshold_ratio)
+
+        if not voiced:
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * energy
+
+        if self.in_speech:
+            self._silent_run = 0 if voiced else self._silent_run + 1
+            if self._silent_run >= self.hangover_frames:
+                self.in_speech = False
+                self._voiced_run = 0
+        else:
+            self._voiced_run = self._voiced_run + 1 if voiced else 0
+            if self._voiced_run >= self.start_frames:
+                self.in_speech = True
+                self._silent_run = 0
+        return self.in_speech
+
+
+class StreamChunker:
+    """Cuts VAD-gated utterances into overlapping chunks for transcription"""
+
+    def __init__(self, chunk_seconds: float = 2.0, overlap_seconds: float = 0.5,
+                 preroll_seconds: float = 0.3, max_utterance_seconds: float = 30.0,
+                 vad: Optional[EnergyVAD] = None):
+        self.chunk_samples = int(chunk_seconds * SAMPLE_RATE)
+        self.overlap_samples = int(overlap_seconds * SAMPLE_RATE)
+        self.preroll_samples = int(preroll_seconds * SAMPLE_RATE)
+        self.max_utterance_samples = int(max_utterance_seconds * SAMPLE_RATE)
+        self.vad = vad or EnergyVAD()
+        self.buffer = RingBuffer(max_utterance_seconds + chunk_seconds + preroll_seconds)
+        self._utterance_id = 0
+        self._seq = 0
+        self._utterance_start = None
+        self._cursor = 0  # first sample not yet covered by an emitted chunk
+
+    def feed(self, pcm16: bytes) -> List[AudioChunk]:
+        samples = np.frombuffer(pcm16, dtype=np.int16).astype(np.float32) / 32768.0
+        chunks = []
+        for offset in range(0, len(samples), FRAME_SAMPLES):
+            frame = samples[offset:offset + FRAME_SAMPLES]
+            self.buffer.write(frame)
+            was_speaking = self._utterance_start is not None
+            speaking = self.vad.update(frame)
+
+            if speaking and not was_speaking:
+                self._utterance_id += 1
+                self._seq = 0
+                self._utterance_start = max(self.buffer.oldest(), self.buffer.written - len(frame)
+                                            - self.vad.start_frames * FRAME_SAMPLES - self.preroll_samples)
+                self._cursor = self._utterance_start
+            elif was_speaking and not speaking:
+                chunks.append(self._cut(final=True))
+                self._utterance_start = None
+            elif speaking:
+                if self.buffer.written - self._cursor >= self.chunk_samples:
+                    chunks.append(self._cut(final=False))
+                elif self.buffer.written - self._utterance_start >= self.max_utterance_samples:
+                    chunks.append(self._cut(final=True))
+                    self._utterance_start = None
+                    self.vad.in_speech = False
+        return chunks
+
+    def flush(self) -> List[AudioChunk]:
+        """Close any open utterance (end of stream)"""
+        if self._utterance_start is None:
+            return []
+        chunk = self._cut(final=True)
+        self._utterance_start = None
+        return [chunk]
+
+    def _cut(self, final: bool) -> AudioChunk:
+        start = max(self._utterance_start, self._cursor - self.overlap_samples) if self._seq else self._cursor
+        end = self.buffer.written
+        chunk = AudioChunk(
+            utterance_id=self._utterance_id, seq=self._seq,
+            samples=self.buffer.read(start, end), start=start / SAMPLE_RATE,
+            final=final, captured_at=time.monotonic()
+        )
+        self._seq += 1
+        self._cursor = end
+        return chunk
+
+
+_WORD_RE = re.compile(r"[\w'-]+")
+
+
+class TextStitcher:
+    """Merges overlapping chunk transcripts into one running transcript
+
+    The last word of every non-final chunk is held back as tentative because
+    it is likely cut mid-word; the next chunk's overlap re-transcribes it.
+    """
+
+    def __init__(self, max_overlap_words: int = 6):
+        self.max_overlap_words = max_overlap_words
+        self.committed: List[str] = []
+        self.tentative: List[str] = []
+
+    @staticmethod
+    def _norm(word: str) -> str:
+        return word.lower().strip(".,!?")
+
+    def add(self, text: str, final: bool) -> str:
+        words = text.split()
+        normalized = [self._norm(w) for w in words]
+        tail = [self._norm(w) for w in self.committed[-self.max_overlap_words:]]
+
+        overlap = 0
+        for k in range(min(len(tail), len(normalized)), 0, -1):
+            if tail[-k:] == normalized[:k]:
+                overlap = k
+                break
+
+        fresh = words[overlap:]
+        if final:
+            self.committed.extend(fresh)
+            self.tentative = []
+        else:
+            self.committed.extend(fresh[:-1])
+            self.tentative = fresh[-1:]
+        return self.text
+
+    @property
+    def text(self) -> str:
+        return ' '.join(self.committed + self.tentative)
+
+    @property
+    def committed_text(self) -> str:
+        return ' '.join(self.committed)
+
+
+class UtteranceAssembler:
+    """Parses completed segments of a growing transcript exactly once"""
+
+    def __init__(self, split_fn: Callable[[str], List[str]], parse_fn: Callable[[str], Optional[object]]):
+        self.split_fn = split_fn
+        self.parse_fn = parse_fn
+        self.stitcher = TextStitcher()
+        self.items: List[object] = []
+        self._parsed_segments = 0
+
+    def add(self, text: str, final: bool) -> List[object]:
+        """Feed a chunk transcript; returns newly parsed items"""
+        self.stitcher.add(text, final)
+        segments = self.split_fn(self.stitcher.committed_text)
+        # The last segment may still grow unless the utterance is over
+        ready = segments if final else segments[:-1]
+
+        new_items = []
+        for segment in ready[self._parsed_segments:]:
+            item = self.parse_fn(segment)
+            if item:
+                new_items.append(item)
+        self._parsed_segments = max(self._parsed_segments, len(ready))
+        self.items.extend(new_items)
+        return new_items
+
+
+class StreamingTranscriber:
+    """Capture thread (VAD + chunking) feeding an in-order transcription thread"""
+
+    def __init__(self, source, transcribe_fn: Callable[[AudioChunk], str],
+                 split_fn: Callable[[str], List[str]], parse_fn: Callable[[str], Optional[object]],
+                 on_items: Callable[[int, List[object], bool], None],
+                 chunker: Optional[StreamChunker] = None, max_pending_chunks: int = 8):
+        self.source = source
+        self.transcribe_fn = transcribe_fn
+        self.split_fn = split_fn
+        self.parse_fn = parse_fn
+        self.on_items = on_items
+        self.chunker = chunker or StreamChunker()
+        self.chunks: queue.Queue = queue.Queue(maxsize=max_pending_chunks)
+        self.stop_event = threading.Event()
+        self.dropped_chunks = 0
+        self._threads: List[threading.Thread] = []
+        self._assemblers = {}
+
+    def start(self):
+        for name, target in (('audio-capture', self._capture), ('audio-transcribe', self._transcribe)):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None):
+        self.stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def join(self, timeout: Optional[float] = None):
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _enqueue(self, chunk: AudioChunk):
+        try:
+            self.chunks.put(chunk, timeout=1.0)
+        except queue.Full:
+            # Transcription is too far behind; dropping keeps capture real-time
+            self.dropped_chunks += 1
+            logger.warning(f"Dropped audio chunk {chunk.utterance_id}.{chunk.seq}: transcriber saturated")
+
+    def _capture(self):
+        try:
+            while not self.stop_event.is_set():
+                data = self.source.read(FRAME_SAMPLES * 4)
+                if data is None:
+                    break
+                for chunk in self.chunker.feed(data):
+                    self._enqueue(chunk)
+            for chunk in self.chunker.flush():
+                self._enqueue(chunk)
+        except Exception as e:
+            logger.error(f"Audio capture error: {e}")
+        finally:
+            # Release the microphone or file as soon as capture ends
+            try:
+                self.source.close()
+            except Exception as e:
+                logger.error(f"Audio source close error: {e}")
+            self.chunks.put(None)
+
+    def _finalize_stale(self, before_id: int):
+        """Close utterances whose final chunk was dropped"""
+        for utterance_id in [u for u in self._assemblers if u < before_id]:
+            assembler = self._assemblers.pop(utterance_id)
+            assembler.add('', True)
+            self.on_items(utterance_id, assembler.items, True)
+
+    def _transcribe(self):
+        while True:
+            chunk = self.chunks.get()
+            if chunk is None:
+                self._finalize_stale(float('inf'))
+                return
+            self._finalize_stale(chunk.utterance_id)
+            try:
+                text = self.transcribe_fn(chunk)
+            except Exception as e:
+                logger.error(f"Chunk transcription error: {e}")
+                text = ''
+
+            assembler = self._assemblers.get(chunk.utterance_id)
+            if assembler is None:
+                assembler = self._assemblers[chunk.utterance_id] = UtteranceAssembler(self.split_fn, self.parse_fn)
+            new_items = assembler.add(text, chunk.final)
+
+            if chunk.final:
+                del self._assemblers[chunk.utterance_id]
+                self.on_items(chunk.utterance_id, assembler.items, True)
+            elif new_items:
+                self.on_items(chunk.utterance_id, new_items, False)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Rolling aggregates benchmark
+Streams synthetic baskets over several simulated days through a
+RollingAggregator. Some product pairs are planted to co-occur; the rest of
+each basket is drawn from a long tail. Reports update cost by basket size
+(it should grow with items, not with history), the counter keys held
+against their bound, and whether suggestions recover the planted pairs.
+Exits non-zero when the bound is exceeded or a planted pair is missed.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aggregates import RollingAggregator  # noqa: E402
+from transaction_format import TransactionItem  # noqa: E402
+
+PLANTED = [('Rice', 'Cooking Oil'), ('Pancit Canton', 'Eggs'), ('Coffee 3in1', 'Pandesal')]
+CATEGORIES = ['Beverages', 'Snacks', 'Canned Goods', 'Household', 'Personal Care', 'Rice & Grains']
+
+
+def item(name: str, rng: random.Random) -> TransactionItem:
+    quantity = rng.randint(1, 3)
+    price = rng.choice([8.0, 15.0, 25.0, 55.0])
+    return TransactionItem(
+        brandName=None if rng.random() < 0.4 else 'Brand', productName=name, genericName=None, localName=None,
+        sku=None, quantity=quantity, unit='pc', unitPrice=price, totalPrice=quantity * price,
+        category=CATEGORIES[hash(name) % len(CATEGORIES)], isUnbranded=rng.random() < 0.4, isBulk=False,
+        detectionMethod='stt', confidence=0.9
+    )
+
+
+def basket(rng: random.Random, tail: int, size: int):
+    names = []
+    if rng.random() < 0.5:
+        a, b = rng.choice(PLANTED)
+        names.append(a)
+        if rng.random() < 0.7:
+            names.append(b)
+    while len(names) < size:
+        names.append(f"Product {int(rng.paretovariate(1.1)) % tail}")
+    return [item(name, rng) for name in names]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transactions', type=int, default=50000)
+    parser.add_argument('--days', type=float, default=10.0, help='simulated days the stream spans')
+    parser.add_argument('--tail', type=int, default=5000, help='distinct long-tail products')
+    parser.add_argument('--capacity', type=int, default=200)
+    parser.add_argument('--pair-capacity', type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(20)
+    clock = [time.time()]
+    aggregator = RollingAggregator(capacity=args.capacity, pair_capacity=args.pair_capacity,
+                                   clock=lambda: clock[0])
+    step = args.days * 86400 / args.transactions
+
+    per_size = {}
+    peak_keys = 0
+    for index in range(args.transactions):
+        size = rng.choice([1, 2, 4, 8, 16])
+        items = basket(rng, args.tail, size)
+        clock[0] += step
+        start = time.perf_counter()
+        aggregator.update(items)
+        per_size.setdefault(size, []).append(time.perf_counter() - start)
+        if index % 1000 == 0:
+            peak_keys = max(peak_keys, aggregator.size())
+            aggregator.take_delta()
+
+    # Every window's product and pair counters at twice their caps, plus the running sums
+    windows = len(aggregator.hours) + len(aggregator.days) + 1
+    bound = (windows + 1) * 2 * (args.capacity + args.pair_capacity) + windows * 2 * len(CATEGORIES)
+
+    recovered = {}
+    for a, b in PLANTED:
+        suggestions = aggregator.suggestions([item(a, rng)])
+        recovered[f"{a} -> {b}"] = any(b in suggestion for suggestion in suggestions)
+    noise = aggregator.suggestions([item('Product 4321', rng)])
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        aggregator.suggestions(basket(rng, args.tail, 4))
+    suggest_us = (time.perf_counter() - start) / 1000 * 1e6
+
+    print(json.dumps({
+        'benchmark': 'aggregates',
+        'transactions': args.transactions,
+        'simulatedDays': args.days,
+        'updateUs': {
+            str(size): round(sum(samples) / len(samples) * 1e6, 1) for size, samples in sorted(per_size.items())
+        },
+        'suggestUs': round(suggest_us, 1),
+        'counterKeys': {'peak': peak_keys, 'bound': bound},
+        'plantedPairsRecovered': recovered,
+        'longTailSuggestions': noise,
+        'lastHour': {k: v for k, v in aggregator.rollup('hour').items() if k in ('transactions', 'value')},
+    }, indent=2))
+    sys.exit(0 if peak_keys <= bound and all(recovered.values()) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Brand detection benchmark
+Synthesizes N logo-like templates, pastes two of them (scaled and rotated)
+into cluttered frames, and reports per-frame latency, index build time and
+hit rate as the template count grows.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from brand_detector import BrandDetector  # noqa: E402
+
+
+def make_template(rng: np.random.Generator, index: int) -> np.ndarray:
+    img = np.full((120, 200), 255, np.uint8)
+    for _ in range(6):
+        kind = rng.integers(3)
+        color = int(rng.integers(0, 160))
+        p1 = tuple(int(v) for v in rng.integers([0, 0], [200, 120]))
+        p2 = tuple(int(v) for v in rng.integers([0, 0], [200, 120]))
+        if kind == 0:
+            cv2.rectangle(img, p1, p2, color, int(rng.integers(2, 6)))
+        elif kind == 1:
+            cv2.circle(img, p1, int(rng.integers(8, 40)), color, int(rng.integers(2, 6)))
+        else:
+            cv2.line(img, p1, p2, color, int(rng.integers(2, 6)))
+    text = ''.join(chr(int(c)) for c in rng.integers(65, 91, 5))
+    cv2.putText(img, text, (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 1.4, 0, 3)
+    cv2.putText(img, str(index), (140, 110), cv2.FONT_HERSHEY_PLAIN, 1.2, 40, 2)
+    return img
+
+
+def make_frame(rng: np.random.Generator, templates, picks, size=(960, 1280)) -> np.ndarray:
+    frame = rng.integers(150, 230, size, dtype=np.uint8)
+    frame = cv2.GaussianBlur(frame, (5, 5), 0)
+    for slot, index in enumerate(picks):
+        template = templates[index]
+        angle = float(rng.uniform(-12, 12))
+        scale = float(rng.uniform(1.2, 2.0))
+        h, w = template.shape
+        matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, scale)
+        matrix[:, 2] += (100 + slot * 600 - w / 2 + w * scale / 2, 300 - h / 2 + h * scale / 2)
+        warped = cv2.warpAffine(template, matrix, (size[1], size[0]), borderValue=0)
+        mask = cv2.warpAffine(np.full_like(template, 255), matrix, (size[1], size[0]))
+        frame[mask > 0] = warped[mask > 0]
+    return frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--counts', default='4,25,100,250,500')
+    parser.add_argument('--frames', type=int, default=20)
+    parser.add_argument('--budget-ms', type=float, default=150.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    counts = [int(c) for c in args.counts.split(',')]
+    templates = [make_template(rng, i) for i in range(max(counts))]
+
+    results = []
+    for count in counts:
+        detector = BrandDetector(budget_ms=args.budget_ms)
+        start = time.perf_counter()
+        for i in range(count):
+            detector.add_template(f"brand-{i}", templates[i])
+        detector.build()
+        build_ms = (time.perf_counter() - start) * 1000
+
+        latencies, hits, expected = [], 0, 0
+        for _ in range(args.frames):
+            picks = rng.choice(count, size=2, replace=False)
+            frame = make_frame(rng, templates, picks)
+            start = time.perf_counter()
+            found = {hit['brand'] for hit in detector.detect(frame)}
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += sum(f"brand-{p}" in found for p in picks)
+            expected += len(picks)
+
+        latencies.sort()
+        results.append({
+            'templates': len(detector),
+            'buildMs': round(build_ms, 1),
+            'p50Ms': round(latencies[len(latencies) // 2], 1),
+            'p95Ms': round(latencies[int(len(latencies) * 0.95) - 1], 1),
+            'recall': round(hits / expected, 3),
+        })
+        print(json.dumps(results[-1]), file=sys.stderr)
+
+    print(json.dumps({'benchmark': 'brands', 'budgetMs': args.budget_ms, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
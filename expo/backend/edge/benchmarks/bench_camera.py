@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Camera ingestion benchmark
+Plays a recorded counter video through the scene-change detector and reports
+frames read vs. frames sent to OCR, per-frame cost and CPU utilization of
+the ingest loop. Without --video, a fixture is recorded first: an empty
+counter, receipts placed and removed, a hand passing over a receipt that
+stays put, and sensor noise throughout.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from camera_stream import CameraIngest, SceneChangeDetector, VideoSource  # noqa: E402
+from ocr_pipeline import OCRPipeline  # noqa: E402
+
+SIZE = (1280, 720)
+
+
+def receipt(rng: np.random.Generator) -> np.ndarray:
+    page = np.full((420, 300), 250, np.uint8)
+    for i in range(int(rng.integers(4, 8))):
+        text = f"{int(rng.integers(1, 5))} ITEM{int(rng.integers(10, 99))} {float(rng.integers(10, 200)):.2f}"
+        cv2.putText(page, text, (15, 40 + 45 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.7, 20, 2)
+    return page
+
+
+def record_fixture(path: str, fps: int = 15, seed: int = 3) -> int:
+    """Write the fixture video; returns the number of distinct receipt scenes"""
+    rng = np.random.default_rng(seed)
+    counter = cv2.GaussianBlur(rng.integers(90, 140, SIZE[::-1], dtype=np.uint8), (9, 9), 0)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, SIZE)
+
+    def emit(scene, seconds):
+        for _ in range(int(seconds * fps)):
+            noisy = np.clip(scene + rng.normal(0, 3, scene.shape), 0, 255).astype(np.uint8)
+            writer.write(cv2.cvtColor(noisy, cv2.COLOR_GRAY2BGR))
+
+    def with_receipt(page, x):
+        scene = counter.copy()
+        x0 = max(0, x)
+        x1 = min(SIZE[0], x + page.shape[1])
+        if x1 > x0:
+            scene[150:150 + page.shape[0], x0:x1] = page[:, x0 - x:x1 - x]
+        return scene
+
+    scenes = 0
+    emit(counter, 2)
+    for _ in range(3):
+        page = receipt(rng)
+        for x in np.linspace(-300, 500, int(fps * 0.8)):  # slide in
+            emit(with_receipt(page, int(x)), 1 / fps)
+        held = with_receipt(page, 500)
+        emit(held, 3)
+        scenes += 1
+        for x in np.linspace(0, SIZE[0], int(fps * 0.6)):  # hand passes over
+            scene = held.copy()
+            cv2.ellipse(scene, (int(x), 360), (120, 220), 0, 0, 360, 180, -1)
+            emit(scene, 1 / fps)
+        emit(held, 2)
+        for x in np.linspace(500, SIZE[0], int(fps * 0.8)):  # slide out
+            emit(with_receipt(page, int(x)), 1 / fps)
+        emit(counter, 2)
+    writer.release()
+    return scenes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--video', help='recorded counter video (default: generate a fixture)')
+    parser.add_argument('--scenes', type=int, help='distinct receipt scenes in --video')
+    parser.add_argument('--stable-frames', type=int, default=5)
+    parser.add_argument('--realtime', action='store_true', help='pace playback at the recorded fps')
+    args = parser.parse_args()
+
+    video, scenes = args.video, args.scenes
+    if not video:
+        video = os.path.join('/tmp', 'bench_camera_fixture.avi')
+        scenes = record_fixture(video)
+
+    emitted = []
+    ocr = OCRPipeline()
+    source = VideoSource(video, realtime=args.realtime)
+    ingest = CameraIngest(source, on_frame=lambda frame: emitted.append(frame) or True,
+                          detector=SceneChangeDetector(stable_frames=args.stable_frames))
+
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    ingest.run()
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+
+    # Line detection is the OCR work every skipped frame would have cost
+    start = time.perf_counter()
+    lines = [len(ocr.line_images(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))[0]) for frame in emitted]
+    line_ms = (time.perf_counter() - start) * 1000 / max(1, len(emitted))
+
+    stats = ingest.stats
+    print(json.dumps({
+        'benchmark': 'camera',
+        'video': video,
+        'framesRead': stats['framesRead'],
+        'framesOcrd': stats['framesEmitted'],
+        'expectedScenes': scenes,
+        'ocrdFraction': round(stats['framesEmitted'] / max(1, stats['framesRead']), 4),
+        'ingestMsPerFrame': round(wall * 1000 / max(1, stats['framesRead']), 2),
+        'cpuPercent': round(100 * cpu / wall, 1) if wall else None,
+        'linesPerOcrdFrame': lines,
+        'lineDetectMsPerOcrdFrame': round(line_ms, 1),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
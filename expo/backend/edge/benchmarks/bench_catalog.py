@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Product catalog benchmark
+Lookup latency of the indexed SQLite catalog (term -> product, SKU, price
+with store override) vs. today's list scan over product dicts, at 50k SKUs
+by default. Also reports seed time, delta-sync apply time and file size.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog_store import ProductCatalog  # noqa: E402
+
+SYLLABLES = ['ka', 'lu', 'mi', 'po', 'san', 'to', 're', 'ba', 'ngi', 'la', 'de', 'cho', 'vi', 'ta']
+UNITS = ['pc', 'kg', 'L', 'pack', 'bottle', 'can', 'sachet']
+CATEGORIES = ['beverage', 'food', 'snacks', 'staple', 'fresh', 'cooking']
+
+
+def synthetic_products(size: int, rng: random.Random):
+    products = []
+    seen = set()
+    while len(products) < size:
+        name = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(3, 5)))
+        if name in seen:
+            continue
+        seen.add(name)
+        brand = ''.join(rng.choice(SYLLABLES) for _ in range(2)).title()
+        unit = rng.choice(UNITS)
+        products.append({
+            'sku': f"SKU-{len(products):06d}",
+            'name': name,
+            'brand': brand,
+            'localName': f"{name} {rng.choice(['maliit', 'malaki', 'tingi'])}",
+            'variants': [f"{brand} {name}", f"{name}{rng.randint(1, 9)}"],
+            'category': rng.choice(CATEGORIES),
+            'unit': unit,
+            'unitPrice': round(rng.uniform(5, 500), 2),
+            'prices': {'pack': round(rng.uniform(50, 900), 2)},
+            'priority': len(products),
+        })
+    return products
+
+
+def list_scan(term: str, unit: str, products):
+    """What load_product_database/identify_product do today: walk every dict"""
+    term = term.lower()
+    for product in products:
+        if (term == product['name'] or term == product['localName']
+                or any(term == variant.lower() for variant in product['variants'])):
+            price = product['prices'].get(unit, product['unitPrice'])
+            return product['sku'], price
+    return None, None
+
+
+def catalog_lookup(term: str, unit: str, catalog: ProductCatalog):
+    found = catalog.find(term, limit=1)
+    if not found:
+        return None, None
+    sku = found[0]['sku']
+    price = catalog.price(sku, unit)
+    return sku, found[0]['unitPrice'] if price is None else price
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return {
+        'p50Us': round(samples[len(samples) // 2] * 1e6, 1),
+        'p99Us': round(samples[int(len(samples) * 0.99) - 1] * 1e6, 1),
+        'meanUs': round(sum(samples) / len(samples) * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--skus', type=int, default=50000)
+    parser.add_argument('--lookups', type=int, default=2000)
+    parser.add_argument('--scan-lookups', type=int, default=200, help='the list scan is slow; sample fewer')
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    products = synthetic_products(args.skus, rng)
+    path = os.path.join(tempfile.mkdtemp(prefix='bench_catalog_'), 'catalog.db')
+    catalog = ProductCatalog(path, store_id='SM-001')
+
+    start = time.perf_counter()
+    catalog.upsert_products(products)
+    seed_s = time.perf_counter() - start
+
+    # A tenth of the store's prices are overridden locally
+    overrides = [{'sku': p['sku'], 'unit': p['unit'], 'price': p['unitPrice'] + 1} for p in products[::10]]
+    catalog.set_store_prices(overrides)
+
+    # A typical incremental sync: 500 changed products and 100 price edits
+    delta = {
+        'products': [dict(p, unitPrice=p['unitPrice'] + 0.5) for p in rng.sample(products, 500)],
+        'storePrices': [dict(o, price=o['price'] + 1) for o in overrides[:100]],
+        'cursor': '2026-01-01T00:00:00Z',
+    }
+    start = time.perf_counter()
+    catalog.apply_delta(delta)
+    delta_ms = (time.perf_counter() - start) * 1000
+
+    def queries(count):
+        picks = [rng.choice(products) for _ in range(count)]
+        return [(rng.choice([p['name'], p['localName'], p['variants'][0]]), rng.choice([p['unit'], 'pack']), p)
+                for p in picks]
+
+    results = []
+    for mode, lookup, count in (('list-scan', lambda t, u: list_scan(t, u, products), args.scan_lookups),
+                                ('sqlite-indexed', lambda t, u: catalog_lookup(t, u, catalog), args.lookups)):
+        samples, correct = [], 0
+        for term, unit, product in queries(count):
+            start = time.perf_counter()
+            sku, _ = lookup(term, unit)
+            samples.append(time.perf_counter() - start)
+            correct += sku == product['sku']
+        results.append(dict(mode=mode, lookups=count, accuracy=round(correct / count, 3), **percentiles(samples)))
+
+    # Point queries on their own: SKU fetch and price with store override
+    skus = [rng.choice(products)['sku'] for _ in range(args.lookups)]
+    samples = []
+    for sku in skus:
+        start = time.perf_counter()
+        catalog.price(sku, 'pc')
+        samples.append(time.perf_counter() - start)
+    results.append(dict(mode='sqlite-price-only', lookups=len(skus), **percentiles(samples)))
+
+    catalog.close()
+    print(json.dumps({
+        'benchmark': 'catalog',
+        'skus': args.skus,
+        'seedS': round(seed_s, 2),
+        'deltaApplyMs': round(delta_ms, 1),
+        'fileMb': round(os.path.getsize(path) / 1e6, 1),
+        'results': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
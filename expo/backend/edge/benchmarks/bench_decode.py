@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Receipt image ingestion benchmark
+Runs the old path (read the file, full-resolution BGR imdecode, grayscale
+conversion, binarize into new arrays) and the new one (mmap the file,
+reduced-scale grayscale decode, binarize into reused buffers) over
+synthetic 12 MP receipt photos, each mode in a fresh interpreter so peak
+RSS is its own. Reports latency per image, peak memory above the
+interpreter's baseline, and how many text lines each path still finds.
+Camera frames are compared the same way (new gray array per frame vs. the
+reused buffer).
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_ingest import ImageDecoder  # noqa: E402
+from ocr_pipeline import binarize, find_text_lines  # noqa: E402
+
+MODES = ('decode-before', 'decode-after', 'frame-before', 'frame-after')
+
+
+def synthesize_photo(path: str, seed: int, size=(3000, 4000)):
+    """A receipt page photographed on a counter, saved as a phone-quality JPEG"""
+    rng = np.random.default_rng(seed)
+    h, w = size
+    photo = np.empty((h, w, 3), np.uint8)
+    photo[:] = (90, 110, 130)
+    x0, x1 = w // 4, 3 * w // 4
+    photo[200:h - 200, x0:x1] = (235, 238, 240)
+    for i in range(40):
+        y = 320 + i * 60
+        text = f"{rng.integers(1, 5)} ITEM {i:02d} PRODUCT NAME   {rng.integers(5, 500)}.00"
+        cv2.putText(photo, text, (x0 + 60, y), cv2.FONT_HERSHEY_SIMPLEX, 1.4, (30, 30, 30), 3)
+    noise = rng.normal(0, 6, photo.shape).astype(np.int16)
+    photo = np.clip(photo.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+    cv2.imwrite(path, photo, [cv2.IMWRITE_JPEG_QUALITY, 92])
+
+
+def _status_mb(field: str) -> float:
+    """VmRSS/VmHWM from /proc; ru_maxrss elsewhere (it survives exec, so less exact)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def reset_peak() -> float:
+    """Restart peak tracking at the current RSS and return it"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+    return _status_mb('VmRSS')
+
+
+def run_mode(mode: str, paths, repeat: int, max_side: int) -> dict:
+    decoder = ImageDecoder(max_side=max_side)
+    frame = np.full((1080, 1920, 3), 128, np.uint8)  # a camera frame
+    baseline = reset_peak()
+    blurred = binary = None
+    samples, lines = [], 0
+    for _ in range(repeat):
+        for path in paths:
+            start = time.perf_counter()
+            if mode == 'decode-before':
+                with open(path, 'rb') as f:
+                    img = cv2.imdecode(np.frombuffer(f.read(), np.uint8), cv2.IMREAD_COLOR)
+                gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+                bw = binarize(gray)
+            elif mode == 'decode-after':
+                gray = decoder.decode(path)
+                if blurred is None or blurred.shape != gray.shape:
+                    blurred, binary = np.empty_like(gray), np.empty_like(gray)
+                bw = binarize(gray, blurred, binary)
+            elif mode == 'frame-before':
+                bw = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            else:
+                bw = decoder.gray(frame)
+            samples.append(time.perf_counter() - start)
+            if mode.startswith('decode'):
+                lines = len(find_text_lines(bw))
+    samples.sort()
+    return {
+        'mode': mode,
+        'shape': list(bw.shape),
+        'meanMs': round(sum(samples) / len(samples) * 1000, 2),
+        'p95Ms': round(samples[int(len(samples) * 0.95)] * 1000, 2),
+        'peakMemMb': round(_status_mb('VmHWM') - baseline, 1),
+        'textLines': lines if mode.startswith('decode') else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--images', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-side', type=int, default=2000)
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--paths', nargs='*', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.paths, args.repeat, args.max_side)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(args.images):
+            paths.append(os.path.join(tmp, f"receipt_{i}.jpg"))
+            synthesize_photo(paths[-1], i)
+        results = {}
+        for mode in MODES:
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--mode', mode, '--repeat', str(args.repeat),
+                 '--max-side', str(args.max_side), '--paths', *paths],
+                check=True, capture_output=True, text=True
+            )
+            results[mode] = json.loads(out.stdout)
+
+    print(json.dumps({
+        'benchmark': 'decode',
+        'image': '4000x3000 JPEG',
+        'maxSide': args.max_side,
+        'results': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Fuzzy product matching benchmark
+Builds the phonetic trigram index over the seed products plus 50k synthetic
+SKUs and reports build time, per-segment latency and accuracy on a fixed set
+of misheard product phrases (Whisper-style misspellings and Filipino
+spellings), including phrases that must not match anything. Synthetic SKUs
+are also queried with random one-letter typos. Exits non-zero when top-1
+accuracy on the misheard set drops below --min-accuracy.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_catalog import percentiles, synthetic_products  # noqa: E402
+from fuzzy_index import FuzzyIndex  # noqa: E402
+
+# name -> lookup terms, as the processor seeds its catalog
+SEED_PRODUCTS = {
+    'Rice': ['rice', 'bigas'],
+    'Eggs': ['eggs', 'itlog'],
+    'Cooking Oil': ['cooking oil', 'mantika'],
+    'Salt': ['salt', 'asin'],
+    'Sugar': ['sugar', 'asukal'],
+    'Milk': ['milk', 'gatas'],
+    'Bread': ['bread', 'tinapay'],
+    'Coke': ['coke', 'coca-cola', 'cola'],
+    'Pancit Canton': ['pancit canton', 'lucky me', 'canton', 'pancit'],
+    'Chippy': ['chippy', 'jack n jill', 'jack'],
+}
+
+# (what the recognizer heard, expected product or None)
+MISHEARD = [
+    ('koka', 'Coke'),
+    ('coka', 'Coke'),
+    ('kok', 'Coke'),
+    ('coca kola', 'Coke'),
+    ('koka kola', 'Coke'),
+    ('kola', 'Coke'),
+    ('lucky mi', 'Pancit Canton'),
+    ('laki mi', 'Pancit Canton'),
+    ('lucki me', 'Pancit Canton'),
+    ('pansit', 'Pancit Canton'),
+    ('pansit kanton', 'Pancit Canton'),
+    ('kanton', 'Pancit Canton'),
+    ('tsipi', 'Chippy'),
+    ('chipy', 'Chippy'),
+    ('chipi', 'Chippy'),
+    ('jak en jil', 'Chippy'),
+    ('bigass', 'Rice'),
+    ('begas', 'Rice'),
+    ('itlug', 'Eggs'),
+    ('itlog na', 'Eggs'),
+    ('mantica', 'Cooking Oil'),
+    ('mantiqa', 'Cooking Oil'),
+    ('asucar', 'Sugar'),
+    ('asukar', 'Sugar'),
+    ('gatass', 'Milk'),
+    ('tinapai', 'Bread'),
+    ('tinapa', 'Bread'),
+    ('pabili po ng asucal', 'Sugar'),
+    ('yung koka po', 'Coke'),
+    ('salamat po', None),
+    ('magkano', None),
+    ('sukli', None),
+    ('pabili po', None),
+    ('ano pa', None),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--skus', type=int, default=50000)
+    parser.add_argument('--typo-queries', type=int, default=2000)
+    parser.add_argument('--rounds', type=int, default=20, help='passes over the misheard set for timing')
+    parser.add_argument('--min-accuracy', type=float, default=0.9)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    products = synthetic_products(args.skus, rng)
+
+    start = time.perf_counter()
+    index = FuzzyIndex()
+    for priority, (name, terms) in enumerate(SEED_PRODUCTS.items()):
+        for term in terms:
+            index.add(term, {'name': name}, priority)
+    for product in products:
+        for term in (product['name'], product['localName'], product['brand'].lower(), *product['variants']):
+            index.add(term.lower(), {'name': product['name']}, product['priority'] + len(SEED_PRODUCTS))
+    index.build()
+    build_s = time.perf_counter() - start
+
+    samples, correct, false_positives, negatives, failures = [], 0, 0, 0, []
+    for round_index in range(args.rounds):
+        for heard, expected in MISHEARD:
+            words = heard.split()
+            start = time.perf_counter()
+            candidates, _, _ = index.best_span(words)
+            samples.append(time.perf_counter() - start)
+            if round_index:
+                continue
+            got = candidates[0].value['name'] if candidates else None
+            if expected is None:
+                negatives += 1
+                false_positives += got is not None
+            correct += got == expected
+            if got != expected:
+                failures.append({'heard': heard, 'expected': expected, 'got': got})
+    accuracy = correct / len(MISHEARD)
+
+    # One-letter typos of synthetic names: top-1 and top-5 recall
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    typo_samples, top1, top5 = [], 0, 0
+    for product in rng.sample(products, args.typo_queries):
+        name = product['name']
+        pos = rng.randrange(len(name))
+        typo = name[:pos] + rng.choice(letters) + name[pos + 1:]
+        start = time.perf_counter()
+        candidates = index.search(typo)
+        typo_samples.append(time.perf_counter() - start)
+        names = [c.value['name'] for c in candidates]
+        top1 += bool(names) and names[0] == name
+        top5 += name in names
+
+    print(json.dumps({
+        'benchmark': 'fuzzy',
+        'skus': args.skus + len(SEED_PRODUCTS),
+        'indexedTerms': len(index),
+        'buildS': round(build_s, 2),
+        'misheard': {
+            'queries': len(MISHEARD),
+            'accuracy': round(accuracy, 3),
+            'falsePositives': f"{false_positives}/{negatives}",
+            'segmentLatency': percentiles(samples),
+            'failures': failures,
+        },
+        'typos': {
+            'queries': args.typo_queries,
+            'top1': round(top1 / args.typo_queries, 3),
+            'top5': round(top5 / args.typo_queries, 3),
+            'latency': percentiles(typo_samples),
+        },
+    }, indent=2))
+    sys.exit(0 if accuracy >= args.min_accuracy else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Lexicon matcher benchmark
+Per-segment latency of the compiled Aho-Corasick lexicon vs. the old
+linear substring walk, as the product catalog grows
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexicon import LexiconMatcher  # noqa: E402
+
+NUMBER_WORDS = {
+    'isa': 1, 'dalawa': 2, 'tatlo': 3, 'apat': 4, 'lima': 5,
+    'anim': 6, 'pito': 7, 'walo': 8, 'siyam': 9, 'sampu': 10,
+}
+UNITS = {
+    'piraso': 'pc', 'kilo': 'kg', 'litro': 'L', 'dosena': 'dozen',
+    'tali': 'bundle', 'pakete': 'pack', 'bote': 'bottle', 'lata': 'can', 'sakto': 'sachet'
+}
+SYLLABLES = ['ka', 'lu', 'mi', 'po', 'san', 'to', 're', 'ba', 'ngi', 'la', 'de', 'cho', 'vi', 'ta']
+
+
+def synthetic_catalog(size: int, rng: random.Random):
+    """Generate a catalog of unique product names with 3 variants each"""
+    catalog = []
+    seen = set()
+    while len(catalog) < size:
+        name = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        brand = ''.join(rng.choice(SYLLABLES) for _ in range(2))
+        if name in seen:
+            continue
+        seen.add(name)
+        catalog.append({
+            'name': name,
+            'brand': brand,
+            'variants': [name, f"{brand} {name}", f"{name}{rng.randint(1, 9)}"],
+            'category': 'food',
+        })
+    return catalog
+
+
+def naive_parse(segment: str, catalog):
+    """The pre-lexicon strip-and-scan algorithm"""
+    quantity = 1
+    for word, num in NUMBER_WORDS.items():
+        if word in segment:
+            quantity = num
+            segment = segment.replace(word, '').strip()
+            break
+    unit = 'pc'
+    for filipino_unit, standard_unit in UNITS.items():
+        if filipino_unit in segment:
+            unit = standard_unit
+            segment = segment.replace(filipino_unit, '').strip()
+            break
+    for product in catalog:
+        if any(variant.lower() in segment for variant in product['variants']):
+            return quantity, unit, product['name']
+    return quantity, unit, None
+
+
+def compiled_parse(segment: str, lexicon: LexiconMatcher):
+    quantity, unit, product = None, None, None
+    for match in lexicon.scan(segment):
+        kind = match.entry.kind
+        if kind in ('number', 'numeral') and quantity is None:
+            quantity = match.entry.value
+        elif kind == 'unit' and unit is None:
+            unit = match.entry.value
+        elif kind == 'product' and (product is None or match.entry.priority < product.priority):
+            product = match.entry
+    return quantity or 1, unit or 'pc', product.value if product else None
+
+
+def build_lexicon(catalog) -> LexiconMatcher:
+    lexicon = LexiconMatcher()
+    for word, num in NUMBER_WORDS.items():
+        lexicon.add(word, 'number', num)
+    for word, unit in UNITS.items():
+        lexicon.add(word, 'unit', unit)
+    for priority, product in enumerate(catalog):
+        for variant in product['variants']:
+            lexicon.add(variant, 'product', product['name'], priority)
+    return lexicon.build()
+
+
+def segments_for(catalog, count: int, rng: random.Random):
+    words = list(NUMBER_WORDS)
+    units = list(UNITS)
+    return [
+        f"{rng.choice(words)}ng {rng.choice(units)} {rng.choice(catalog)['variants'][rng.randint(0, 1)]}"
+        for _ in range(count)
+    ]
+
+
+def time_per_call(fn, segments) -> float:
+    start = time.perf_counter()
+    for segment in segments:
+        fn(segment)
+    return (time.perf_counter() - start) / len(segments) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='10,100,1000,5000,20000')
+    parser.add_argument('--segments', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = []
+    for size in (int(s) for s in args.sizes.split(',')):
+        catalog = synthetic_catalog(size, rng)
+        segments = segments_for(catalog, args.segments, rng)
+
+        start = time.perf_counter()
+        lexicon = build_lexicon(catalog)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        results.append({
+            'catalogSize': size,
+            'terms': len(lexicon),
+            'buildMs': round(build_ms, 2),
+            'naiveUsPerSegment': round(time_per_call(lambda s: naive_parse(s, catalog), segments), 2),
+            'compiledUsPerSegment': round(time_per_call(lambda s: compiled_parse(s, lexicon), segments), 2),
+        })
+        print(json.dumps(results[-1]), file=sys.stderr)
+
+    print(json.dumps({'benchmark': 'lexicon', 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
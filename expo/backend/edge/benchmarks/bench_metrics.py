@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Metrics overhead benchmark
+Measures the per-call cost of histogram observations, stage timers and
+counter increments from several threads, and the time to render a scrape
+of a populated registry. Prints a JSON report.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import MetricsRegistry  # noqa: E402
+
+STAGES = ('decode', 'preprocess', 'ocr', 'stt', 'parse', 'serialize', 'upload')
+
+
+def per_call_ns(fn, calls: int, threads: int) -> float:
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        for _ in range(calls):
+            fn()
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    return (time.perf_counter() - start) / (calls * threads) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=200_000, help='calls per thread')
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+
+    def observe():
+        registry.observe('edge_stage_seconds', 0.004, stage='ocr')
+
+    def timer():
+        with registry.timer('parse'):
+            pass
+
+    def inc():
+        registry.inc('edge_errors_total', stage='image')
+
+    def baseline():
+        pass
+
+    results = {name: round(per_call_ns(fn, args.calls, args.threads))
+               for name, fn in (('baseline', baseline), ('observe', observe),
+                                ('timer', timer), ('inc', inc))}
+
+    for stage in STAGES:
+        for _ in range(1000):
+            registry.record_stage(stage, 0.01)
+    registry.gauge('edge_queue_depth', lambda: 3, queue='audio')
+    start = time.perf_counter()
+    rounds = 200
+    for _ in range(rounds):
+        body = registry.render()
+    render_ms = (time.perf_counter() - start) / rounds * 1000
+
+    print(json.dumps({
+        'benchmark': 'metrics',
+        'threads': args.threads,
+        'nsPerCall': results,
+        'renderMs': round(render_ms, 3),
+        'renderBytes': len(body),
+        'summary': registry.summary()['stages']['ocr'],
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
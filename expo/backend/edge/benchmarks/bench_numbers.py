@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Filipino number tokenizer benchmark
+Checks the tokenizer against a corpus of spoken quantities and segment
+splits (compound numerals, teens, fractions, "tig-", peso amounts, Spanish
+and English numbers, decimals), then measures how many transcripts per
+second it segments and reads, next to the old regex split. Exits non-zero
+on any corpus mismatch.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from filipino_numbers import NUMBER_WORDS, split_transaction  # noqa: E402
+
+# (transcript, [(segment, [(value, each, peso), ...]), ...])
+CORPUS = [
+    ('dalawang coke', [('dalawang coke', [(2, False, False)])]),
+    ('apat na itlog', [('apat na itlog', [(4, False, False)])]),
+    ("dalawampu't limang itlog", [("dalawampu't limang itlog", [(25, False, False)])]),
+    ('tatlumpu at dalawang pandesal', [('tatlumpu at dalawang pandesal', [(32, False, False)])]),
+    ('labing-isang lata', [('labing-isang lata', [(11, False, False)])]),
+    ('labindalawang itlog', [('labindalawang itlog', [(12, False, False)])]),
+    ('labing limang piraso', [('labing limang piraso', [(15, False, False)])]),
+    ('isang daang piso', [('isang daang piso', [(100, False, True)])]),
+    ('tatlong daan at limampung piso', [('tatlong daan at limampung piso', [(350, False, True)])]),
+    ('sandaan', [('sandaan', [(100, False, False)])]),
+    ("dalawang libo't limang daan", [("dalawang libo't limang daan", [(2500, False, False)])]),
+    ('kalahating kilo asukal', [('kalahating kilo asukal', [(0.5, False, False)])]),
+    ("isa't kalahating kilo bigas", [("isa't kalahating kilo bigas", [(1.5, False, False)])]),
+    ('isa at kalahating litro', [('isa at kalahating litro', [(1.5, False, False)])]),
+    ('sangkapat na kilo', [('sangkapat na kilo', [(0.25, False, False)])]),
+    ('tig-dalawang coke', [('tig-dalawang coke', [(2, True, False)])]),
+    ('tig-iisang sprite', [('tig-iisang sprite', [(1, True, False)])]),
+    ('tatlong coke tig-bente', [('tatlong coke tig-bente', [(3, False, False), (20, True, False)])]),
+    ('bente singko pesos', [('bente singko pesos', [(25, False, True)])]),
+    ("kwarenta'y singko pesos", [("kwarenta'y singko pesos", [(45, False, True)])]),
+    ('singkwenta pesos na load', [('singkwenta pesos na load', [(50, False, True)])]),
+    ('₱1,250.50', [('₱1,250.50', [(1250.5, False, True)])]),
+    ('two hundred fifty pesos', [('two hundred fifty pesos', [(250, False, True)])]),
+    ('twelve eggs', [('twelve eggs', [(12, False, False)])]),
+    ('1.5 litro coke, dalawang sprite', [
+        ('1.5 litro coke', [(1.5, False, False)]),
+        ('dalawang sprite', [(2, False, False)]),
+    ]),
+    ('2 coke at 3 sprite', [('2 coke', [(2, False, False)]), ('3 sprite', [(3, False, False)])]),
+    ('dalawang coke at tatlong sprite', [
+        ('dalawang coke', [(2, False, False)]),
+        ('tatlong sprite', [(3, False, False)]),
+    ]),
+    ('apat na itlog tsaka isang asin', [('apat na itlog', [(4, False, False)]), ('isang asin', [(1, False, False)])]),
+    ('isang daan at limang piso na load, salamat', [
+        ('isang daan at limang piso na load', [(105, False, True)]),
+        ('salamat', []),
+    ]),
+    ('dalawa at tatlo', [('dalawa', [(2, False, False)]), ('tatlo', [(3, False, False)])]),
+    ('pabili po ng coke', [('pabili po ng coke', [])]),
+    ('coke tatlo', [('coke tatlo', [(3, False, False)])]),
+]
+
+SAMPLE_PHRASES = [
+    "dalawampu't limang itlog", 'kalahating kilo asukal', 'tatlong coke tig-bente', 'isang lucky me',
+    'bente singko pesos na load', '1.5 litro coke', "isa't kalahating kilo bigas", 'apat na pandesal',
+    'labindalawang itlog', 'tatlong daan at limampung piso na bigas',
+]
+JOINERS = [', ', ' at ', ' tsaka ', '. ']
+
+
+def old_split(transcription: str):
+    """The regex split the tokenizer replaced (breaks "1.5" apart)"""
+    segments = re.split(r'[,.]|\s+at\s+|\s+tsaka\s+', transcription.lower())
+    return [segment.strip() for segment in segments if segment.strip()]
+
+
+def transcripts(count: int, rng: random.Random):
+    out = []
+    for _ in range(count):
+        parts = rng.sample(SAMPLE_PHRASES, rng.randint(1, 5))
+        text = parts[0]
+        for part in parts[1:]:
+            text += rng.choice(JOINERS) + part
+        out.append(text)
+    return out
+
+
+def check_corpus():
+    failures = []
+    for text, expected in CORPUS:
+        got = [(s.text, [(q.value, q.each, q.peso) for q in s.quantities]) for s in split_transaction(text)]
+        if got != expected:
+            failures.append({'text': text, 'expected': expected, 'got': got})
+    return failures
+
+
+def throughput(fn, texts, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            fn(text)
+    return round(len(texts) * repeat / (time.perf_counter() - start))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transcripts', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    failures = check_corpus()
+    texts = transcripts(args.transcripts, random.Random(17))
+
+    print(json.dumps({
+        'benchmark': 'numbers',
+        'numberWords': len(NUMBER_WORDS),
+        'corpus': {'cases': len(CORPUS), 'passed': len(CORPUS) - len(failures), 'failures': failures},
+        'transcriptsPerSecond': {
+            'tokenizer': throughput(split_transaction, texts, args.repeat),
+            'oldRegexSplit': throughput(old_split, texts, args.repeat),
+        },
+        'segmentsPerTranscript': round(sum(len(split_transaction(t)) for t in texts) / len(texts), 2),
+    }, indent=2))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Receipt OCR benchmark
+Compares the legacy whole-page path (preprocess_image + one
+pytesseract.image_to_string --psm 6 call) with the ROI pipeline (deskew,
+line detection, parallel per-line recognition) on a receipt corpus.
+
+The corpus is a directory of images with a same-named .txt file listing the
+expected item lines ("<qty> <name> <price>"). Without --corpus, a synthetic
+corpus of skewed, noisy receipts is generated. Requires the tesseract binary.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr_pipeline import OCRPipeline  # noqa: E402
+
+PRODUCTS = [('Lucky Me Canton', 15), ('Coke 1.5L', 65), ('Chippy', 25), ('Bigas 1kg', 55),
+            ('Itlog', 8), ('Mantika', 85), ('Asukal', 45), ('Tinapay', 30)]
+
+
+def synthesize_receipt(rng: np.random.Generator):
+    lines = []
+    for name, price in rng.permutation(PRODUCTS)[:int(rng.integers(3, 7))]:
+        qty = int(rng.integers(1, 5))
+        lines.append(f"{qty} {name} {qty * int(price):.2f}")
+    total = sum(float(line.split()[-1]) for line in lines)
+
+    height = 140 + 45 * (len(lines) + 3)
+    page = np.full((height, 620), 255, np.uint8)
+    cv2.putText(page, 'SARI-SARI STORE', (150, 60), cv2.FONT_HERSHEY_DUPLEX, 1.0, 0, 2)
+    cv2.rectangle(page, (520, 20), (600, 90), 60, -1)  # logo block (non-text)
+    for i, line in enumerate(lines + ['', f"TOTAL {total:.2f}"]):
+        cv2.putText(page, line, (30, 140 + 45 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.9, 0, 2)
+
+    canvas = np.full((height + 200, 820), 235, np.uint8)
+    canvas[100:100 + height, 100:720] = page
+    angle = float(rng.uniform(-6, 6))
+    matrix = cv2.getRotationMatrix2D((410, canvas.shape[0] / 2), angle, 1.0)
+    canvas = cv2.warpAffine(canvas, matrix, (820, canvas.shape[0]), borderValue=235)
+    noise = rng.normal(0, 12, canvas.shape)
+    canvas = np.clip(canvas + noise, 0, 255).astype(np.uint8)
+    return cv2.cvtColor(canvas, cv2.COLOR_GRAY2BGR), lines
+
+
+def load_corpus(directory: str):
+    for path in sorted(glob.glob(os.path.join(directory, '*.png')) + glob.glob(os.path.join(directory, '*.jpg'))):
+        with open(os.path.splitext(path)[0] + '.txt') as f:
+            yield cv2.imread(path), [line.strip() for line in f if line.strip()]
+
+
+def parse_items(text_lines):
+    """The processor's receipt rule: '<int qty> <name> <float price>'"""
+    items = set()
+    for line in text_lines:
+        parts = line.split()
+        if len(parts) >= 3:
+            try:
+                items.add((int(parts[0]), ' '.join(parts[1:-1]).lower(), round(float(parts[-1]), 2)))
+            except ValueError:
+                continue
+    return items
+
+
+def legacy_ocr(img):
+    import pytesseract
+
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    binary = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
+    text = pytesseract.image_to_string(binary, config='--oem 3 --psm 6 -l eng+fil')
+    return text.split('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--corpus', help='directory of receipt images with .txt ground truth')
+    parser.add_argument('--synthetic', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--lang', default='eng+fil')
+    parser.add_argument('--dump', help='write the synthetic corpus here and exit')
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = list(load_corpus(args.corpus))
+    else:
+        rng = np.random.default_rng(5)
+        corpus = [synthesize_receipt(rng) for _ in range(args.synthetic)]
+    if args.dump:
+        os.makedirs(args.dump, exist_ok=True)
+        for i, (img, lines) in enumerate(corpus):
+            cv2.imwrite(os.path.join(args.dump, f"receipt_{i:03d}.png"), img)
+            with open(os.path.join(args.dump, f"receipt_{i:03d}.txt"), 'w') as f:
+                f.write('\n'.join(lines) + '\n')
+        return
+
+    pipeline = OCRPipeline(workers=args.workers, lang=args.lang)
+    modes = {
+        'legacy-whole-page': legacy_ocr,
+        'roi-parallel-lines': lambda img: [line.text for line in pipeline.recognize(img)],
+    }
+
+    results = []
+    for name, ocr in modes.items():
+        elapsed, found, expected = [], 0, 0
+        for img, truth in corpus:
+            start = time.perf_counter()
+            text_lines = ocr(img)
+            elapsed.append(time.perf_counter() - start)
+            truth_items = parse_items(truth)
+            found += len(parse_items(text_lines) & truth_items)
+            expected += len(truth_items)
+        elapsed.sort()
+        results.append({
+            'mode': name,
+            'receipts': len(corpus),
+            'meanMs': round(sum(elapsed) / len(elapsed) * 1000, 1),
+            'p95Ms': round(elapsed[int(len(elapsed) * 0.95) - 1] * 1000, 1),
+            'itemRecall': round(found / expected, 3) if expected else None,
+        })
+    pipeline.close()
+
+    print(json.dumps({'benchmark': 'ocr', 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
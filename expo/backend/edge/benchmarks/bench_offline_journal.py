@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Offline journal benchmark
+Journals N transactions as if the hub were down for days, then replays them
+through a fake sender that is unreachable for the first few batches and
+always rejects a handful of records. Reports append throughput, on-disk
+size, replay throughput and peak RSS, and checks that every other record
+was delivered exactly once and in order while the rejected ones ended up
+dead-lettered.
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from offline_journal import OfflineJournal, ReplayWorker  # noqa: E402
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_transaction(index: int) -> dict:
+    return {
+        'storeId': 'SM-001', 'deviceId': 'RPI-001', 'transactionId': f"TXN-{index:08d}",
+        'timestamp': '2026-01-01T08:00:00',
+        'items': [{'productName': 'Pancit Canton', 'quantity': 3, 'unitPrice': 15.0, 'totalPrice': 45.0}],
+        'totals': {'totalAmount': 45.0, 'totalItems': 3},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--flaky-batches', type=int, default=3)
+    parser.add_argument('--poison', type=int, default=5, help='records the fake hub always rejects')
+    parser.add_argument('--max-attempts', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'journal.db')
+        journal = OfflineJournal(path, flush_max_records=500, max_attempts=args.max_attempts)
+
+        start = time.perf_counter()
+        for i in range(args.records):
+            journal.append(make_transaction(i))
+        journal.flush()
+        append_s = time.perf_counter() - start
+        size_mb = (os.path.getsize(path) + os.path.getsize(path + '-wal')) / 1e6
+
+        delivered = []
+        calls = {'n': 0}
+        step = max(args.records // max(args.poison, 1), 1)
+        poison = {f"TXN-{i:08d}" for i in range(0, args.records, step)[:args.poison]}
+
+        def deliver(batch):
+            calls['n'] += 1
+            if calls['n'] <= args.flaky_batches:
+                return [], batch
+            rejected = [t for t in batch if t['transactionId'] in poison]
+            delivered.extend(t['transactionId'] for t in batch if t['transactionId'] not in poison)
+            return rejected, []
+
+        worker = ReplayWorker(journal, deliver, batch_size=args.batch_size, compact_every=20000)
+        start = time.perf_counter()
+        while True:
+            acked, rejected, undelivered = worker.replay_once()
+            if not acked and not rejected and not undelivered:
+                break
+        replay_s = time.perf_counter() - start
+        journal.compact()
+        compacted_mb = os.path.getsize(path) / 1e6
+
+        in_order = delivered == sorted(delivered)
+        exactly_once = len(delivered) == len(set(delivered)) == args.records - len(poison)
+        dead_lettered = journal.dead_letter_count()
+        journal.close()
+
+    print(json.dumps({
+        'benchmark': 'offline_journal',
+        'records': args.records,
+        'appendPerSecond': round(args.records / append_s),
+        'journalMb': round(size_mb, 2),
+        'replayPerSecond': round(args.records / replay_s),
+        'compactedMb': round(compacted_mb, 2),
+        'peakRssMb': round(peak_rss_mb(), 1),
+        'inOrder': in_order,
+        'exactlyOnce': exactly_once,
+        'deadLettered': dead_lettered,
+        'poisonDeadLettered': dead_lettered == len(poison),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Receipt parser benchmark
+Checks the structured receipt parser against a corpus of receipt layouts
+(peso signs, thousands separators, "x2" and "@" quantities, prices on the
+next line, quantity/unit-price columns, tax flags, OCR digit confusions,
+headers and payment footers, subtotal/discount/total checks), next to the
+whitespace-split parser it replaced, then measures lines per second.
+Receipts are printed text: word boxes are estimated from character
+positions, as for a monospaced thermal printout. Exits non-zero on any
+corpus mismatch.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr_types import OCRLine  # noqa: E402
+from receipt_parser import parse_receipt  # noqa: E402
+
+# (name, lines, [(name, quantity, total), ...], balanced)
+CORPUS = [
+    ('plain', [
+        '2 COKE 1.5L 130.00',
+        '1 LUCKY ME CANTON 15.00',
+        'TOTAL 145.00',
+    ], [('COKE 1.5L', 2, 130.0), ('LUCKY ME CANTON', 1, 15.0)], True),
+    ('peso signs and commas', [
+        'RICE 25KG            ₱1,250.00',
+        'COOKING OIL 1L         ₱95.00',
+        'TOTAL              ₱1,345.00',
+    ], [('RICE 25KG', 1, 1250.0), ('COOKING OIL 1L', 1, 95.0)], True),
+    ('detached peso sign', [
+        'SARDINES 155G     ₱  28.50',
+        'TOTAL             ₱  28.50',
+    ], [('SARDINES 155G', 1, 28.5)], True),
+    ('x quantities', [
+        'COKE 1.5L      x2     130.00',
+        'CHIPPY         3x      75.00',
+        'TOTAL                 205.00',
+    ], [('COKE 1.5L', 2, 130.0), ('CHIPPY', 3, 75.0)], True),
+    ('price on next line', [
+        'LUCKY ME PANCIT CANTON',
+        '   3 @ 15.00           45.00',
+        'NESCAFE 3IN1',
+        '                       12.00',
+        'TOTAL                  57.00',
+    ], [('LUCKY ME PANCIT CANTON', 3, 45.0), ('NESCAFE 3IN1', 1, 12.0)], True),
+    ('unit price on next line only', [
+        'PANDESAL',
+        '   10 @ 2.50',
+        'TOTAL                  25.00',
+    ], [('PANDESAL', 10, 25.0)], True),
+    ('quantity column', [
+        'ITLOG          12    8.00    96.00',
+        'ASIN            1   20.00    20.00',
+        'KAPE            4    6.00    24.00',
+        'SUBTOTAL                    140.00',
+        'TOTAL                       140.00',
+    ], [('ITLOG', 12, 96.0), ('ASIN', 1, 20.0), ('KAPE', 4, 24.0)], True),
+    ('tax flags', [
+        'CHIPPY              25.00 V',
+        'SAFEGUARD 60G       38.00 V',
+        'PANDESAL            20.00 X',
+        'TOTAL               83.00',
+    ], [('CHIPPY', 1, 25.0), ('SAFEGUARD 60G', 1, 38.0), ('PANDESAL', 1, 20.0)], True),
+    ('header and payment footer', [
+        "ALING NENA'S SARI-SARI STORE",
+        'BRGY. SAN ISIDRO, QUEZON CITY',
+        'OR# 000123   10/17/2026 14:02',
+        '2 ITLOG 16.00',
+        '1 ASIN 20.00',
+        'TOTAL 36.00',
+        'CASH 50.00',
+        'CHANGE 14.00',
+    ], [('ITLOG', 2, 16.0), ('ASIN', 1, 20.0)], True),
+    ('subtotal and discount', [
+        'GATAS 300ML        45.00',
+        'TINAPAY            55.00',
+        'SUBTOTAL          100.00',
+        'LESS 5% DISC        5.00',
+        'TOTAL              95.00',
+    ], [('GATAS 300ML', 1, 45.0), ('TINAPAY', 1, 55.0)], True),
+    ('discount without subtotal', [
+        'BIGAS 1KG          55.00',
+        'SC DISC            11.00',
+        'AMOUNT DUE         44.00',
+    ], [('BIGAS 1KG', 1, 55.0)], True),
+    ('ocr digit confusion', [
+        '1 ASIN 2O.OO',
+        '2 COKE MISMO l5.00',
+        'TOTAL 35.00',
+    ], [('ASIN', 1, 20.0), ('COKE MISMO', 2, 15.0)], True),
+    ('numbers inside names', [
+        '555 SARDINES        28.00',
+        'ALASKA 370ML        42.00',
+        'TOTAL               70.00',
+    ], [('555 SARDINES', 1, 28.0), ('ALASKA 370ML', 1, 42.0)], True),
+    ('unit price and total', [
+        'COKE 1.5L    2 @ 65.00   130.00',
+        'TOTAL                    130.00',
+    ], [('COKE 1.5L', 2, 130.0)], True),
+    ('total qty line', [
+        'MILO 24G           10.00',
+        'TOTAL ITEMS 1',
+        'TOTAL              10.00',
+    ], [('MILO 24G', 1, 10.0)], True),
+    ('missed line', [
+        '2 COKE 1.5L 130.00',
+        '1 LUCKY ME CANTON 15.00',
+        'TOTAL 160.00',
+    ], [('COKE 1.5L', 2, 130.0), ('LUCKY ME CANTON', 1, 15.0)], False),
+    ('no total printed', [
+        '3 CHIPPY 75.00',
+    ], [('CHIPPY', 3, 75.0)], None),
+]
+
+
+def receipt_lines(lines):
+    return [OCRLine(text, 0.9, (0, 24 * i, len(text) * 10, 20)) for i, text in enumerate(lines)]
+
+
+def old_parse(lines):
+    """The whitespace split parse_receipt_text replaced"""
+    items = []
+    for ocr_line in lines:
+        line = ocr_line.text.strip()
+        if not line or 'TOTAL' in line.upper():
+            continue
+        parts = line.split()
+        if len(parts) >= 2:
+            try:
+                quantity = int(parts[0])
+                items.append((' '.join(parts[1:-1]), quantity, float(parts[-1])))
+            except (ValueError, IndexError):
+                continue
+    return items
+
+
+def check():
+    failures = []
+    old_passed = 0
+    for name, lines, expected, balanced in CORPUS:
+        result = parse_receipt(receipt_lines(lines))
+        got = [(item.name, item.quantity, item.total) for item in result.items]
+        if got != expected or result.balanced != balanced:
+            failures.append({'receipt': name, 'expected': expected, 'got': got, 'balanced': result.balanced})
+        old_passed += old_parse(receipt_lines(lines)) == expected
+    return failures, old_passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--receipts', type=int, default=5000)
+    args = parser.parse_args()
+
+    failures, old_passed = check()
+
+    rng = random.Random(21)
+    receipts = [receipt_lines(rng.choice(CORPUS)[1]) for _ in range(args.receipts)]
+    total_lines = sum(len(lines) for lines in receipts)
+    timings = {}
+    for label, fn in (('parser', parse_receipt), ('oldSplit', old_parse)):
+        start = time.perf_counter()
+        for lines in receipts:
+            fn(lines)
+        timings[label] = round(total_lines / (time.perf_counter() - start))
+
+    print(json.dumps({
+        'benchmark': 'receipts',
+        'corpus': {'receipts': len(CORPUS), 'passed': len(CORPUS) - len(failures), 'failures': failures},
+        'oldSplitPassed': old_passed,
+        'linesPerSecond': timings,
+    }, indent=2))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Catalog hot-reload benchmark
+Parser threads parse transcripts continuously against the live catalog
+snapshot while the main thread applies catalog deltas and triggers
+background rebuilds of the lexicon and fuzzy index. Reports snapshot build
+time, the swap itself, and parse latency with and without a rebuild in
+flight. Every parse takes one snapshot and checks that it saw the lexicon
+and fuzzy index of the same version.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_catalog import percentiles, synthetic_products  # noqa: E402
+from catalog_snapshot import CatalogSnapshot, SnapshotManager  # noqa: E402
+from catalog_store import ProductCatalog  # noqa: E402
+from filipino_numbers import split_transaction  # noqa: E402
+from fuzzy_index import FuzzyIndex  # noqa: E402
+from lexicon import LexiconMatcher  # noqa: E402
+
+UNITS = {'piraso': 'pc', 'kilo': 'kg', 'litro': 'L', 'pakete': 'pack', 'bote': 'bottle', 'lata': 'can'}
+
+
+def build_fn(catalog: ProductCatalog):
+    def build(previous, version, reason):
+        start = time.perf_counter()
+        lexicon, fuzzy = LexiconMatcher(), FuzzyIndex()
+        for unit, standard in UNITS.items():
+            lexicon.add(unit, 'unit', standard)
+        products = 0
+        for product in catalog.iter_products():
+            products += 1
+            info = {'sku': product['sku'], 'name': product['name'], 'version': version}
+            for term in product['terms']:
+                lexicon.add(term, 'product', info, product['priority'])
+                fuzzy.add(term, info, product['priority'])
+        return CatalogSnapshot(
+            version=version, source=reason, lexicon=lexicon.build(), fuzzy=fuzzy.build(), units=UNITS,
+            category_prices={}, brand_templates={}, brand_detector=None, products=products,
+            build_seconds=time.perf_counter() - start
+        )
+    return build
+
+
+def parse(manager: SnapshotManager, text: str) -> bool:
+    """Parse like the processor; False when one parse mixed snapshot versions"""
+    snapshot = manager.current
+    seen = set()
+    for segment in split_transaction(text):
+        matches = snapshot.lexicon.scan(segment.text)
+        product = next((m.entry for m in matches if m.entry.kind == 'product'), None)
+        if product is not None:
+            seen.add(product.value['version'])
+        else:
+            candidates, _, _ = snapshot.fuzzy.best_span(segment.text.split())
+            seen.update(c.value['version'] for c in candidates[:1])
+    return seen <= {snapshot.version}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--skus', type=int, default=5000)
+    parser.add_argument('--reloads', type=int, default=5)
+    parser.add_argument('--delta', type=int, default=200, help='products changed per reload')
+    parser.add_argument('--readers', type=int, default=1)
+    parser.add_argument('--idle', type=float, default=1.0, help='seconds between reloads')
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    products = synthetic_products(args.skus, rng)
+    texts = [
+        ', '.join(f"{rng.choice(['isang', 'dalawang', 'tatlong'])} {rng.choice(products)['name']}"
+                  for _ in range(rng.randint(1, 4)))
+        for _ in range(500)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = ProductCatalog(os.path.join(tmp, 'catalog.db'))
+        catalog.upsert_products(products)
+        manager = SnapshotManager(build_fn(catalog))
+        manager.reload('startup')
+
+        reloading = threading.Event()
+        stop = threading.Event()
+        idle_samples, reload_samples, mixed = [], [], [0]
+
+        def reader(seed: int):
+            local = random.Random(seed)
+            while not stop.is_set():
+                text = local.choice(texts)
+                during = reloading.is_set()
+                start = time.perf_counter()
+                consistent = parse(manager, text)
+                elapsed = time.perf_counter() - start
+                (reload_samples if during or reloading.is_set() else idle_samples).append(elapsed)
+                mixed[0] += not consistent
+
+        threads = [threading.Thread(target=reader, args=(i,), daemon=True) for i in range(args.readers)]
+        for thread in threads:
+            thread.start()
+
+        builds, swaps = [], []
+        for index in range(args.reloads):
+            time.sleep(args.idle)
+            reloading.set()
+            for product in rng.sample(products, args.delta):
+                product['unitPrice'] = round(product['unitPrice'] * 1.05, 2)
+            catalog.upsert_products(products[:args.delta] + [dict(
+                products[0], sku=f"NEW-{index}-{i}", name=f"bagong produkto {index} {i}", priority=args.skus + i
+            ) for i in range(10)])
+            manager.request_reload('bench')
+            manager.wait_idle()
+            reloading.clear()
+            builds.append(manager.current.build_seconds)
+            swaps.append(manager.last_swap_seconds)
+        time.sleep(args.idle)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        catalog.close()
+
+    print(json.dumps({
+        'benchmark': 'catalog-reload',
+        'skus': args.skus,
+        'readers': args.readers,
+        'reloads': args.reloads,
+        'finalVersion': manager.version,
+        'buildS': {'mean': round(sum(builds) / len(builds), 3), 'max': round(max(builds), 3)},
+        'swapUs': {'max': round(max(swaps) * 1e6, 2)},
+        'parse': {
+            'idle': dict(percentiles(idle_samples), count=len(idle_samples)) if idle_samples else None,
+            'duringReload': dict(percentiles(reload_samples), count=len(reload_samples)) if reload_samples else None,
+        },
+        'mixedVersionParses': mixed[0],
+    }, indent=2))
+    sys.exit(1 if mixed[0] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Transaction serialization benchmark
+Encode time and payload size per transaction for the old path
+(dataclasses.asdict + json.dumps indent=2) vs. the compact, versioned
+encoders in transaction_format, plus per-item memory with and without
+__slots__. Runs with whichever of orjson/msgpack are installed.
+"""
+
+import argparse
+import dataclasses
+import gzip
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import transaction_format as tf  # noqa: E402
+from transaction_format import TransactionItem, TransactionOutput  # noqa: E402
+
+# The pre-slots dataclass, rebuilt from the same field list
+LegacyItem = dataclasses.make_dataclass(
+    'LegacyItem',
+    [(f.name, f.type, dataclasses.field(default=f.default)) if f.default is not dataclasses.MISSING
+     else (f.name, f.type) for f in dataclasses.fields(TransactionItem)]
+)
+
+
+def sample_transaction(items: int) -> TransactionOutput:
+    rows = [
+        TransactionItem(
+            brandName='Coca-Cola' if i % 2 else None, productName=f"Product {i}", genericName='Softdrink',
+            localName='sopdrinks' if i % 3 else None, sku=f"COC-PROD-{i:08X}", quantity=i % 4 + 1, unit='pc',
+            unitPrice=65.0, totalPrice=65.0 * (i % 4 + 1), category='beverage', isUnbranded=not i % 2,
+            isBulk=False, detectionMethod='stt', confidence=0.85,
+            brandConfidence=0.9 if i % 2 else None, suggestedBrands=['Coca-Cola', 'Pepsi'] if i % 2 else None
+        )
+        for i in range(items)
+    ]
+    return TransactionOutput(
+        storeId='SM-001', deviceId='RPI-001', timestamp='2026-01-01T08:00:00.000000',
+        transactionId='TXN-1767225600', items=rows,
+        totals={'totalAmount': 650.0, 'totalItems': 20, 'brandedAmount': 325.0, 'unbrandedAmount': 325.0,
+                'brandedCount': 5, 'unbrandedCount': 5},
+        insights={'brandedVsUnbranded': {'brandedPercentage': 50.0, 'unbrandedPercentage': 50.0},
+                  'topCategories': [{'category': 'beverage', 'count': 20, 'value': 650.0}],
+                  'suggestions': ['Consider promoting branded alternatives']},
+        paymentMethod='cash', processingTime=0.5, edgeVersion='v1.0.0'
+    )
+
+
+def time_per_call(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def item_memory(cls, count: int) -> float:
+    tracemalloc.start()
+    items = [cls('Coca-Cola', 'Coke', None, None, 'SKU', 1, 'pc', 65.0, 65.0, 'beverage', False, False, 'stt', 0.85)
+             for _ in range(count)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+    return size / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=10, help='items per transaction')
+    parser.add_argument('--iterations', type=int, default=5000)
+    args = parser.parse_args()
+
+    output = sample_transaction(args.items)
+    data = tf.to_dict(output)
+
+    modes = {
+        'asdict+json-indent2 (old)': lambda: json.dumps(dataclasses.asdict(output), indent=2, default=str).encode(),
+        'asdict+json-compact': lambda: json.dumps(dataclasses.asdict(output), separators=(',', ':'),
+                                                  default=str).encode(),
+        'to_dict+dumps (upload)': lambda: tf.dumps(tf.to_dict(output)),
+        'to_dict+pack (journal)': lambda: tf.pack(tf.to_dict(output)),
+    }
+
+    results = []
+    for name, fn in modes.items():
+        payload = fn()
+        results.append({
+            'mode': name,
+            'encodeUs': round(time_per_call(fn, args.iterations), 1),
+            'bytes': len(payload),
+            'gzipBytes': len(gzip.compress(payload, compresslevel=6)),
+        })
+
+    # The decode side of the journal round trip
+    packed = tf.pack(data)
+    assert tf.unpack(packed)['transactionId'] == output.transactionId
+
+    print(json.dumps({
+        'benchmark': 'serialization',
+        'itemsPerTransaction': args.items,
+        'orjson': tf.orjson is not None,
+        'msgpack': tf.msgpack is not None,
+        'schemaVersion': tf.SCHEMA_VERSION,
+        'results': results,
+        'decodeJournalUs': round(time_per_call(lambda: tf.unpack(packed), args.iterations), 1),
+        'itemBytes': {
+            'slots': round(item_memory(TransactionItem, 10000)),
+            'dict': round(item_memory(LegacyItem, 10000)),
+        },
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
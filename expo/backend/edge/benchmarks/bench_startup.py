@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark
+Starts the edge processor in a fresh interpreter per role (EDGE_ROLE
+parse, voice, ocr, full) and reports module import time, processor
+construction time, the first parsed transcript, resident memory after it,
+and which heavy dependencies each role pulled in. A parse-only device
+should come up in under 300 ms and 50 MB; the slowest imports from
+`python -X importtime` are listed per role. Exits
+non-zero when the parse role misses its targets.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+EDGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROLES = ('parse', 'voice', 'ocr', 'full')
+HEAVY = ('cv2', 'numpy', 'requests', 'whisper', 'faster_whisper', 'torch', 'tesserocr', 'pytesseract', 'PIL',
+         'speech_recognition', 'pyaudio')
+TARGET_MS = 300
+TARGET_MB = 50
+TRANSCRIPT = "Dalawang Coke 1.5 litro, tatlong Lucky Me pancit canton, isang kilo bigas"
+
+
+def _rss_mb() -> float:
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_child() -> dict:
+    """One cold start in this interpreter: import, construct, parse once"""
+    start = time.perf_counter()
+    import importlib.util
+    sys.path.insert(0, EDGE_DIR)
+    spec = importlib.util.spec_from_file_location('edge_processor', os.path.join(EDGE_DIR, 'raspberry-pi-processor.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    imported = time.perf_counter()
+    processor = module.RaspberryPiProcessor()
+    constructed = time.perf_counter()
+    items = processor.parse_filipino_transaction(TRANSCRIPT)
+    parsed = time.perf_counter()
+    rss = _rss_mb()
+    processor.stop_processing()
+    return {
+        'importMs': round((imported - start) * 1000, 1),
+        'initMs': round((constructed - imported) * 1000, 1),
+        'firstParseMs': round((parsed - constructed) * 1000, 2),
+        'coldStartMs': round((parsed - start) * 1000, 1),
+        'rssMb': round(rss, 1),
+        'items': len(items),
+        'heavyModules': sorted(name for name in HEAVY if name in sys.modules),
+    }
+
+
+def spawn(role: str, workdir: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    env = dict(os.environ, EDGE_ROLE=role, METRICS_PORT='0', AUDIO_SOURCE='', CAMERA_SOURCE='',
+               OFFLINE_DIR=os.path.join(workdir, role, 'offline'),
+               CATALOG_DB=os.path.join(workdir, role, 'catalog.db'))
+    flags = ['-X', 'importtime'] if importtime else []
+    return subprocess.run([sys.executable, *flags, os.path.abspath(__file__), '--child'],
+                          env=env, capture_output=True, text=True, check=True)
+
+
+def slowest_imports(stderr: str, top: int) -> list:
+    """Top-level packages by cumulative import time from -X importtime output"""
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):  # nested imports are indented further
+            totals[name.strip()] = int(cumulative)
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{'module': name, 'ms': round(us / 1000, 1)} for name, us in ranked]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--roles', nargs='*', choices=ROLES, default=list(ROLES))
+    parser.add_argument('--runs', type=int, default=5, help='cold starts per role (median reported)')
+    parser.add_argument('--top', type=int, default=8, help='slowest imports to list per role')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child()))
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for role in args.roles:
+            runs = [json.loads(spawn(role, workdir).stdout.splitlines()[-1]) for _ in range(args.runs)]
+            runs.sort(key=lambda run: run['coldStartMs'])
+            result = dict(runs[len(runs) // 2])
+            result['slowestImports'] = slowest_imports(spawn(role, workdir, importtime=True).stderr, args.top)
+            results[role] = result
+
+    parse = results.get('parse')
+    ok = parse is None or (parse['coldStartMs'] < TARGET_MS and parse['rssMb'] < TARGET_MB)
+    print(json.dumps({
+        'benchmark': 'startup',
+        'runs': args.runs,
+        'target': {'role': 'parse', 'coldStartMs': TARGET_MS, 'rssMb': TARGET_MB, 'met': ok},
+        'roles': results,
+    }, indent=2))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
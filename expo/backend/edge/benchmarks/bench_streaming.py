@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Streaming voice front-end benchmark
+Plays a WAV fixture through the fake (file-backed) microphone and reports
+time-to-first-item for chunked streaming transcription vs. transcribing the
+whole utterance after the speaker stops.
+
+Without --wav a fixture is synthesized: one noise burst per word of
+--script, with a timestamp-aligned fake STT whose cost scales with audio
+length (--rtf). With --wav and openai-whisper installed, --whisper runs the
+real model instead.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_stream import SAMPLE_RATE, StreamChunker, StreamingTranscriber, WavFileSource  # noqa: E402
+
+SCRIPT = "dalawang coke, tatlong lucky me, isang kilo bigas, sampung itlog, isang bote mantika"
+SEPARATORS = r'[,.]|\s+at\s+|\s+tsaka\s+'
+
+
+def synthesize(path: str, script: str, word_s: float = 0.35, gap_s: float = 0.12, lead_s: float = 1.0):
+    """Write a WAV with one noise burst per word; returns [(start, end, word)]"""
+    rng = np.random.default_rng(3)
+    pieces = [np.zeros(int(lead_s * SAMPLE_RATE))]
+    t = lead_s
+    timeline = []
+    for word in script.split():
+        burst = rng.normal(0, 0.2, int(word_s * SAMPLE_RATE))
+        pieces += [burst, np.zeros(int(gap_s * SAMPLE_RATE))]
+        timeline.append((t, t + word_s, word))
+        t += word_s + gap_s
+    pieces.append(np.zeros(int(1.5 * SAMPLE_RATE)))
+    pcm = (np.clip(np.concatenate(pieces), -1, 1) * 32767).astype(np.int16)
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm.tobytes())
+    return timeline
+
+
+def fake_stt(timeline, rtf: float):
+    def transcribe(chunk):
+        duration = len(chunk.samples) / SAMPLE_RATE
+        time.sleep(duration * rtf)
+        end = chunk.start + duration
+        return ' '.join(w for s, e, w in timeline if chunk.start <= (s + e) / 2 < end)
+    return transcribe
+
+
+def whisper_stt(model_name: str):
+    import whisper
+
+    model = whisper.load_model(model_name)
+    return lambda chunk: model.transcribe(chunk.samples, language='fil', fp16=False)['text']
+
+
+def split_segments(text: str):
+    import re
+    return [s.strip() for s in re.split(SEPARATORS, text.lower()) if s.strip()]
+
+
+def run(wav_path: str, transcribe, chunk_seconds: float) -> dict:
+    """chunk_seconds=0 disables intermediate chunks (whole-utterance baseline)"""
+    chunker = StreamChunker(chunk_seconds=chunk_seconds or 600, max_utterance_seconds=120)
+    first_item = {}
+    done = threading.Event()
+    items = []
+
+    def on_items(utterance_id, new_items, final):
+        if new_items and 'at' not in first_item:
+            first_item['at'] = time.monotonic()
+        if final:
+            items.extend(new_items)
+            done.set()
+
+    source = WavFileSource(wav_path, realtime=True)
+    stream = StreamingTranscriber(source, transcribe, split_segments, lambda s: s, on_items, chunker=chunker)
+    start = time.monotonic()
+    stream.start()
+    stream.join()
+
+    return {
+        'mode': 'streaming' if chunk_seconds else 'whole-utterance',
+        'timeToFirstItemS': round(first_item.get('at', time.monotonic()) - start, 2),
+        'totalS': round(time.monotonic() - start, 2),
+        'items': items,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--wav', help='16 kHz mono WAV fixture (default: synthesized)')
+    parser.add_argument('--script', default=SCRIPT)
+    parser.add_argument('--rtf', type=float, default=0.4, help='fake STT real-time factor')
+    parser.add_argument('--chunk-seconds', type=float, default=2.0)
+    parser.add_argument('--whisper', metavar='MODEL', help='use openai-whisper MODEL instead of fake STT')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        wav_path = args.wav
+        timeline = []
+        if not wav_path:
+            wav_path = os.path.join(tmp, 'fixture.wav')
+            timeline = synthesize(wav_path, args.script)
+        transcribe = whisper_stt(args.whisper) if args.whisper else fake_stt(timeline, args.rtf)
+
+        results = [run(wav_path, transcribe, 0), run(wav_path, transcribe, args.chunk_seconds)]
+
+    print(json.dumps({'benchmark': 'streaming', 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
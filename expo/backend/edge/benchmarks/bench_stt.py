@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+STT backend benchmark
+Runs each backend in a fresh subprocess over a fixed directory of 16 kHz
+mono WAV clips (Filipino sample transactions) and reports model load time,
+real-time factor and peak RSS. Backends that are not installed are reported
+as skipped.
+
+    python benchmarks/bench_stt.py --clips samples/clips \\
+        --backend openai-whisper:base --backend faster-whisper:base \\
+        --backend whisper-cpp:models/ggml-base-q5_1.bin
+"""
+
+import argparse
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def child(spec: str, clips_dir: str, threads: int):
+    from stt_backends import LazySTT, create_backend
+
+    name, _, model = spec.partition(':')
+    options = {'model': model or 'base', 'threads': threads}
+    if name == 'whisper-cpp':
+        options['model_path'] = model
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    try:
+        stt = LazySTT(create_backend(name, **options)).warm()
+    except ImportError as e:
+        print(json.dumps({'backend': spec, 'skipped': str(e)}))
+        return
+
+    audio_s = 0.0
+    compute_s = 0.0
+    transcripts = {}
+    for path in sorted(glob.glob(os.path.join(clips_dir, '*.wav'))):
+        with wave.open(path, 'rb') as wav:
+            audio_s += wav.getnframes() / wav.getframerate()
+        start = time.perf_counter()
+        transcripts[os.path.basename(path)] = stt.transcribe(path, language='fil')
+        compute_s += time.perf_counter() - start
+
+    print(json.dumps({
+        'backend': spec,
+        'loadS': round(stt.load_time, 2),
+        'audioS': round(audio_s, 2),
+        'realTimeFactor': round(compute_s / audio_s, 3) if audio_s else None,
+        'peakRssMb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'modelRssMb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - rss_before, 1),
+        'transcripts': transcripts,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clips', required=True, help='directory of 16 kHz mono WAV clips')
+    parser.add_argument('--backend', action='append', help='name[:model], repeatable')
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.clips, args.threads)
+        return
+
+    results = []
+    for spec in args.backend or ['openai-whisper:base', 'faster-whisper:base']:
+        out = subprocess.run(
+            [sys.executable, __file__, '--clips', args.clips, '--threads', str(args.threads), '--child', spec],
+            capture_output=True, text=True
+        )
+        lines = [line for line in out.stdout.splitlines() if line.startswith('{')]
+        results.append(json.loads(lines[-1]) if lines else {'backend': spec, 'error': out.stderr[-500:]})
+
+    print(json.dumps({'benchmark': 'stt', 'results': results}, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Transaction ID stress test
+Generates millions of IDs from many threads (and optionally forked worker
+processes) sharing one generator, then checks that every ID is unique,
+that each thread's IDs are strictly increasing, and that the embedded
+timestamps track the wall clock. Prints throughput and exits non-zero on
+any violation.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from txn_ids import TransactionIdGenerator, id_timestamp_ms  # noqa: E402
+
+GENERATOR = TransactionIdGenerator('RPI-001')
+
+
+def generate(count: int):
+    new_id = GENERATOR.new_id
+    return [new_id() for _ in range(count)]
+
+
+def run_threads(threads: int, per_thread: int):
+    results = [None] * threads
+    barrier = threading.Barrier(threads)
+
+    def worker(index):
+        barrier.wait()
+        results[index] = generate(per_thread)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return results, time.perf_counter() - start
+
+
+def run_processes(processes: int, per_process: int):
+    # Forked children inherit the generator; the at-fork hook must reseed it
+    ctx = multiprocessing.get_context('fork')
+    start = time.perf_counter()
+    with ctx.Pool(processes) as pool:
+        results = pool.map(generate, [per_process] * processes)
+    return results, time.perf_counter() - start
+
+
+def check(streams, started_ms: int):
+    violations = []
+    seen = set()
+    total = 0
+    for index, ids in enumerate(streams):
+        total += len(ids)
+        seen.update(ids)
+        if any(a >= b for a, b in zip(ids, ids[1:])):
+            violations.append(f"stream {index} not strictly increasing")
+    if len(seen) != total:
+        violations.append(f"{total - len(seen)} duplicate IDs")
+
+    now_ms = int(time.time() * 1000)
+    for ids in streams:
+        for txn_id in (ids[0], ids[-1]):
+            if not started_ms - 1000 <= id_timestamp_ms(txn_id) <= now_ms + 1000:
+                violations.append(f"timestamp of {txn_id} out of range")
+    return total, violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ids', type=int, default=2_000_000, help='IDs per mode')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--processes', type=int, default=4)
+    args = parser.parse_args()
+
+    report = {'benchmark': 'txn-ids', 'sample': GENERATOR.new_id(), 'results': []}
+    failed = False
+
+    for mode, runner, workers in (('threads', run_threads, args.threads),
+                                  ('fork-processes', run_processes, args.processes)):
+        started_ms = int(time.time() * 1000)
+        streams, elapsed = runner(workers, args.ids // workers)
+        total, violations = check(streams, started_ms)
+        failed |= bool(violations)
+        report['results'].append({
+            'mode': mode,
+            'workers': workers,
+            'ids': total,
+            'idsPerSecond': round(total / elapsed),
+            'violations': violations,
+        })
+
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
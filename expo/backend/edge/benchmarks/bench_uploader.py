@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Uploader benchmark against a local stub hub
+Compares the legacy one-requests.post-per-transaction path with pooled
+single posts and gzip batches, reporting transactions/second and bytes on
+the wire. --connect-delay emulates the TCP/TLS handshake cost of a store
+3G link; it is paid once per new connection.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from uploader import BatchUploader  # noqa: E402
+
+
+class StubHub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, connect_delay: float, request_delay: float):
+        super().__init__(address, StubHandler)
+        self.connect_delay = connect_delay
+        self.request_delay = request_delay
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.bytes_received = 0
+        self.requests = 0
+        self.connections = 0
+        self.transactions = 0
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    wbufsize = -1  # send headers and body in one segment
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+        time.sleep(self.server.connect_delay)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        header_bytes = sum(len(k) + len(v) + 4 for k, v in self.headers.items())
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        payload = json.loads(body)
+
+        if self.path.endswith('/batch'):
+            transactions = payload['transactions']
+            response = {'success': True, 'results': [
+                {'transactionId': t['transactionId'], 'success': True} for t in transactions
+            ]}
+        else:
+            transactions = [payload]
+            response = {'success': True, 'transactionId': payload['transactionId']}
+
+        with self.server.lock:
+            self.server.bytes_received += length + header_bytes
+            self.server.requests += 1
+            self.server.transactions += len(transactions)
+
+        time.sleep(self.server.request_delay)
+        data = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def sample_transaction(index: int) -> dict:
+    items = [{
+        'brandName': 'Lucky Me', 'productName': 'Pancit Canton', 'genericName': None,
+        'localName': None, 'sku': 'LUC-PANC-000123', 'quantity': 3, 'unit': 'pc',
+        'unitPrice': 15.0, 'totalPrice': 45.0, 'category': 'food', 'isUnbranded': False,
+        'isBulk': False, 'detectionMethod': 'stt', 'confidence': 0.85,
+        'brandConfidence': None, 'suggestedBrands': [], 'notes': None,
+    }, {
+        'brandName': None, 'productName': 'Rice', 'genericName': 'Rice', 'localName': 'bigas',
+        'sku': 'UNB-RICE-000123', 'quantity': 1, 'unit': 'kg', 'unitPrice': 55.0,
+        'totalPrice': 55.0, 'category': 'staple', 'isUnbranded': True, 'isBulk': False,
+        'detectionMethod': 'stt', 'confidence': 0.85, 'brandConfidence': None,
+        'suggestedBrands': [], 'notes': None,
+    }]
+    return {
+        'storeId': 'SM-001', 'deviceId': 'RPI-001', 'timestamp': '2026-01-01T08:00:00',
+        'transactionId': f"TXN-{index}", 'items': items,
+        'totals': {'totalAmount': 100.0, 'totalItems': 4, 'brandedAmount': 45.0,
+                   'unbrandedAmount': 55.0, 'brandedCount': 1, 'unbrandedCount': 1},
+        'insights': {'brandedVsUnbranded': {'brandedPercentage': 50.0, 'unbrandedPercentage': 50.0},
+                     'topCategories': [{'category': 'staple', 'count': 1, 'value': 55.0}],
+                     'suggestions': ['Suggest cooking oil with rice purchase']},
+        'paymentMethod': 'cash', 'processingTime': 0.5, 'edgeVersion': 'v1.0.0',
+    }
+
+
+def legacy_send(endpoint: str, transactions):
+    for transaction in transactions:
+        requests.post(f"{endpoint}/api/transactions", json=transaction, timeout=10)
+
+
+def run(name: str, server: StubHub, fn, count: int) -> dict:
+    server.reset()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    return {
+        'mode': name,
+        'transactions': server.transactions,
+        'txPerSecond': round(count / elapsed, 1),
+        'requests': server.requests,
+        'connections': server.connections,
+        'bytesOnWire': server.bytes_received,
+        'bytesPerTransaction': round(server.bytes_received / max(1, server.transactions), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transactions', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=25)
+    parser.add_argument('--connect-delay', type=float, default=0.05)
+    parser.add_argument('--request-delay', type=float, default=0.005)
+    args = parser.parse_args()
+
+    server = StubHub(('127.0.0.1', 0), args.connect_delay, args.request_delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+    transactions = [sample_transaction(i) for i in range(args.transactions)]
+
+    pooled = BatchUploader(endpoint, batch_mode=False)
+    batched = BatchUploader(endpoint, batch_mode=True)
+    batches = [transactions[i:i + args.batch_size] for i in range(0, len(transactions), args.batch_size)]
+
+    results = [
+        run('legacy', server, lambda: legacy_send(endpoint, transactions), len(transactions)),
+        run('pooled-single', server, lambda: [pooled.send_one(t) for t in transactions], len(transactions)),
+        run('pooled-batch-gzip', server, lambda: [batched.send_batch(b) for b in batches], len(transactions)),
+    ]
+    server.shutdown()
+
+    print(json.dumps({'benchmark': 'uploader', 'connectDelay': args.connect_delay, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+Brand logo detection for receipt and counter images
+ORB descriptors for every template are computed once at startup and indexed
+together in one FLANN (LSH) matcher, so each frame costs one descriptor
+extraction plus one k-NN query regardless of how many templates are loaded.
+Candidate brands are then verified with a RANSAC homography while the
+per-frame time budget allows.
+"""
+
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# FLANN parameters for binary (ORB) descriptors. Long keys with more tables
+# keep buckets small when many templates share similar corners; this was the
+# best latency/recall point at 500 templates in benchmarks/bench_brands.py.
+FLANN_INDEX_LSH = 6
+LSH_INDEX_PARAMS = dict(algorithm=FLANN_INDEX_LSH, table_number=10, key_size=20, multi_probe_level=0)
+LSH_SEARCH_PARAMS = dict(checks=32)
+
+
+class BrandTemplate:
+    def __init__(self, brand: str, keypoints, descriptors: np.ndarray, shape):
+        self.brand = brand
+        self.points = np.float32([kp.pt for kp in keypoints])
+        self.descriptors = descriptors
+        self.shape = shape
+
+
+class BrandDetector:
+    """Indexed ORB matcher over all brand templates"""
+
+    def __init__(self, frame_max_side: int = 640, template_max_side: int = 256,
+                 frame_features: int = 700, template_features: int = 250,
+                 max_distance: int = 50, min_matches: int = 12, min_inliers: int = 8,
+                 max_candidates: int = 5, budget_ms: float = 150.0):
+        self.frame_max_side = frame_max_side
+        self.template_max_side = template_max_side
+        self.max_distance = max_distance
+        self.min_matches = min_matches
+        self.min_inliers = min_inliers
+        self.max_candidates = max_candidates
+        self.budget_ms = budget_ms
+        # Descriptors are only comparable when both sides share patch geometry;
+        # the pyramid levels give scale tolerance without per-scale templates
+        orb_params = dict(scaleFactor=1.3, nlevels=8, edgeThreshold=19, patchSize=19)
+        self.frame_orb = cv2.ORB_create(nfeatures=frame_features, **orb_params)
+        self.template_orb = cv2.ORB_create(nfeatures=template_features, **orb_params)
+        self.templates: List[BrandTemplate] = []
+        self._labels: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._matcher = None
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    @staticmethod
+    def _downscale(gray: np.ndarray, max_side: int) -> np.ndarray:
+        scale = max_side / max(gray.shape[:2])
+        if scale >= 1:
+            return gray
+        return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    @staticmethod
+    def _gray(img: np.ndarray) -> np.ndarray:
+        return img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    def add_template(self, brand: str, image: np.ndarray) -> bool:
+        gray = self._downscale(self._gray(image), self.template_max_side)
+        keypoints, descriptors = self.template_orb.detectAndCompute(gray, None)
+        if descriptors is None or len(keypoints) < self.min_matches:
+            logger.warning(f"Template for {brand} has too few features; skipped")
+            return False
+        self.templates.append(BrandTemplate(brand, keypoints, descriptors, gray.shape))
+        self._matcher = None
+        return True
+
+    def load_templates(self, templates: Dict[str, str], directory: str = 'templates') -> int:
+        """Load brand -> PNG filename mapping from the templates directory"""
+        for brand, filename in templates.items():
+            path = filename if os.path.isabs(filename) else os.path.join(directory, filename)
+            image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if image is None:
+                logger.warning(f"Brand template not found: {path}")
+                continue
+            self.add_template(brand, image)
+        self.build()
+        logger.info(f"Loaded {len(self.templates)} brand template(s)")
+        return len(self.templates)
+
+    def build(self):
+        """Stack every template's descriptors into one LSH index"""
+        if not self.templates:
+            self._matcher = None
+            return
+        descriptors = np.vstack([t.descriptors for t in self.templates])
+        counts = [len(t.descriptors) for t in self.templates]
+        self._labels = np.repeat(np.arange(len(self.templates)), counts)
+        self._offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        self._matcher = cv2.FlannBasedMatcher(LSH_INDEX_PARAMS, LSH_SEARCH_PARAMS)
+        self._matcher.add([descriptors])
+        self._matcher.train()
+
+    def detect(self, img: np.ndarray) -> List[Dict]:
+        """Return [{'brand', 'confidence', 'box'}] sorted by confidence"""
+        if not self.templates:
+            return []
+        if self._matcher is None:
+            self.build()
+
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        gray = self._gray(img)
+        frame = self._downscale(gray, self.frame_max_side)
+        scale = gray.shape[0] / frame.shape[0]
+
+        keypoints, descriptors = self.frame_orb.detectAndCompute(frame, None)
+        if descriptors is None or len(keypoints) < self.min_inliers:
+            return []
+
+        # One nearest-neighbour query against all templates at once, then vote
+        # by template. An absolute Hamming cut is used rather than Lowe's ratio
+        # test, which rejects almost everything once many templates share
+        # similar corners; RANSAC below weeds out the remaining outliers.
+        good_query, good_train = [], []
+        for neighbours in self._matcher.knnMatch(descriptors, k=1):
+            if neighbours and neighbours[0].distance < self.max_distance:
+                good_query.append(neighbours[0].queryIdx)
+                good_train.append(neighbours[0].trainIdx)
+        if not good_train:
+            return []
+
+        good_query = np.asarray(good_query)
+        good_train = np.asarray(good_train)
+        labels = self._labels[good_train]
+        votes = np.bincount(labels, minlength=len(self.templates))
+        candidates = [int(i) for i in np.argsort(-votes)[:self.max_candidates] if votes[i] >= self.min_matches]
+
+        frame_points = np.float32([kp.pt for kp in keypoints])
+        hits = []
+        for index in candidates:
+            if time.perf_counter() > deadline:
+                logger.debug("Brand detection budget exhausted")
+                break
+            template = self.templates[index]
+            mask = labels == index
+            src = template.points[good_train[mask] - self._offsets[index]]
+            dst = frame_points[good_query[mask]]
+            homography, inliers = cv2.findHomography(src, dst, cv2.RANSAC, 5.0, maxIters=300)
+            if homography is None:
+                continue
+            inlier_count = int(inliers.sum())
+            if inlier_count < self.min_inliers:
+                continue
+
+            h, w = template.shape
+            corners = cv2.perspectiveTransform(np.float32([[[0, 0]], [[w, 0]], [[w, h]], [[0, h]]]), homography)
+            x, y, bw, bh = cv2.boundingRect(corners * scale)
+            hits.append({
+                'brand': template.brand,
+                'confidence': round(min(1.0, inlier_count / (2.5 * self.min_matches)), 3),
+                'box': [int(x), int(y), int(bw), int(bh)],
+                'inliers': inlier_count,
+            })
+
+        # Several templates may belong to one brand; keep the best hit per brand
+        best = {}
+        for hit in hits:
+            if hit['brand'] not in best or hit['confidence'] > best[hit['brand']]['confidence']:
+                best[hit['brand']] = hit
+        return sorted(best.values(), key=lambda hit: hit['confidence'], reverse=True)
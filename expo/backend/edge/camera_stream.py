@@ -0,0 +1,170 @@
+"""
+Camera ingestion for receipt and counter scenes
+Frames are captured into one reused buffer and reduced to a small grayscale
+thumbnail. Frame differencing on the thumbnail tells when the scene has
+settled, and a perceptual (difference) hash tells whether the settled scene
+is new. Only new, stable scenes are copied out and handed to OCR.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def dhash(thumb: np.ndarray, hash_size: int = 8) -> int:
+    """64-bit difference hash of a grayscale image"""
+    small = cv2.resize(thumb, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class VideoSource:
+    """Camera device index or recorded video file read through OpenCV"""
+
+    def __init__(self, source: Union[int, str], resolution: Optional[Tuple[int, int]] = None,
+                 realtime: bool = False):
+        self.source = source
+        self.realtime = realtime
+        self._cap = cv2.VideoCapture(source)
+        if not self._cap.isOpened():
+            raise ValueError(f"Cannot open video source: {source}")
+        if resolution and isinstance(source, int):
+            self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, resolution[0])
+            self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution[1])
+        fps = self._cap.get(cv2.CAP_PROP_FPS)
+        self.fps = fps if fps and fps > 0 else 30.0
+        self._started = None
+        self._read = 0
+
+    def read(self, frame: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Capture into frame when it has the right shape; None at end of stream"""
+        if self._started is None:
+            self._started = time.monotonic()
+        ok, frame = self._cap.read(frame)
+        if not ok:
+            return None
+        self._read += 1
+        if self.realtime and not isinstance(self.source, int):
+            # Pace a recording like the live camera
+            delay = self._started + self._read / self.fps - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return frame
+
+    def close(self):
+        self._cap.release()
+
+
+class SceneChangeDetector:
+    """Decide which frames show a new scene that has stopped moving"""
+
+    def __init__(self, thumb_size: Tuple[int, int] = (80, 60), motion_threshold: float = 4.0,
+                 stable_frames: int = 5, min_scene_distance: int = 10, min_contrast: float = 12.0):
+        self.thumb_size = thumb_size
+        self.motion_threshold = motion_threshold
+        self.stable_frames = stable_frames
+        self.min_scene_distance = min_scene_distance
+        self.min_contrast = min_contrast
+        # Thumbnail, previous thumbnail and diff buffers are reused every frame
+        self._gray: Optional[np.ndarray] = None
+        self._thumb = np.zeros(thumb_size[::-1], np.uint8)
+        self._prev = np.zeros(thumb_size[::-1], np.uint8)
+        self._diff = np.zeros(thumb_size[::-1], np.uint8)
+        self._has_prev = False
+        self._stable_run = 0
+        self.last_hash: Optional[int] = None
+        self._pending_hash: Optional[int] = None
+
+    def update(self, frame: np.ndarray) -> bool:
+        """Feed one frame; True when it should be sent to OCR"""
+        if frame.ndim == 3:
+            if self._gray is None or self._gray.shape != frame.shape[:2]:
+                self._gray = np.empty(frame.shape[:2], np.uint8)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+            gray = self._gray
+        else:
+            gray = frame
+        cv2.resize(gray, self.thumb_size, dst=self._thumb, interpolation=cv2.INTER_AREA)
+
+        if self._has_prev:
+            cv2.absdiff(self._thumb, self._prev, dst=self._diff)
+            motion = cv2.mean(self._diff)[0]
+        else:
+            motion = float('inf')
+        self._thumb, self._prev = self._prev, self._thumb
+        self._has_prev = True
+
+        if motion > self.motion_threshold:
+            self._stable_run = 0
+            return False
+        self._stable_run += 1
+        if self._stable_run != self.stable_frames:
+            return False
+
+        # Settled: compare with the last scene sent to OCR
+        thumb = self._prev
+        scene_hash = dhash(thumb)
+        if self.last_hash is not None and hamming(scene_hash, self.last_hash) <= self.min_scene_distance:
+            return False
+        self._pending_hash, self.last_hash = self.last_hash, scene_hash
+        # A bare counter has no text worth reading, but still counts as a new scene
+        return float(thumb.std()) >= self.min_contrast
+
+    def reject(self):
+        """The emitted frame was not accepted; retry it at the next settle"""
+        self.last_hash = self._pending_hash
+        self._stable_run = 0
+
+
+class CameraIngest:
+    """Capture thread that forwards new, stable scenes to a callback"""
+
+    def __init__(self, source: VideoSource, on_frame: Callable[[np.ndarray], bool],
+                 detector: Optional[SceneChangeDetector] = None):
+        self.source = source
+        self.on_frame = on_frame
+        self.detector = detector or SceneChangeDetector()
+        self.stats: Dict[str, int] = {'framesRead': 0, 'framesEmitted': 0, 'framesRejected': 0}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name='camera', daemon=True)
+        self._thread.start()
+
+    def run(self):
+        frame = None
+        try:
+            while not self._stop.is_set():
+                frame = self.source.read(frame)
+                if frame is None:
+                    break
+                self.stats['framesRead'] += 1
+                if not self.detector.update(frame):
+                    continue
+                # Only frames that go to OCR leave the capture buffer
+                if self.on_frame(frame.copy()):
+                    self.stats['framesEmitted'] += 1
+                else:
+                    self.stats['framesRejected'] += 1
+                    self.detector.reject()
+        except Exception as e:
+            logger.error(f"Camera ingest error: {e}")
+        finally:
+            self.source.close()
+            logger.info(f"Camera ingest stopped: {self.stats}")
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
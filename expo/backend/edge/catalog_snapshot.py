@@ -0,0 +1,170 @@
+"""
+Hot-reloadable catalog snapshots
+Everything the parser reads from the catalog (lexicon, fuzzy index, units,
+fallback prices, brand templates) lives in one immutable CatalogSnapshot.
+A reload builds the next snapshot on a background thread and publishes it
+with a single reference swap, so a parse holding the old snapshot finishes
+against it. The published version sits in shared memory: forked CPU workers
+compare it with their own copy and rebuild when they fall behind.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: int
+    source: str
+    lexicon: Any
+    fuzzy: Any
+    units: Dict[str, str]
+    category_prices: Dict[str, float]
+    brand_templates: Dict[str, str]
+    brand_detector: Any
+    products: int = 0
+    cursor: Optional[str] = None
+    build_seconds: float = 0.0
+    loaded_at: float = field(default_factory=time.time)
+
+
+class SnapshotManager:
+    """Builds catalog snapshots and swaps them in without blocking readers"""
+
+    def __init__(self, build_fn: Callable[[Optional[CatalogSnapshot], int, str], CatalogSnapshot],
+                 metrics=None):
+        self.build_fn = build_fn
+        self.metrics = metrics
+        self._snapshot: Optional[CatalogSnapshot] = None
+        # Version visible to forked workers
+        self._published = multiprocessing.RawValue('q', 0)
+        self._pid = os.getpid()
+        self._build_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._pending: Optional[str] = None
+        self._worker: Optional[threading.Thread] = None
+        self.last_swap_seconds = 0.0
+        if metrics is not None:
+            metrics.gauge('edge_catalog_version', lambda: self._published.value)
+
+    @property
+    def current(self) -> CatalogSnapshot:
+        """The live snapshot; take it once per transcription and keep using it"""
+        snapshot = self._snapshot
+        if self._pid != os.getpid() and (snapshot is None or snapshot.version < self._published.value):
+            snapshot = self.reload('worker catch-up', self._published.value)
+        return snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version if self._snapshot else 0
+
+    def reload(self, reason: str, version: Optional[int] = None) -> CatalogSnapshot:
+        """Build and publish the next snapshot in the calling thread"""
+        with self._build_lock:
+            previous = self._snapshot
+            if version is None:
+                version = (previous.version if previous else 0) + 1
+            start = time.perf_counter()
+            snapshot = self.build_fn(previous, version, reason)
+            built = time.perf_counter()
+            # The swap: readers pick up the new reference on their next call
+            self._snapshot = snapshot
+            if self._pid == os.getpid():
+                self._published.value = version
+            self.last_swap_seconds = time.perf_counter() - built
+        if self.metrics is not None:
+            self.metrics.observe('edge_catalog_reload_seconds', built - start)
+            self.metrics.inc('edge_catalog_reloads_total', reason=reason)
+        logger.info(f"Catalog snapshot v{version} ({reason}): {snapshot.products} product(s) "
+                    f"built in {built - start:.3f}s")
+        return snapshot
+
+    def request_reload(self, reason: str):
+        """Rebuild in the background; requests made during a build coalesce into one more"""
+        with self._cond:
+            self._pending = reason
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._drain, name='catalog-reload', daemon=True)
+                self._worker.start()
+
+    def _drain(self):
+        while True:
+            with self._cond:
+                reason, self._pending = self._pending, None
+                if reason is None:
+                    self._worker = None
+                    self._cond.notify_all()
+                    return
+            try:
+                self.reload(reason)
+            except Exception as e:
+                # Keep serving the previous snapshot
+                logger.error(f"Catalog reload failed ({reason}): {e}")
+                if self.metrics is not None:
+                    self.metrics.inc('edge_errors_total', stage='catalog_reload')
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until no background reload is queued or running"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._worker is None, timeout)
+
+
+def read_catalog_config(path: str) -> Dict:
+    """Local catalog overrides: units, categoryPrices, brandTemplates and products"""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    if not isinstance(config, dict):
+        raise ValueError(f"{path}: expected a JSON object")
+    return config
+
+
+class FileWatcher:
+    """Polls a file's mtime and size and calls on_change when either moves"""
+
+    def __init__(self, path: str, on_change: Callable[[], None], interval: float = 2.0):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self._stamp = self._read_stamp()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _read_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def start(self):
+        if not self.path or self.interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name='catalog-watch', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            stamp = self._read_stamp()
+            if stamp == self._stamp:
+                continue
+            self._stamp = stamp
+            try:
+                self.on_change()
+            except Exception as e:
+                logger.warning(f"Reloading {self.path} failed: {e}")
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
@@ -0,0 +1,324 @@
+"""
+Local product and price catalog
+SQLite store of SKUs with indexed lookup terms (local name, brand, variant),
+per-unit prices, per-store price overrides and an incremental delta sync
+from the hub's /api/catalog route
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    sku TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    brand TEXT,
+    category TEXT NOT NULL,
+    unit TEXT NOT NULL DEFAULT 'pc',
+    unit_price REAL,
+    local_name TEXT,
+    generic_name TEXT,
+    unbranded INTEGER NOT NULL DEFAULT 0,
+    priority INTEGER NOT NULL DEFAULT 1000,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS product_terms (
+    term TEXT NOT NULL,
+    sku TEXT NOT NULL REFERENCES products(sku) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    PRIMARY KEY (term, sku)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_product_terms_sku ON product_terms(sku);
+CREATE TABLE IF NOT EXISTS unit_prices (
+    sku TEXT NOT NULL REFERENCES products(sku) ON DELETE CASCADE,
+    unit TEXT NOT NULL,
+    price REAL NOT NULL,
+    PRIMARY KEY (sku, unit)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS store_prices (
+    store_id TEXT NOT NULL,
+    sku TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    price REAL NOT NULL,
+    updated_at TEXT,
+    PRIMARY KEY (store_id, sku, unit)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+PRODUCT_FIELDS = ('sku', 'name', 'brand', 'category', 'unit', 'unit_price', 'local_name', 'generic_name',
+                  'unbranded', 'priority')
+PRODUCT_COLUMNS = ', '.join(PRODUCT_FIELDS)
+
+
+def normalize_term(term: str) -> str:
+    return re.sub(r'\s+', ' ', term.strip().lower())
+
+
+def stable_sku(name: str, brand: Optional[str] = None) -> str:
+    """Deterministic SKU for products the catalog does not know"""
+    prefix = brand[:3].upper() if brand else 'UNB'
+    code = re.sub(r'[^A-Z0-9]', '', name.upper())[:4] or 'ITEM'
+    digest = zlib.crc32(f"{normalize_term(brand or '')}|{normalize_term(name)}".encode('utf-8'))
+    return f"{prefix}-{code}-{digest:08X}"
+
+
+class ProductCatalog:
+    """SKU/price store; reads are indexed point queries"""
+
+    def __init__(self, path: str, store_id: Optional[str] = None):
+        self.path = path
+        self.store_id = store_id
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = None
+        self._pid = None
+        with self._lock:
+            self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # Forked CPU workers must not share the parent's connection
+        if self._db is None or self._pid != os.getpid():
+            self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._db.row_factory = sqlite3.Row
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA foreign_keys=ON")
+            self._pid = os.getpid()
+        return self._db
+
+    def close(self):
+        with self._lock:
+            if self._db is not None and self._pid == os.getpid():
+                self._db.close()
+            self._db = None
+
+    # -- reads --------------------------------------------------------------
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn().execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    def get(self, sku: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn().execute(f"SELECT {PRODUCT_COLUMNS} FROM products WHERE sku = ?", (sku,)).fetchone()
+        return self._product(row) if row else None
+
+    def find(self, term: str, limit: int = 5) -> List[Dict]:
+        """Products whose local name, name, brand or variant equals term"""
+        with self._lock:
+            rows = self._conn().execute(
+                f"SELECT {', '.join('p.' + field for field in PRODUCT_FIELDS)} "
+                "FROM product_terms t JOIN products p ON p.sku = t.sku "
+                "WHERE t.term = ? ORDER BY p.priority, p.sku LIMIT ?",
+                (normalize_term(term), limit)
+            ).fetchall()
+        return [self._product(row) for row in rows]
+
+    def price(self, sku: str, unit: str) -> Optional[float]:
+        """Store override, then the catalog price for the unit, then the base price"""
+        with self._lock:
+            db = self._conn()
+            if self.store_id:
+                row = db.execute(
+                    "SELECT price FROM store_prices WHERE store_id = ? AND sku = ? AND unit = ?",
+                    (self.store_id, sku, unit)
+                ).fetchone()
+                if row:
+                    return row[0]
+            row = db.execute("SELECT price FROM unit_prices WHERE sku = ? AND unit = ?", (sku, unit)).fetchone()
+            if row:
+                return row[0]
+            row = db.execute("SELECT unit_price FROM products WHERE sku = ? AND unit = ?", (sku, unit)).fetchone()
+        return row[0] if row else None
+
+    def iter_products(self) -> Iterator[Dict]:
+        """Every product with its lookup terms, in priority order"""
+        with self._lock:
+            db = self._conn()
+            rows = db.execute(f"SELECT {PRODUCT_COLUMNS} FROM products ORDER BY priority, sku").fetchall()
+            terms: Dict[str, List[str]] = {}
+            for sku, term in db.execute("SELECT sku, term FROM product_terms ORDER BY sku, term"):
+                terms.setdefault(sku, []).append(term)
+        for row in rows:
+            product = self._product(row)
+            product['terms'] = terms.get(product['sku'], [])
+            yield product
+
+    @staticmethod
+    def _product(row) -> Dict:
+        return {
+            'sku': row['sku'],
+            'name': row['name'],
+            'brand': row['brand'],
+            'category': row['category'],
+            'unit': row['unit'],
+            'unitPrice': row['unit_price'],
+            'local': row['local_name'],
+            'generic': row['generic_name'],
+            'unbranded': bool(row['unbranded']),
+            'priority': row['priority'],
+        }
+
+    # -- writes -------------------------------------------------------------
+
+    def upsert_products(self, products: Iterable[Dict]) -> int:
+        """Insert or replace products with their terms and unit prices"""
+        with self._lock:
+            db = self._conn()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                count = self._upsert(db, products)
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        return count
+
+    def _upsert(self, db: sqlite3.Connection, products: Iterable[Dict]) -> int:
+        """Apply product rows; returns how many products changed, deletions included"""
+        count = 0
+        for product in products:
+            sku = product['sku']
+            if product.get('active') is False:
+                count += db.execute("DELETE FROM products WHERE sku = ?", (sku,)).rowcount
+                continue
+            db.execute(
+                f"INSERT OR REPLACE INTO products ({PRODUCT_COLUMNS}, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (sku, product['name'], product.get('brand'), product.get('category') or 'unknown',
+                 product.get('unit') or 'pc', product.get('unitPrice'), product.get('localName'),
+                 product.get('genericName'), int(bool(product.get('unbranded', not product.get('brand')))),
+                 product.get('priority', 1000), product.get('updatedAt'))
+            )
+            db.execute("DELETE FROM product_terms WHERE sku = ?", (sku,))
+            db.execute("DELETE FROM unit_prices WHERE sku = ?", (sku,))
+            terms = {normalize_term(product['name']): 'name'}
+            for kind, value in (('brand', product.get('brand')), ('local', product.get('localName'))):
+                if value:
+                    terms[normalize_term(value)] = kind
+            for variant in product.get('variants') or []:
+                terms.setdefault(normalize_term(variant), 'variant')
+            db.executemany(
+                "INSERT OR IGNORE INTO product_terms (term, sku, kind) VALUES (?, ?, ?)",
+                [(term, sku, kind) for term, kind in terms.items() if term]
+            )
+            db.executemany(
+                "INSERT OR REPLACE INTO unit_prices (sku, unit, price) VALUES (?, ?, ?)",
+                [(sku, unit, price) for unit, price in (product.get('prices') or {}).items()]
+            )
+            count += 1
+        return count
+
+    def set_store_prices(self, prices: Iterable[Dict], store_id: Optional[str] = None):
+        """Per-store overrides: [{'sku', 'unit', 'price'}]; a null price removes one"""
+        store_id = store_id or self.store_id
+        with self._lock:
+            db = self._conn()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                self._set_store_prices(db, prices, store_id)
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _set_store_prices(db: sqlite3.Connection, prices: Iterable[Dict], store_id: str) -> int:
+        count = 0
+        for entry in prices:
+            if entry.get('price') is None:
+                count += db.execute(
+                    "DELETE FROM store_prices WHERE store_id = ? AND sku = ? AND unit = ?",
+                    (store_id, entry['sku'], entry.get('unit') or 'pc')
+                ).rowcount
+            else:
+                db.execute(
+                    "INSERT OR REPLACE INTO store_prices (store_id, sku, unit, price, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (store_id, entry['sku'], entry.get('unit') or 'pc', entry['price'], entry.get('updatedAt'))
+                )
+                count += 1
+        return count
+
+    # -- sync ---------------------------------------------------------------
+
+    def sync_cursor(self) -> Optional[str]:
+        with self._lock:
+            row = self._conn().execute("SELECT value FROM meta WHERE key = 'sync_cursor'").fetchone()
+        return row[0] if row else None
+
+    def apply_delta(self, delta: Dict) -> int:
+        """Apply one /api/catalog response atomically and advance the cursor;
+        returns how many products and store prices changed, removals included"""
+        with self._lock:
+            db = self._conn()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                count = self._upsert(db, delta.get('products') or [])
+                if self.store_id:
+                    count += self._set_store_prices(db, delta.get('storePrices') or [], self.store_id)
+                if delta.get('cursor'):
+                    db.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES ('sync_cursor', ?)", (delta['cursor'],)
+                    )
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        return count
+
+    def sync(self, fetch: Callable[[Optional[str]], Optional[Dict]], max_pages: int = 100) -> int:
+        """Pull deltas since the stored cursor until the hub has no more"""
+        total = 0
+        for _ in range(max_pages):
+            delta = fetch(self.sync_cursor())
+            if not delta:
+                break
+            total += self.apply_delta(delta)
+            if not delta.get('hasMore'):
+                break
+        if total:
+            logger.info(f"Catalog sync applied {total} catalog change(s)")
+        return total
+
+
+class CatalogSyncWorker:
+    """Periodically pulls catalog deltas from the hub"""
+
+    def __init__(self, catalog: ProductCatalog, fetch: Callable[[Optional[str]], Optional[Dict]],
+                 interval: float = 300.0, on_change: Optional[Callable[[], None]] = None):
+        self.catalog = catalog
+        self.fetch = fetch
+        self.interval = interval
+        self.on_change = on_change
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name='catalog-sync', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.catalog.sync(self.fetch) and self.on_change:
+                    self.on_change()
+            except Exception as e:
+                logger.warning(f"Catalog sync failed: {e}")
+            self._stop.wait(self.interval)
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
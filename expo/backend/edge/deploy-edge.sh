@@ -21,7 +21,7 @@ echo "API Endpoint: $API_ENDPOINT"
 # Create deployment package
 echo "📦 Creating deployment package..."
 mkdir -p dist/edge
-cp raspberry-pi-processor.py dist/edge/
+cp *.py dist/edge/
 cp requirements-edge.txt dist/edge/requirements.txt
 cp -r templates/ dist/edge/ 2>/dev/null || true
 cp -r models/ dist/edge/ 2>/dev/null || true
@@ -40,9 +40,10 @@ Environment=STORE_ID=$STORE_ID
 Environment=DEVICE_ID=$DEVICE_ID
 Environment=API_ENDPOINT=$API_ENDPOINT
 Environment=PYTHONPATH=/home/pi/transaction-processor
-ExecStart=/home/pi/transaction-processor/venv/bin/python raspberry-pi-processor.py
+ExecStart=/home/pi/transaction-processor/venv/bin/python raspberry-pi-processor.py --run
 Restart=always
 RestartSec=10
+TimeoutStopSec=60
 
 [Install]
 WantedBy=multi-user.target
@@ -61,7 +62,7 @@ sudo apt upgrade -y
 # Install required packages
 sudo apt install -y python3 python3-pip python3-venv
 sudo apt install -y libopencv-dev python3-opencv
-sudo apt install -y tesseract-ocr tesseract-ocr-fil
+sudo apt install -y tesseract-ocr tesseract-ocr-fil libtesseract-dev libleptonica-dev
 sudo apt install -y portaudio19-dev python3-pyaudio
 sudo apt install -y libatlas-base-dev
 sudo apt install -y alsa-utils
@@ -108,14 +109,23 @@ requests==2.31.0
 SpeechRecognition==3.10.0
 PyAudio==0.2.11
 openai-whisper==20230314
+# Optional quantized STT backends (STT_BACKEND=faster-whisper | whisper-cpp)
+# faster-whisper==0.10.0
+# pywhispercpp==1.2.0
 
 # OCR
 pytesseract==0.3.10
+# Persistent in-process engines for parallel line OCR (falls back to pytesseract)
+tesserocr==2.6.2
 
 # Audio processing
 pyaudio==0.2.11
 wave==0.0.2
 
+# Fast serialization (optional; falls back to json)
+orjson==3.9.10
+msgpack==1.0.7
+
 # Utilities
 python-dotenv==1.0.0
 pyyaml==6.0
@@ -144,6 +154,7 @@ api:
   offline_storage: true
 
 processing:
+  stt_backend: "openai-whisper"
   whisper_model: "base"
   ocr_language: "eng+fil"
   confidence_threshold: 0.7
@@ -157,6 +168,8 @@ audio:
 
 vision:
   camera_resolution: [1920, 1080]
+  # Frames must be still this many frames before a new scene is OCR'd
+  camera_stable_frames: 5
   preprocessing:
     grayscale: true
     adaptive_threshold: true
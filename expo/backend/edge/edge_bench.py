@@ -0,0 +1,325 @@
+"""
+Headless benchmark for the edge processor
+Replays a corpus of audio clips (*.wav), receipt images (*.jpg/*.png) and
+transcripts (*.txt, one per line) through a RaspberryPiProcessor against a
+local stand-in for the central API, and reports model load time, exact
+per-stage p50/p95/p99 latencies, pipeline throughput and peak RSS as JSON.
+
+Latencies come from a sequential pass that calls the processing methods
+directly; throughput comes from a second pass through the real queues,
+workers and uploader. Parse-only mode skips STT, OCR and the hub and runs
+just the text path (parse -> transaction -> serialize).
+"""
+
+import contextlib
+import gzip
+import io
+import json
+import logging
+import os
+import random
+import resource
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+from metrics import capture_metrics
+from transaction_format import dumps
+
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTENSIONS = ('.wav',)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+TRANSCRIPT_EXTENSIONS = ('.txt',)
+
+
+class HubStub:
+    """Minimal local central API: accepts transactions, serves an empty catalog
+
+    error_rate answers that fraction of posts with 503 to exercise retries.
+    """
+
+    def __init__(self, error_rate: float = 0.0):
+        self.error_rate = error_rate
+        self.transactions = 0
+        self.requests = 0
+        self.errors = 0
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def start(self) -> str:
+        hub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _reply(self, payload: Dict, status: int = 200):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                size = len(body)
+                if self.headers.get('Content-Encoding') == 'gzip':
+                    body = gzip.decompress(body)
+                payload = json.loads(body)
+                batch = payload.get('transactions') if self.path.endswith('/batch') else [payload]
+                failing = hub.error_rate and random.random() < hub.error_rate
+                with hub._lock:
+                    hub.requests += 1
+                    hub.bytes_received += size
+                    if failing:
+                        hub.errors += 1
+                    else:
+                        hub.transactions += len(batch)
+                if failing:
+                    self._reply({'success': False, 'error': 'Service unavailable'}, 503)
+                    return
+                self._reply({
+                    'success': True,
+                    'results': [{'transactionId': t['transactionId'], 'success': True} for t in batch],
+                })
+
+            def do_GET(self):
+                self._reply({'products': [], 'storePrices': [], 'cursor': None, 'hasMore': False})
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='hub-stub', daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def load_corpus(corpus_dir: str) -> Dict[str, list]:
+    """Audio/image bytes and transcript lines found anywhere under corpus_dir"""
+    corpus = {'audio': [], 'images': [], 'transcripts': []}
+    for root, _, files in sorted(os.walk(corpus_dir)):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            ext = os.path.splitext(name)[1].lower()
+            if ext in AUDIO_EXTENSIONS:
+                with open(path, 'rb') as f:
+                    corpus['audio'].append(f.read())
+            elif ext in IMAGE_EXTENSIONS:
+                with open(path, 'rb') as f:
+                    corpus['images'].append(f.read())
+            elif ext in TRANSCRIPT_EXTENSIONS:
+                with open(path, encoding='utf-8') as f:
+                    corpus['transcripts'].extend(line.strip() for line in f if line.strip())
+    return corpus
+
+
+def percentiles(samples: List[float]) -> Dict:
+    """Exact nearest-rank percentiles in milliseconds"""
+    ordered = sorted(samples)
+    n = len(ordered)
+
+    def rank(q):
+        return round(ordered[min(n - 1, max(0, int(q * n + 0.5) - 1))] * 1000, 3)
+
+    return {
+        'count': n,
+        'meanMs': round(sum(ordered) / n * 1000, 3),
+        'p50Ms': rank(0.50),
+        'p95Ms': rank(0.95),
+        'p99Ms': rank(0.99),
+        'maxMs': round(ordered[-1] * 1000, 3),
+    }
+
+
+class StageSamples:
+    """Every span per stage, for exact percentiles"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+
+    def add(self, stage: str, seconds: float):
+        self.samples.setdefault(stage, []).append(seconds)
+
+    def extend(self, spans):
+        for stage, seconds in spans:
+            self.add(stage, seconds)
+
+    def report(self) -> Dict:
+        return {stage: percentiles(values) for stage, values in sorted(self.samples.items())}
+
+
+def peak_rss_mb() -> Dict:
+    return {
+        'selfMb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'childrenMb': round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }
+
+
+def _timed(samples: StageSamples, stage: str, fn: Callable, *args):
+    with capture_metrics() as captured:
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+    samples.extend(captured.spans)
+    samples.add(stage, elapsed)
+    return result, elapsed
+
+
+def _load_time(model) -> Optional[float]:
+    """Seconds to warm a lazily loaded model; None (and a warning) if it cannot load"""
+    try:
+        return round(model.warm().load_time, 3)
+    except Exception as e:
+        logger.warning(f"Model load failed, its inputs will error: {e}")
+        return None
+
+
+def run_parse_only(processor, transcripts: List[str], repeat: int) -> Dict:
+    """Text path only: parse -> transaction JSON -> serialize"""
+    samples = StageSamples()
+    transactions = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in transcripts:
+            t0 = time.perf_counter()
+            items = processor.parse_filipino_transaction(text)
+            t1 = time.perf_counter()
+            transaction = processor.generate_transaction_json(items, t1 - t0)
+            t2 = time.perf_counter()
+            dumps(transaction)
+            t3 = time.perf_counter()
+            samples.add('parse', t1 - t0)
+            samples.add('build', t2 - t1)
+            samples.add('serialize', t3 - t2)
+            samples.add('total', t3 - t0)
+            transactions += bool(items)
+    elapsed = time.perf_counter() - start
+    count = len(transcripts) * repeat
+    return {
+        'transcripts': count,
+        'withItems': transactions,
+        'elapsedS': round(elapsed, 3),
+        'transcriptsPerSecond': round(count / elapsed, 1) if elapsed else None,
+        'stages': samples.report(),
+    }
+
+
+def run_latency_pass(processor, corpus: Dict[str, list], uploader_batch: int) -> Dict:
+    """Sequential pass over every input with exact per-stage spans"""
+    samples = StageSamples()
+    outputs = []
+    for stage, handler, inputs in (('voiceTotal', processor.process_voice_transaction, corpus['audio']),
+                                   ('imageTotal', processor.process_image_transaction, corpus['images']),
+                                   ('parse', processor.parse_filipino_transaction, corpus['transcripts'])):
+        for data in inputs:
+            items, elapsed = _timed(samples, stage, handler, data)
+            if items:
+                outputs.append(processor.generate_transaction_json(items, elapsed))
+    for i in range(0, len(outputs), uploader_batch):
+        _timed(samples, 'sendBatch', processor.uploader.send_batch, outputs[i:i + uploader_batch])
+    return {'transactions': len(outputs), 'stages': samples.report()}
+
+
+def run_throughput_pass(processor, corpus: Dict[str, list], timeout: float) -> Dict:
+    """Push all audio and images through the running pipeline and drain it"""
+    runner = threading.Thread(target=processor.start_processing, name='bench-pipeline', daemon=True)
+    runner.start()
+    if not processor.ready_event.wait(timeout):
+        raise RuntimeError("pipeline did not start")
+    pipeline = processor.pipeline
+
+    start = time.perf_counter()
+    for audio in corpus['audio']:
+        processor.submit_audio(audio)
+    for image in corpus['images']:
+        processor.enqueue_frame(image)
+    # stop_processing drains every queued item through to the sender
+    processor.stop_event.set()
+    runner.join(timeout)
+    elapsed = time.perf_counter() - start
+
+    inputs = len(corpus['audio']) + len(corpus['images'])
+    return {
+        'inputs': inputs,
+        'elapsedS': round(elapsed, 3),
+        'inputsPerSecond': round(inputs / elapsed, 2) if elapsed else None,
+        'pipeline': pipeline.stats(),
+        'sources': {'audio': processor.audio_queue.stats(), 'image': processor.image_queue.stats()},
+        'completed': not runner.is_alive(),
+    }
+
+
+def run_benchmark(processor_factory: Callable, corpus_dir: str, parse_only: bool = False,
+                  repeat: int = 1, catalog_db: Optional[str] = None, timeout: float = 600.0) -> Dict:
+    """Build a processor against a stub hub and benchmark it on corpus_dir"""
+    corpus = load_corpus(corpus_dir)
+    workdir = tempfile.mkdtemp(prefix='edge-bench-')
+    hub = HubStub()
+    os.environ.update({
+        'API_ENDPOINT': hub.start(),
+        'OFFLINE_DIR': os.path.join(workdir, 'offline'),
+        'CATALOG_DB': catalog_db or os.path.join(workdir, 'catalog.db'),
+        'METRICS_PORT': '0',
+        'AUDIO_SOURCE': '',
+        'CAMERA_SOURCE': '',
+        'INPUT_SOURCES': '',
+        # Every corpus image is measured, however long it queues
+        'IMAGE_MAX_AGE': '0',
+    })
+    if parse_only:
+        # The text path needs neither STT nor OpenCV (unless a role was asked for)
+        os.environ.setdefault('EDGE_ROLE', 'parse')
+
+    report = {
+        'benchmark': 'edge-parse-only' if parse_only else 'edge-pipeline',
+        'corpus': {kind: len(values) for kind, values in corpus.items()},
+        'load': {},
+    }
+    # Processing paths echo every transaction; keep stdout for the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        processor = processor_factory()
+        report['load']['processorS'] = round(time.perf_counter() - start, 3)
+        pipeline_ran = False
+        try:
+            report['role'] = processor.role
+            # Inputs the role has no capability for are left out
+            if processor.stt is None:
+                corpus['audio'] = []
+            if processor.ocr is None:
+                corpus['images'] = []
+            if parse_only:
+                report['parse'] = run_parse_only(processor, corpus['transcripts'], repeat)
+            else:
+                if corpus['audio']:
+                    report['load']['sttS'] = _load_time(processor.stt)
+                if corpus['images']:
+                    report['load']['ocrS'] = _load_time(processor.ocr)
+                report['latency'] = run_latency_pass(processor, corpus, processor.batch_size)
+                if corpus['audio'] or corpus['images']:
+                    pipeline_ran = True
+                    report['throughput'] = run_throughput_pass(processor, corpus, timeout)
+        finally:
+            # A pipeline run shuts the processor down itself
+            if not pipeline_ran:
+                processor.stop_processing()
+            hub.stop()
+
+    report['hub'] = {
+        'requests': hub.requests,
+        'transactions': hub.transactions,
+        'bytesReceived': hub.bytes_received,
+    }
+    report['peakRss'] = peak_rss_mb()
+    return report
@@ -0,0 +1,225 @@
+"""
+Multi-source input fan-in
+One device can serve several counters, each with its own microphone and
+camera and its own device identity, while sharing the one STT engine and
+the one OCR engine. A FairScheduler stands in for a stage's input queue:
+every source gets a bounded lane, and workers take from the lane that has
+used the least engine time per unit of priority (weighted fair queuing on
+measured service time), so a busy counter cannot starve a quiet one.
+
+When the device saturates, lanes shed load instead of growing: work that
+has waited longer than its lane's max_age is skipped at dispatch, and a
+full lane that allows it drops its oldest entry (the stalest frame) to
+make room for the newest.
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from metrics import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in a lane's running service-time estimate
+COST_SMOOTHING = 0.3
+
+
+@dataclass
+class InputSource:
+    name: str
+    device_id: str
+    audio: str = ''  # 'mic', 'mic:<index>', a WAV file path, or empty
+    camera: str = ''  # device index, a video file path, or empty
+    priority: float = 1.0  # share of engine time relative to other sources
+
+
+def read_sources(path: str, default: InputSource) -> List[InputSource]:
+    """Sources from the INPUT_SOURCES JSON file, or just the default one
+
+    The file holds a list of {"name", "deviceId", "audio", "camera",
+    "priority"} objects; deviceId defaults to the device's own id with the
+    name appended.
+    """
+    if not path:
+        return [default]
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    if not isinstance(config, list) or not config:
+        raise ValueError(f"{path}: expected a non-empty JSON list of sources")
+    sources = []
+    for entry in config:
+        name = str(entry['name'])
+        sources.append(InputSource(
+            name=name,
+            device_id=entry.get('deviceId') or f"{default.device_id}-{name}",
+            audio=entry.get('audio', ''),
+            camera=str(entry.get('camera', '')),
+            priority=float(entry.get('priority', 1.0))
+        ))
+    for attr in ('name', 'device_id'):
+        values = [getattr(source, attr) for source in sources]
+        if len(set(values)) != len(values):
+            raise ValueError(f"{path}: duplicate source {attr}")
+    if any(source.priority <= 0 for source in sources):
+        raise ValueError(f"{path}: priority must be positive")
+    return sources
+
+
+class SourceWork(NamedTuple):
+    source: str
+    payload: Any
+    enqueued: float  # time.monotonic() when queued
+    reply: Optional[Future] = None  # set for callers waiting on the result
+
+
+class _Lane:
+    __slots__ = ('source', 'weight', 'capacity', 'max_age', 'drop_oldest', 'items', 'vtime', 'cost',
+                 'dispatched', 'shed', 'busy')
+
+    def __init__(self, source: str, weight: float, capacity: int, max_age: float, drop_oldest: bool):
+        self.source = source
+        self.weight = weight
+        self.capacity = capacity
+        self.max_age = max_age
+        self.drop_oldest = drop_oldest
+        self.items: deque = deque()
+        self.vtime = 0.0  # engine seconds used / weight
+        self.cost = 0.0  # running estimate of seconds per item
+        self.dispatched = 0
+        self.shed = {'stale': 0, 'overflow': 0}
+        self.busy = 0
+
+
+class FairScheduler:
+    """Per-source lanes behind a queue.Queue-style put/get
+
+    Anything put that is not a SourceWork (the pipeline's stop sentinels)
+    is handed out only once every lane is empty. Handlers call done() with
+    the seconds each item took so the lane is charged its real engine time.
+    """
+
+    def __init__(self, name: str, capacity: int = 64, metrics: Optional[MetricsRegistry] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.capacity = capacity
+        self.metrics = metrics or MetricsRegistry()
+        self.clock = clock
+        self._lanes: Dict[str, _Lane] = {}
+        self._control: deque = deque()
+        self._vtime = 0.0
+        self._cond = threading.Condition()
+
+    def add_source(self, source: str, priority: float = 1.0, capacity: Optional[int] = None,
+                   max_age: float = 0.0, drop_oldest: bool = False):
+        """Give a source its own lane (max_age 0 never expires work)"""
+        with self._cond:
+            self._lanes[source] = _Lane(source, priority, capacity or self.capacity, max_age, drop_oldest)
+        self.metrics.gauge('edge_source_queue_depth', lambda lane=self._lanes[source]: len(lane.items),
+                           queue=self.name, source=source)
+
+    @property
+    def sources(self) -> List[str]:
+        return list(self._lanes)
+
+    def submit(self, source: str, payload: Any, reply: Optional[Future] = None, block: bool = True,
+               timeout: Optional[float] = None):
+        self.put(SourceWork(source, payload, self.clock(), reply), block, timeout)
+
+    def put(self, item: Any, block: bool = True, timeout: Optional[float] = None):
+        with self._cond:
+            if not isinstance(item, SourceWork):
+                self._control.append(item)
+                self._cond.notify_all()
+                return
+            lane = self._lanes[item.source]
+            if len(lane.items) >= lane.capacity:
+                if lane.drop_oldest:
+                    self._shed(lane, lane.items.popleft(), 'overflow')
+                elif not block or not self._cond.wait_for(lambda: len(lane.items) < lane.capacity, timeout):
+                    raise queue.Full
+            if not lane.items and not lane.busy:
+                # An idle lane rejoins at the current virtual time rather
+                # than spending credit saved up while it had nothing to do
+                lane.vtime = max(lane.vtime, self._vtime)
+            lane.items.append(item)
+            self._cond.notify_all()
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        deadline = None if timeout is None else self.clock() + timeout
+        with self._cond:
+            while True:
+                item = self._next()
+                if item is not None:
+                    return item
+                remaining = None if deadline is None else deadline - self.clock()
+                if not block or (remaining is not None and remaining <= 0):
+                    raise queue.Empty
+                self._cond.wait(remaining)
+
+    def get_nowait(self) -> Any:
+        return self.get(block=False)
+
+    def _next(self) -> Any:
+        now = self.clock()
+        while True:
+            ready = [lane for lane in self._lanes.values() if lane.items]
+            if not ready:
+                return self._control.popleft() if self._control else None
+            lane = min(ready, key=lambda l: l.vtime)
+            item = lane.items.popleft()
+            self._cond.notify_all()  # a put may be waiting for room
+            if lane.max_age and now - item.enqueued > lane.max_age:
+                self._shed(lane, item, 'stale')
+                continue
+            self._vtime = lane.vtime
+            # Charge the estimate now so concurrent workers spread out;
+            # done() settles the difference once the real cost is known
+            lane.vtime += lane.cost / lane.weight
+            lane.dispatched += 1
+            lane.busy += 1
+            self.metrics.observe('edge_source_wait_seconds', now - item.enqueued, queue=self.name,
+                                 source=lane.source)
+            return item
+
+    def done(self, item: SourceWork, seconds: float):
+        """Settle an item's lane with the engine time it actually took"""
+        with self._cond:
+            lane = self._lanes[item.source]
+            lane.busy -= 1
+            lane.vtime += (seconds - lane.cost) / lane.weight
+            lane.cost += (seconds - lane.cost) * COST_SMOOTHING
+
+    def _shed(self, lane: _Lane, item: SourceWork, reason: str):
+        lane.shed[reason] += 1
+        self.metrics.inc('edge_source_shed_total', queue=self.name, source=lane.source, reason=reason)
+        if item.reply is not None:
+            item.reply.set_result(None)
+        logger.debug(f"{self.name}: shed {reason} work from {lane.source}")
+
+    def task_done(self):
+        """Accepted for queue.Queue compatibility; lanes need no accounting"""
+
+    def qsize(self) -> int:
+        with self._cond:
+            return sum(len(lane.items) for lane in self._lanes.values()) + len(self._control)
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._cond:
+            return {
+                lane.source: {
+                    'priority': lane.weight,
+                    'queued': len(lane.items),
+                    'dispatched': lane.dispatched,
+                    'shed': dict(lane.shed),
+                    'costMs': round(lane.cost * 1000, 2),
+                }
+                for lane in self._lanes.values()
+            }
+
@@ -0,0 +1,188 @@
+"""
+Multi-source fan-in harness
+Runs the processor's pipeline with several simulated counters sharing one
+STT engine and one OCR engine, and reports per-source latency under
+contention. Engines are simulated (a fixed service time per clip or frame)
+so the run needs no models; everything else - per-source lanes, the stage
+workers, fusion, per-device transaction ids and the uploader - is the real
+path, posting to a local stub hub.
+
+The default mix saturates the OCR engine with one busy camera while the
+other counters stay light. The same load then runs through a single FIFO
+queue per stage, as before fan-in, for comparison.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+from edge_bench import HubStub, percentiles
+from fanin import SourceWork
+
+logger = logging.getLogger(__name__)
+
+# name, priority, voice clips per second, receipt frames per second
+DEFAULT_SOURCES = [
+    ('counter-1', 1.0, 0.5, 12.0),  # busy camera
+    ('counter-2', 1.0, 0.5, 1.0),
+    ('express', 2.0, 1.0, 1.0),
+]
+TRANSCRIPT = 'isang coke'
+
+
+class FifoQueue(queue.Queue):
+    """One shared FIFO for all sources: the stage queue before fan-in"""
+
+    def submit(self, source: str, payload, reply=None, block: bool = True, timeout: Optional[float] = None):
+        self.put(SourceWork(source, payload, time.monotonic(), reply), block, timeout)
+
+    def done(self, item: SourceWork, seconds: float):
+        pass
+
+    def stats(self) -> Dict:
+        return {}
+
+
+class SimulatedEngines:
+    """Stand-ins for STT and OCR that take a fixed time and record each input's latency"""
+
+    def __init__(self, processor, stt_ms: float, ocr_ms: float):
+        self.processor = processor
+        self.stt_s = stt_ms / 1000
+        self.ocr_s = ocr_ms / 1000
+        self.latency: Dict[str, Dict[str, List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def _serve(self, kind: str, payload, seconds: float):
+        source, created = payload
+        time.sleep(seconds)
+        with self._lock:
+            self.latency.setdefault(source, {}).setdefault(kind, []).append(time.perf_counter() - created)
+        return self.processor.parse_filipino_transaction(TRANSCRIPT)
+
+    def voice(self, payload):
+        return self._serve('voice', payload, self.stt_s)
+
+    def image(self, payload):
+        return self._serve('image', payload, self.ocr_s)
+
+
+def _produce(submit: Callable, source: str, rate: float, until: float, rng: random.Random, counts: Counter,
+             kind: str):
+    """Poisson arrivals at rate per second until the deadline"""
+    if rate <= 0:
+        return
+    next_at = time.perf_counter() + rng.expovariate(rate)
+    while next_at < until:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        submit((source, time.perf_counter()), source)
+        counts[(source, kind)] += 1
+        next_at += rng.expovariate(rate)
+
+
+def run_once(processor_factory: Callable, sources, duration: float, stt_ms: float, ocr_ms: float,
+             fifo: bool, seed: int, timeout: float = 120.0) -> Dict:
+    """One run of the simulated counters against a fresh processor"""
+    processor = processor_factory()
+    engines = SimulatedEngines(processor, stt_ms, ocr_ms)
+    processor.process_voice_transaction = engines.voice
+    processor.process_image_transaction = engines.image
+    devices = Counter()
+    processor.echo_transaction = lambda transaction: devices.update([transaction['deviceId']])
+    if fifo:
+        processor.audio_queue = FifoQueue(maxsize=processor.audio_queue.capacity)
+        processor.image_queue = FifoQueue(maxsize=processor.image_queue.capacity)
+
+    runner = threading.Thread(target=processor.start_processing, name='fanin-pipeline', daemon=True)
+    runner.start()
+    if not processor.ready_event.wait(timeout):
+        raise RuntimeError("pipeline did not start")
+
+    counts = Counter()
+    until = time.perf_counter() + duration
+    producers = []
+    for index, (name, _, voice_rate, image_rate) in enumerate(sources):
+        for kind, submit, rate in (('voice', processor.submit_audio, voice_rate),
+                                   ('image', processor.enqueue_frame, image_rate)):
+            rng = random.Random(seed * 1000 + index * 2 + (kind == 'image'))
+            thread = threading.Thread(target=_produce, args=(submit, name, rate, until, rng, counts, kind),
+                                      name=f"sim-{name}-{kind}", daemon=True)
+            thread.start()
+            producers.append(thread)
+    for thread in producers:
+        thread.join(timeout)
+    # stop_processing drains what is still queued
+    processor.stop_event.set()
+    runner.join(timeout)
+    stats = {'audio': processor.audio_queue.stats(), 'image': processor.image_queue.stats()}
+
+    report = {}
+    for name, priority, _, _ in sources:
+        device_id = processor.sources[name].device_id
+        entry = {'deviceId': device_id, 'priority': priority, 'transactions': devices[device_id]}
+        for kind, stage in (('voice', 'audio'), ('image', 'image')):
+            samples = engines.latency.get(name, {}).get(kind, [])
+            entry[kind] = {
+                'submitted': counts[(name, kind)],
+                'served': len(samples),
+                'shed': stats[stage].get(name, {}).get('shed'),
+                'latency': percentiles(samples) if samples else None,
+            }
+        report[name] = entry
+    return {'completed': not runner.is_alive(), 'sources': report}
+
+
+def run_fanin_harness(processor_factory: Callable, sources=None, duration: float = 20.0, stt_ms: float = 400.0,
+                      ocr_ms: float = 120.0, compare_fifo: bool = True, seed: int = 0) -> Dict:
+    sources = sources or DEFAULT_SOURCES
+    workdir = tempfile.mkdtemp(prefix='edge-fanin-')
+    config = os.path.join(workdir, 'sources.json')
+    with open(config, 'w') as f:
+        json.dump([{'name': name, 'priority': priority} for name, priority, _, _ in sources], f)
+
+    hub = HubStub()
+    os.environ.update({
+        'API_ENDPOINT': hub.start(),
+        'OFFLINE_DIR': os.path.join(workdir, 'offline'),
+        'CATALOG_DB': os.path.join(workdir, 'catalog.db'),
+        'METRICS_PORT': '0',
+        'EDGE_ROLE': 'full',
+        'INPUT_SOURCES': config,
+        'CPU_EXECUTOR': 'thread',
+        'AUDIO_WORKERS': '1',
+        'IMAGE_WORKERS': '1',
+        'FUSION_WINDOW': '0',
+    })
+    try:
+        report = {
+            'durationS': duration,
+            'engines': {'sttMs': stt_ms, 'ocrMs': ocr_ms},
+            'load': {name: {'priority': priority, 'voicePerS': voice, 'imagesPerS': images}
+                     for name, priority, voice, images in sources},
+            'fair': run_once(processor_factory, sources, duration, stt_ms, ocr_ms, False, seed),
+        }
+        if compare_fifo:
+            report['fifo'] = run_once(processor_factory, sources, duration, stt_ms, ocr_ms, True, seed)
+    finally:
+        hub.stop()
+    report['hub'] = {'transactions': hub.transactions}
+
+    fair = report['fair']['sources']
+    report['checks'] = {
+        'completed': report['fair']['completed'],
+        'everySourceServed': all(entry[kind]['served'] > 0 for entry in fair.values() for kind in ('voice', 'image')
+                                 if entry[kind]['submitted']),
+        # One transaction per served input, under that source's own device id
+        'transactionsTaggedPerSource': all(entry['transactions'] == entry['voice']['served'] + entry['image']['served']
+                                           for entry in fair.values()),
+    }
+    return report
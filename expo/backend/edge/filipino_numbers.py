@@ -0,0 +1,317 @@
+"""
+Tokenizer and quantity parser for Filipino/Taglish transactions
+One regex pass turns a transcription into word, number and punctuation
+tokens; number phrases are then read off the tokens with place-value rules
+from module-level tables:
+
+    "dalawampu't limang"        -> 25
+    "tatlong daan at limampu"    -> 350
+    "labing-isa", "labindalawa"  -> 11, 12
+    "kalahating kilo"            -> 0.5
+    "isa't kalahati"             -> 1.5
+    "tig-dalawa"                 -> 2 each
+    "bente singko pesos", "₱25"  -> 25 pesos
+    "kwarenta'y singko"          -> 45
+    "1.5 litro"                  -> 1.5 (decimal points never split segments)
+
+Segments are split on punctuation and joining words ("at", "tsaka"), except
+where the joiner sits inside a number phrase.
+"""
+
+import math
+import re
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Native Tagalog counting words
+ONES = {
+    'isa': 1, 'dalawa': 2, 'dalwa': 2, 'tatlo': 3, 'apat': 4, 'lima': 5,
+    'anim': 6, 'pito': 7, 'walo': 8, 'siyam': 9, 'syam': 9,
+}
+TENS = {
+    'sampu': 10, 'dalawampu': 20, 'tatlumpu': 30, 'tatlompu': 30, 'apatnapu': 40,
+    'limampu': 50, 'animnapu': 60, 'pitumpu': 70, 'pitompu': 70, 'walumpu': 80,
+    'walompu': 80, 'siyamnapu': 90,
+}
+# Spanish-derived numbers, common for prices ("bente singko")
+SPANISH = {
+    'uno': 1, 'dos': 2, 'tres': 3, 'kuwatro': 4, 'kwatro': 4, 'singko': 5, 'sais': 6,
+    'siyete': 7, 'syete': 7, 'otso': 8, 'nuwebe': 9, 'diyes': 10, 'dyes': 10, 'onse': 11,
+    'dose': 12, 'trese': 13, 'katorse': 14, 'kinse': 15, 'disisais': 16, 'disisyete': 17,
+    'disiotso': 18, 'disinuwebe': 19, 'bente': 20, 'beinte': 20, 'trenta': 30,
+    'treinta': 30, 'kuwarenta': 40, 'kwarenta': 40, 'singkuwenta': 50, 'singkwenta': 50,
+    'sesenta': 60, 'setenta': 70, 'otsenta': 80, 'nobenta': 90,
+}
+ENGLISH = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7, 'eight': 8,
+    'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12, 'thirteen': 13, 'fourteen': 14,
+    'fifteen': 15, 'sixteen': 16, 'seventeen': 17, 'eighteen': 18, 'nineteen': 19,
+    'twenty': 20, 'thirty': 30, 'forty': 40, 'fifty': 50, 'sixty': 60, 'seventy': 70,
+    'eighty': 80, 'ninety': 90,
+}
+HUNDREDS = {'daan': 100, 'raan': 100, 'hundred': 100, 'siyento': 100, 'syento': 100}
+THOUSANDS = {'libo': 1000, 'thousand': 1000, 'mil': 1000}
+# "sandaan" / "sanlibo": one hundred / one thousand
+ONE_TIMES = {'sandaan': 100, 'sangdaan': 100, 'sanlibo': 1000, 'sanglibo': 1000}
+FRACTIONS = {'kalahati': 0.5, 'half': 0.5, 'sangkapat': 0.25, 'quarter': 0.25}
+
+# Base words for callers that build phrases (e.g. the load generator)
+NUMBER_WORDS: Dict[str, int] = {**ONES, **TENS}
+
+CONJUNCTIONS = frozenset({'at', 'y', 'and'})
+PESO_WORDS = frozenset({'piso', 'peso', 'pesos', 'php'})
+SEGMENT_WORDS = frozenset({'at', 'tsaka', 'saka', 'and', 'tapos', 'pati', 'plus'})
+SEGMENT_PUNCT = frozenset(',;.!?/')
+
+ADDITIVE = 'add'
+HUNDRED = 'hundred'
+THOUSAND = 'thousand'
+FRACTION = 'fraction'
+
+_WORDS: Dict[str, Tuple[str, float]] = {}
+for _table in (ONES, TENS, SPANISH, ENGLISH):
+    _WORDS.update({word: (ADDITIVE, value) for word, value in _table.items()})
+_WORDS.update({word: (HUNDRED, value) for word, value in HUNDREDS.items()})
+_WORDS.update({word: (THOUSAND, value) for word, value in THOUSANDS.items()})
+_WORDS.update({word: (FRACTION, value) for word, value in FRACTIONS.items()})
+
+# Words first: they are most of every transcript
+_TOKEN = re.compile(
+    r"(?P<word>[^\W\d_]+(?:['’-][^\W\d_]+)*)"
+    r"|(?P<number>(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?)"
+    r"|(?P<peso>₱\s*(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?)"
+    r"|(?P<punct>[^\w\s])"
+)
+# labing-isa, labindalawa, labimpito, labing walo (split form is joined by the reader)
+_TEEN = re.compile(r"^labi(?:ng|n|m)-?([a-z]+)$")
+_JOINERS = ("'t", "'y")
+_TIG = re.compile(r"^tig-?([a-z]+)$")
+
+
+class Token(NamedTuple):
+    text: str
+    start: int
+    end: int
+    kind: str  # 'word', 'number', 'peso' or 'punct'
+
+
+class Quantity(NamedTuple):
+    value: float
+    start: int
+    end: int
+    each: bool = False  # "tig-": per person / per piece
+    peso: bool = False  # an amount of money, not a count
+
+
+class Segment(NamedTuple):
+    text: str
+    start: int
+    quantities: List[Quantity]  # offsets relative to the segment text
+
+
+def tokenize(text: str) -> List[Token]:
+    return [Token(m.group(), m.start(), m.end(), m.lastgroup) for m in _TOKEN.finditer(text)]
+
+
+def _numeric(text: str) -> float:
+    value = float(text.lstrip('₱').strip().replace(',', ''))
+    return int(value) if value.is_integer() else value
+
+
+@lru_cache(maxsize=8192)
+def word_value(word: str) -> Optional[Tuple[str, float]]:
+    """(role, value) of one number word, allowing linker suffixes ("isang", "daang")"""
+    word = word.lower().replace('’', "'")
+    if word.endswith(_JOINERS):
+        word = word[:-2]
+    for candidate in (word, word[:-2] if word.endswith('ng') else None, word[:-1] if word.endswith('g') else None):
+        if not candidate:
+            continue
+        entry = _WORDS.get(candidate)
+        if entry:
+            return entry
+        if candidate in ONE_TIMES:
+            value = ONE_TIMES[candidate]
+            return (HUNDRED if value == 100 else THOUSAND), value
+        teen = _TEEN.match(candidate)
+        if teen and teen.group(1) in ONES:
+            return ADDITIVE, 10 + ONES[teen.group(1)]
+    return None
+
+
+@lru_cache(maxsize=8192)
+def _tig_value(word: str) -> Optional[float]:
+    """'tig-dalawa', 'tigtatlo', 'tig-iisa' (reduplicated) -> 2, 3, 1"""
+    match = _TIG.match(word.lower())
+    if not match:
+        return None
+    rest = match.group(1)
+    for candidate in (rest, rest[1:], rest[2:]):
+        entry = word_value(candidate) if candidate else None
+        if entry and entry[0] == ADDITIVE:
+            return entry[1]
+    return None
+
+
+class _Reader:
+    """Place-value accumulator for one number phrase"""
+
+    def __init__(self):
+        self.total = 0.0
+        self.current = 0.0
+        self.floor = math.inf  # every further addend must be smaller than this
+        self.started = False
+        self.fraction_done = False
+
+    def accepts(self, role: str, value: float, after_conjunction: bool) -> bool:
+        if self.fraction_done:
+            return False
+        if role == ADDITIVE:
+            return value < self.floor
+        if role == HUNDRED:
+            # "tatlong daan", not "isang daan daan"
+            return self.current < 10 and not after_conjunction
+        if role == THOUSAND:
+            return self.total == 0 and self.current < 1000 and not after_conjunction
+        # "kalahati" alone, or "isa't kalahati" / "isa at kalahati"
+        return not self.started or after_conjunction
+
+    def add(self, role: str, value: float):
+        if role == ADDITIVE:
+            self.current += value
+            self.floor = value
+        elif role == HUNDRED:
+            self.current = (self.current or 1) * value
+            self.floor = value
+        elif role == THOUSAND:
+            self.total += (self.current or 1) * value
+            self.current = 0.0
+            self.floor = value
+        else:
+            self.current += value
+            self.fraction_done = True
+        self.started = True
+
+    @property
+    def value(self) -> float:
+        value = self.total + self.current
+        return int(value) if float(value).is_integer() else value
+
+
+def _joined(token: Token) -> bool:
+    """'t / 'y glue the next word on: "dalawampu't lima", "kwarenta'y singko"""
+    return token.text.lower().replace('’', "'").endswith(_JOINERS)
+
+
+def _number_word(tokens: List[Token], k: int) -> Optional[Tuple[Tuple[str, float], int]]:
+    """Number word at tokens[k] with the index of its last token ("labing isa" spans two)"""
+    token = tokens[k]
+    if token.kind != 'word':
+        return None
+    if token.text.lower() in ('labing', 'labin', 'labi') and k + 1 < len(tokens):
+        teen = word_value(token.text + tokens[k + 1].text)
+        if teen:
+            return teen, k + 1
+    entry = word_value(token.text)
+    return (entry, k) if entry else None
+
+
+def _read_number(tokens: List[Token], i: int) -> Optional[Tuple[Quantity, int]]:
+    """Number phrase starting at tokens[i], with the index after it"""
+    token = tokens[i]
+    n = len(tokens)
+    each = False
+    if token.kind in ('number', 'peso'):
+        value, end, j, peso = _numeric(token.text), token.end, i + 1, token.kind == 'peso'
+    elif token.kind == 'word':
+        found = _number_word(tokens, i)
+        if found is None:
+            tig = _tig_value(token.text)
+            if tig is None:
+                return None
+            found, each = ((ADDITIVE, tig), i), True
+
+        reader = _Reader()
+        while True:
+            entry, last = found
+            reader.add(*entry)
+            end, j, joined = tokens[last].end, last + 1, _joined(tokens[last])
+            if j >= n:
+                break
+            # A standalone conjunction only counts when the number goes on after it
+            k, conjunction = j, joined
+            if not joined and tokens[j].kind == 'word' and tokens[j].text.lower() in CONJUNCTIONS and j + 1 < n:
+                k, conjunction = j + 1, True
+            found = _number_word(tokens, k)
+            if found is None or not reader.accepts(*found[0], conjunction):
+                break
+        value, peso = reader.value, False
+    else:
+        return None
+
+    # Linker after consonant-final numbers ("apat na"), then an optional currency word
+    if j < n and tokens[j].text.lower() == 'na' and tokens[i].kind == 'word':
+        end, j = tokens[j].end, j + 1
+    if j < n and tokens[j].kind == 'word' and tokens[j].text.lower() in PESO_WORDS:
+        end, j, peso = tokens[j].end, j + 1, True
+    return Quantity(value, token.start, end, each=each, peso=peso), j
+
+
+def _starts_number(token: Token) -> bool:
+    """Cheap pre-check so ordinary words skip the phrase reader"""
+    if token.kind == 'word':
+        text = token.text.lower()
+        return word_value(text) is not None or text.startswith(('tig', 'labi'))
+    return token.kind != 'punct'
+
+
+def read_quantities(text: str, tokens: Optional[List[Token]] = None) -> List[Quantity]:
+    """Every number phrase in text, left to right"""
+    tokens = tokens if tokens is not None else tokenize(text)
+    quantities = []
+    i = 0
+    while i < len(tokens):
+        found = _read_number(tokens, i) if _starts_number(tokens[i]) else None
+        if found:
+            quantity, i = found
+            quantities.append(quantity)
+        else:
+            i += 1
+    return quantities
+
+
+def split_transaction(text: str) -> List[Segment]:
+    """Tokenize once and cut into per-item segments with their quantities
+
+    Joiners and punctuation consumed by a number phrase ("isang daan at
+    lima", "1.5") never split.
+    """
+    tokens = tokenize(text)
+    segments = []
+    first = last = None
+    quantities: List[Quantity] = []
+    i = 0
+    n = len(tokens)
+    while i < n:
+        token = tokens[i]
+        found = _read_number(tokens, i) if _starts_number(token) else None
+        if found:
+            quantity, i = found
+            if first is None:
+                first = quantity.start
+            quantities.append(quantity._replace(start=quantity.start - first, end=quantity.end - first))
+            last = quantity.end
+            continue
+        i += 1
+        if (token.kind == 'punct' and token.text in SEGMENT_PUNCT) or (
+                token.kind == 'word' and token.text.lower() in SEGMENT_WORDS):
+            if first is not None:
+                segments.append(Segment(text[first:last], first, quantities))
+            first, quantities = None, []
+        else:
+            if first is None:
+                first = token.start
+            last = token.end
+    if first is not None:
+        segments.append(Segment(text[first:last], first, quantities))
+    return segments
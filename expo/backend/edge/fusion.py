@@ -0,0 +1,280 @@
+"""
+Voice + receipt fusion
+When a sale is captured by both the microphone and the camera, the STT and
+OCR paths each produce items for it. TransactionFuser holds results per
+device for a short window, pairs a voice result with a receipt result that
+lands inside it and lists at least one of the same products, and emits one
+merged transaction; anything left alone when its window closes is emitted
+as it is, so two different customers' sales are never merged. Each device keeps at most
+max_pending results, so memory and added latency are both bounded.
+
+fuse_items aligns the two item lists by SKU, then by phonetic name
+similarity with brand agreement as a tie-breaker. A matched pair keeps the
+catalog naming from speech and the printed price from the receipt, and
+its confidence combines both sources as independent evidence.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from fuzzy_index import phonetic_key, similarity
+from transaction_format import TransactionItem
+
+logger = logging.getLogger(__name__)
+
+VOICE = 'voice'
+IMAGE = 'image'
+
+# Minimum name similarity for a voice item and a receipt line to be one product
+MATCH_THRESHOLD = 0.72
+# Confidence factor when the two sources disagree on quantity
+DISAGREEMENT_PENALTY = 0.8
+
+
+def _names(item: TransactionItem) -> List[str]:
+    names = [item.productName, item.genericName, item.localName]
+    if item.brandName:
+        names.append(f"{item.brandName} {item.productName}")
+    return [phonetic_key(name) for name in names if name]
+
+
+def match_score(voice: TransactionItem, receipt: TransactionItem) -> float:
+    """How likely two items from different sources are the same product (0..1)"""
+    if voice.sku and voice.sku == receipt.sku:
+        return 1.0
+    receipt_names = _names(receipt)
+    score = max((similarity(a, b) for a in _names(voice) for b in receipt_names), default=0.0)
+    # Receipts abbreviate ("COKE 1.5L"); a voice name contained in the line counts
+    if any(a and a in b for a in _names(voice) for b in receipt_names):
+        score = max(score, 0.9)
+    if voice.brandName and receipt.brandName:
+        score += 0.05 if voice.brandName == receipt.brandName else -0.1
+    return min(score, 1.0)
+
+
+def combine_confidence(a: float, b: float) -> float:
+    """Noisy-OR of two independent detections"""
+    return round(1.0 - (1.0 - a) * (1.0 - b), 3)
+
+
+def merge_item(voice: TransactionItem, receipt: TransactionItem) -> TransactionItem:
+    """One item from a matched voice/receipt pair"""
+    confidence = combine_confidence(voice.confidence, receipt.confidence)
+    notes = [note for note in (voice.notes, receipt.notes) if note]
+    # The printed quantity and price win; a mismatch is kept visible
+    if voice.quantity != receipt.quantity:
+        confidence = round(confidence * DISAGREEMENT_PENALTY, 3)
+        notes.append(f"quantity: voice {voice.quantity}, receipt {receipt.quantity}")
+    return replace(
+        voice,
+        brandName=voice.brandName or receipt.brandName,
+        sku=voice.sku or receipt.sku,
+        quantity=receipt.quantity,
+        unitPrice=receipt.unitPrice,
+        totalPrice=receipt.totalPrice,
+        isUnbranded=voice.isUnbranded and receipt.isUnbranded,
+        isBulk=voice.isBulk or receipt.isBulk,
+        detectionMethod='hybrid',
+        confidence=confidence,
+        brandConfidence=receipt.brandConfidence if receipt.brandConfidence is not None else voice.brandConfidence,
+        suggestedBrands=list(dict.fromkeys((voice.suggestedBrands or []) + (receipt.suggestedBrands or []))) or None,
+        notes='; '.join(notes) or None
+    )
+
+
+def detected_brands(items: List[TransactionItem]) -> Dict[str, float]:
+    """Logo detections carried on receipt items: brand -> best confidence"""
+    brands: Dict[str, float] = {}
+    for item in items:
+        if item.brandName and item.brandConfidence is not None:
+            brands[item.brandName] = max(brands.get(item.brandName, 0.0), item.brandConfidence)
+        for brand in item.suggestedBrands or []:
+            brands.setdefault(brand, 0.0)
+    return brands
+
+
+def match_items(voice_items: List[TransactionItem], receipt_items: List[TransactionItem],
+                threshold: float = MATCH_THRESHOLD) -> Dict[int, int]:
+    """Best one-to-one pairing of voice items to receipt lines: voice index -> receipt index"""
+    pairs = sorted(
+        ((match_score(v, r), i, j) for i, v in enumerate(voice_items) for j, r in enumerate(receipt_items)),
+        reverse=True
+    )
+    voice_match: Dict[int, int] = {}
+    receipt_used = set()
+    for score, i, j in pairs:
+        if score < threshold:
+            break
+        if i in voice_match or j in receipt_used:
+            continue
+        voice_match[i] = j
+        receipt_used.add(j)
+    return voice_match
+
+
+def fuse_items(voice_items: List[TransactionItem], receipt_items: List[TransactionItem],
+               threshold: float = MATCH_THRESHOLD, voice_match: Optional[Dict[int, int]] = None
+               ) -> List[TransactionItem]:
+    """Merge both sources' items: matched pairs once, then the leftovers"""
+    if voice_match is None:
+        voice_match = match_items(voice_items, receipt_items, threshold)
+    receipt_used = set(voice_match.values())
+
+    brands = detected_brands(receipt_items)
+    fused = []
+    for i, item in enumerate(voice_items):
+        if i in voice_match:
+            fused.append(merge_item(item, receipt_items[voice_match[i]]))
+        elif item.brandName in brands:
+            # Unlisted on the receipt, but the camera saw its logo
+            fused.append(replace(
+                item, detectionMethod='hybrid', brandConfidence=brands[item.brandName] or item.brandConfidence
+            ))
+        else:
+            fused.append(item)
+    fused.extend(item for j, item in enumerate(receipt_items) if j not in receipt_used)
+    return fused
+
+
+@dataclass
+class PendingResult:
+    source: str
+    items: List[TransactionItem]
+    processing_time: float
+    arrived: float
+    deadline: float
+
+
+@dataclass
+class FusedResult:
+    items: List[TransactionItem]
+    processing_time: float
+    sources: Tuple[str, ...]
+    waited: float  # seconds the first result spent in the window
+    matched: int = 0  # voice/receipt item pairs merged
+
+
+class TransactionFuser:
+    """Per-device time window that pairs voice and receipt results"""
+
+    def __init__(self, emit: Callable[[str, FusedResult], None], window: float = 6.0, max_pending: int = 16,
+                 clock: Callable[[], float] = time.monotonic, metrics=None):
+        self.emit = emit
+        self.window = window
+        self.max_pending = max_pending
+        self.clock = clock
+        self.metrics = metrics
+        self._pending: Dict[str, Deque[PendingResult]] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        if metrics is not None:
+            metrics.gauge('edge_fusion_pending', lambda: sum(self.pending_counts().values()))
+
+    def pending_counts(self) -> Dict[str, int]:
+        """Results waiting for a partner, per device"""
+        return {device_id: len(pending) for device_id, pending in list(self._pending.items())}
+
+    def add(self, device_id: str, source: str, items: List[TransactionItem], processing_time: float):
+        """Offer one source's result; emits at once when it completes a pair"""
+        if not items:
+            return
+        if self.window <= 0:
+            self._emit(device_id, FusedResult(items, processing_time, (source,), 0.0))
+            return
+
+        now = self.clock()
+        ready: List[Tuple[str, FusedResult]] = []
+        with self._cond:
+            pending = self._pending.setdefault(device_id, deque())
+            # Pair with the oldest waiting result from the other source that
+            # describes the same sale, i.e. shares at least one item with it
+            partner, voice_match = None, {}
+            for candidate in pending:
+                if candidate.source == source:
+                    continue
+                voice, image = (items, candidate.items) if source == VOICE else (candidate.items, items)
+                voice_match = match_items(voice, image)
+                if voice_match:
+                    partner = candidate
+                    break
+            if partner is not None:
+                pending.remove(partner)
+                ready.append((device_id, FusedResult(
+                    fuse_items(voice, image, voice_match=voice_match), partner.processing_time + processing_time,
+                    (VOICE, IMAGE), now - partner.arrived, matched=len(voice_match)
+                )))
+            else:
+                pending.append(PendingResult(source, items, processing_time, now, now + self.window))
+                # Bounded memory: the oldest result leaves unpaired
+                while len(pending) > self.max_pending:
+                    ready.append((device_id, self._alone(pending.popleft())))
+                self._cond.notify()
+        for device, result in ready:
+            self._emit(device, result)
+
+    def next_deadline(self) -> Optional[float]:
+        """When the oldest waiting result's window closes"""
+        with self._cond:
+            deadlines = [pending[0].deadline for pending in self._pending.values() if pending]
+        return min(deadlines) if deadlines else None
+
+    def flush_expired(self, now: Optional[float] = None) -> int:
+        """Emit every result whose window has closed; returns how many"""
+        now = self.clock() if now is None else now
+        ready = []
+        with self._cond:
+            for device_id, pending in self._pending.items():
+                while pending and pending[0].deadline <= now:
+                    ready.append((device_id, self._alone(pending.popleft())))
+        for device_id, result in ready:
+            self._emit(device_id, result)
+        return len(ready)
+
+    def flush(self) -> int:
+        """Emit everything still waiting (shutdown)"""
+        return self.flush_expired(float('inf'))
+
+    def _alone(self, result: PendingResult) -> FusedResult:
+        return FusedResult(result.items, result.processing_time, (result.source,), self.clock() - result.arrived)
+
+    def _emit(self, device_id: str, result: FusedResult):
+        if self.metrics is not None:
+            self.metrics.inc('edge_fusion_emitted_total', sources='+'.join(result.sources))
+            self.metrics.observe('edge_fusion_wait_seconds', result.waited)
+        try:
+            self.emit(device_id, result)
+        except Exception as e:
+            logger.error(f"Fusion emit failed for {device_id}: {e}")
+
+    def start(self):
+        if self.window <= 0 or self._thread:
+            return
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='fusion', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                deadline = self.next_deadline()
+                self._cond.wait(None if deadline is None else max(0.0, deadline - self.clock()))
+                if self._stopped:
+                    return
+            self.flush_expired()
+
+    def stop(self, flush: bool = True):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if flush:
+            self.flush()
@@ -0,0 +1,229 @@
+"""
+Fusion test harness
+Feeds paired voice/receipt results through a TransactionFuser on a
+simulated clock and checks what comes out: one transaction per sale, which
+items merged, quantities, and that nothing waits longer than the window.
+
+Built-in fixtures pair a transcript (what STT would return) with receipt
+lines (what OCR would return), so they run without STT or OCR models. A
+directory of real pairs (<name>.wav next to <name>.jpg/.png) runs the full
+STT and OCR paths instead and reports what fused.
+"""
+
+import logging
+import os
+import random
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fusion import IMAGE, VOICE, FusedResult, TransactionFuser
+from ocr_types import OCRLine
+
+logger = logging.getLogger(__name__)
+
+# Seconds between the voice and receipt results of a fixture, relative to
+# the window: 0.5 lands inside it, 1.5 after it closes
+INSIDE = 0.5
+OUTSIDE = 1.5
+
+# name, transcript, receipt lines, receipt offset (x window),
+# expected transactions: [[(product substring, quantity, detectionMethod), ...], ...]
+FIXTURES = [
+    ('same sale', 'dalawang coke at isang lucky me',
+     ['2 COKE 1.5L 130.00', '1 LUCKY ME CANTON 15.00', 'TOTAL 145.00'], INSIDE,
+     [[('coke', 2, 'hybrid'), ('pancit canton', 1, 'hybrid')]]),
+    ('receipt first', 'isang asin',
+     ['1 ASIN 20.00'], -INSIDE,
+     [[('salt', 1, 'hybrid')]]),
+    ('misheard brand', 'dalawang koka',
+     ['2 COCA-COLA 130.00'], INSIDE,
+     [[('coke', 2, 'hybrid')]]),
+    ('quantity disagreement', 'tatlong itlog',
+     ['2 ITLOG 16.00'], INSIDE,
+     [[('eggs', 2, 'hybrid')]]),
+    ('extra receipt line', 'isang coke',
+     ['1 COKE 65.00', '1 CHIPPY 25.00'], INSIDE,
+     [[('coke', 1, 'hybrid'), ('chippy', 1, 'ocr')]]),
+    ('extra spoken item', 'dalawang bigas at isang asukal',
+     ['2 BIGAS 110.00'], INSIDE,
+     [[('rice', 2, 'hybrid'), ('sugar', 1, 'stt')]]),
+    ('separate sales', 'isang gatas',
+     ['1 TINAPAY 20.00'], OUTSIDE,
+     [[('milk', 1, 'stt')], [('bread', 1, 'ocr')]]),
+    ('unrelated sales in one window', 'dalawang coke at isang asin',
+     ['1 TINAPAY 20.00', '3 CHIPPY 75.00', 'TOTAL 95.00'], INSIDE,
+     [[('coke', 2, 'stt'), ('salt', 1, 'stt')], [('bread', 1, 'ocr'), ('chippy', 3, 'ocr')]]),
+    ('voice only', 'dalawang tinapay', [], INSIDE,
+     [[('bread', 2, 'stt')]]),
+    ('receipt only', '', ['3 CHIPPY 75.00'], INSIDE,
+     [[('chippy', 3, 'ocr')]]),
+]
+
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def advance(fuser: TransactionFuser, clock: SimulatedClock, to: float):
+    """Move the clock to `to`, flushing each window as it closes like the fusion thread does"""
+    deadline = fuser.next_deadline()
+    while deadline is not None and deadline <= to:
+        clock.now = deadline
+        fuser.flush_expired()
+        deadline = fuser.next_deadline()
+    clock.now = to
+
+
+def receipt_lines(lines: List[str]) -> List[OCRLine]:
+    """OCR output for printed receipt lines"""
+    return [OCRLine(text, 0.9, (0, 24 * i, 400, 20)) for i, text in enumerate(lines)]
+
+
+def _summary(result: FusedResult) -> List[Tuple[str, float, str]]:
+    return [(item.productName.lower(), item.quantity, item.detectionMethod) for item in result.items]
+
+
+def _matches(got: List[Tuple[str, float, str]], expected: List[Tuple[str, float, str]]) -> bool:
+    if len(got) != len(expected):
+        return False
+    remaining = list(got)
+    for name, quantity, method in expected:
+        hit = next((g for g in remaining if name in g[0] and g[1] == quantity and g[2] == method), None)
+        if hit is None:
+            return False
+        remaining.remove(hit)
+    return True
+
+
+def run_fixture(processor, fixture, window: float) -> Optional[Dict]:
+    """One fixture through a fresh fuser on a simulated clock; None when it passes"""
+    name, transcript, lines, offset, expected = fixture
+    clock = SimulatedClock()
+    emitted: List[FusedResult] = []
+    fuser = TransactionFuser(lambda device, result: emitted.append(result), window=window, clock=clock)
+
+    voice_items = processor.parse_filipino_transaction(transcript) if transcript else []
+    receipt_items = processor.parse_receipt_text(receipt_lines(lines), []) if lines else []
+    events = [(0.0, VOICE, voice_items), (offset * window, IMAGE, receipt_items)]
+    base = min(t for t, _, _ in events)
+    for at, source, items in sorted(events, key=lambda e: e[0]):
+        advance(fuser, clock, at - base)
+        fuser.add('fixture', source, items, 0.0)
+    advance(fuser, clock, clock.now + window)
+
+    got = [_summary(result) for result in emitted]
+    ok = len(got) == len(expected) and all(_matches(g, e) for g, e in zip(got, expected))
+    waited = max((result.waited for result in emitted), default=0.0)
+    if ok and waited <= window:
+        return None
+    return {'fixture': name, 'expected': expected, 'got': got, 'maxWaitS': round(waited, 3)}
+
+
+def run_fixtures(processor, window: float) -> Dict:
+    """Every fixture, each through its own fuser"""
+    failures = [failure for failure in (run_fixture(processor, fixture, window) for fixture in FIXTURES) if failure]
+    return {'fixtures': len(FIXTURES), 'passed': len(FIXTURES) - len(failures), 'failures': failures}
+
+
+def run_stream(processor, window: float, devices: int = 50, sales: int = 2000, max_pending: int = 16,
+               seed: int = 0) -> Dict:
+    """Interleaved sales from many devices: emit-once, wait and memory bounds"""
+    rng = random.Random(seed)
+    clock = SimulatedClock()
+    emitted: List[Tuple[str, FusedResult]] = []
+    fuser = TransactionFuser(lambda device, result: emitted.append((device, result)), window=window,
+                             max_pending=max_pending, clock=clock)
+    pairs = [(processor.parse_filipino_transaction(transcript), processor.parse_receipt_text(receipt_lines(lines), []))
+             for _, transcript, lines, offset, _ in FIXTURES if transcript and lines and offset == INSIDE]
+
+    # Each sale: voice at t, receipt within the window (sometimes missing)
+    events = []
+    t = 0.0
+    for _ in range(sales):
+        t += rng.expovariate(sales / (devices * window * 20))
+        device = f"D{rng.randrange(devices):03d}"
+        voice, receipt = rng.choice(pairs)
+        events.append((t, device, VOICE, voice))
+        if rng.random() < 0.8:
+            events.append((t + rng.uniform(0, window * 0.9), device, IMAGE, receipt))
+    events.sort(key=lambda e: e[0])
+
+    peak_pending = 0
+    start = time.perf_counter()
+    for at, device, source, items in events:
+        advance(fuser, clock, at)
+        fuser.add(device, source, items, 0.0)
+        peak_pending = max(peak_pending, max(fuser.pending_counts().values()))
+    advance(fuser, clock, clock.now + window)
+    elapsed = time.perf_counter() - start
+
+    fused = sum(len(result.sources) > 1 for _, result in emitted)
+    results_in = len(events)
+    results_out = sum(len(result.sources) for _, result in emitted)
+    return {
+        'devices': devices,
+        'sales': sales,
+        'results': results_in,
+        'transactions': len(emitted),
+        'fused': fused,
+        'emittedOnce': results_in == results_out,
+        'maxWaitS': round(max(result.waited for _, result in emitted), 3),
+        'peakPendingPerDevice': peak_pending,
+        'usPerResult': round(elapsed / results_in * 1e6, 1),
+    }
+
+
+def find_pairs(pairs_dir: str) -> List[Tuple[str, str, str]]:
+    """(name, audio path, image path) for every <name>.wav with a same-named image"""
+    files = {}
+    for name in sorted(os.listdir(pairs_dir)):
+        stem, ext = os.path.splitext(name)
+        files.setdefault(stem, {})[ext.lower()] = os.path.join(pairs_dir, name)
+    pairs = []
+    for stem, by_ext in files.items():
+        image = next((by_ext[e] for e in ('.jpg', '.jpeg', '.png') if e in by_ext), None)
+        if '.wav' in by_ext and image:
+            pairs.append((stem, by_ext['.wav'], image))
+    return pairs
+
+
+def run_pairs(processor, pairs_dir: str, window: float) -> List[Dict]:
+    """Real audio/receipt pairs through STT, OCR and fusion"""
+    report = []
+    for name, audio_path, image_path in find_pairs(pairs_dir):
+        with open(audio_path, 'rb') as f:
+            voice_items = processor.process_voice_transaction(f.read())
+        receipt_items = processor.process_image_transaction(image_path)
+        emitted: List[FusedResult] = []
+        fuser = TransactionFuser(lambda device, result: emitted.append(result), window=window,
+                                 clock=SimulatedClock())
+        fuser.add(name, VOICE, voice_items, 0.0)
+        fuser.add(name, IMAGE, receipt_items, 0.0)
+        fuser.flush()
+        report.append({
+            'pair': name,
+            'voiceItems': len(voice_items),
+            'receiptItems': len(receipt_items),
+            'transactions': len(emitted),
+            'items': [_summary(result) for result in emitted],
+        })
+    return report
+
+
+def run_fusion_harness(processor_factory: Callable, pairs_dir: Optional[str] = None, window: float = 6.0) -> Dict:
+    processor = processor_factory()
+    try:
+        report = {
+            'window': window,
+            'fixtures': run_fixtures(processor, window),
+            'stream': run_stream(processor, window),
+        }
+        if pairs_dir:
+            report['pairs'] = run_pairs(processor, pairs_dir, window)
+    finally:
+        processor.stop_processing()
+    return report
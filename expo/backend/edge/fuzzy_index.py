@@ -0,0 +1,161 @@
+"""
+Fuzzy product matching for misheard or misspelled product names
+Catalog terms are reduced to a Filipino-aware phonetic key (c/k/q, f/p, v/b,
+e/i and o/u merge, as they do in Tagalog speech) and indexed by character
+trigrams. A query counts shared trigrams for every term at once with
+numpy over the posting arrays, keeps terms above a Dice threshold, and
+re-ranks the best few by edit similarity, so lookups stay around a
+millisecond at 50k SKUs.
+"""
+
+import math
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+# Spoken fillers that never name a product ("pabili po ng ...")
+FILLER_WORDS = frozenset({
+    'ang', 'ako', 'ate', 'ba', 'bili', 'din', 'ho', 'iyong', 'ko', 'kuya', 'lang', 'mga', 'na',
+    'ng', 'pa', 'pabili', 'pala', 'po', 'rin', 'sa', 'salamat', 'si', 'yung',
+})
+
+# Same phonetic key, different spelling: strong but not an exact match
+PHONETIC_EXACT_SCORE = 0.95
+
+_DIGRAPHS = (('ph', 'p'), ('ch', 'ts'), ('sh', 'sy'), ('th', 't'), ('ck', 'k'), ('qu', 'k'))
+_LETTERS = str.maketrans({'f': 'p', 'v': 'b', 'z': 's', 'q': 'k', 'x': 'ks', 'e': 'i', 'o': 'u'})
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+_SOFT_C = re.compile(r'c(?=[eiy])')
+_FINAL_Y = re.compile(r'y\b')
+_DOUBLED = re.compile(r'(.)\1+')
+
+
+class FuzzyCandidate(NamedTuple):
+    score: float
+    term: str
+    value: Any
+    priority: int
+
+
+def phonetic_key(text: str) -> str:
+    """Spelling-independent form of a Filipino/English product phrase"""
+    text = text.lower().replace('ñ', 'ny')
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    text = _NON_ALNUM.sub(' ', text).strip()
+    for digraph, sound in _DIGRAPHS:
+        text = text.replace(digraph, sound)
+    # Soft c before front vowels ("pancit" ~ "pansit"), hard c elsewhere ("coke" ~ "koka")
+    text = _SOFT_C.sub('s', text).replace('c', 'k')
+    # Word-final y is a vowel ("lucky" ~ "lucki")
+    text = _FINAL_Y.sub('i', text)
+    text = text.translate(_LETTERS)
+    return _DOUBLED.sub(r'\1', text)
+
+
+def trigrams(key: str) -> List[str]:
+    padded = f" {key} "
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+def similarity(a: str, b: str) -> float:
+    return SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+class FuzzyIndex:
+    """Trigram inverted index over phonetic keys of catalog terms"""
+
+    def __init__(self, min_score: float = 0.75, candidate_dice: float = 0.45, rerank: int = 24):
+        self.min_score = min_score
+        self.candidate_dice = candidate_dice
+        self.rerank = rerank
+        self._keys: List[str] = []
+        self._terms: List[str] = []
+        self._values: List[Any] = []
+        self._priorities: List[int] = []
+        self._gram_counts: Any = []
+        self._postings: Dict[str, Any] = {}
+        self._exact: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, term: str, value: Any, priority: int = 0):
+        """Index a term; a phonetic key shared by several terms keeps the first (highest priority)"""
+        key = phonetic_key(term)
+        if len(key) < 2 or key in self._exact:
+            return
+        index = len(self._keys)
+        self._exact[key] = index
+        self._keys.append(key)
+        self._terms.append(term)
+        self._values.append(value)
+        self._priorities.append(priority)
+        grams = trigrams(key)
+        self._gram_counts.append(len(grams))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(index)
+
+    def build(self) -> 'FuzzyIndex':
+        """Freeze posting lists and gram counts into numpy arrays"""
+        self._postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in self._postings.items()}
+        self._gram_counts = np.asarray(self._gram_counts, dtype=np.float32)
+        return self
+
+    def search(self, text: str, limit: int = 5) -> List[FuzzyCandidate]:
+        """Ranked candidates scoring at least min_score"""
+        key = phonetic_key(text)
+        if len(key) < 3:
+            return []
+        exact = self._exact.get(key)
+        if exact is not None:
+            return [FuzzyCandidate(PHONETIC_EXACT_SCORE, self._terms[exact], self._values[exact],
+                                   self._priorities[exact])]
+
+        grams = trigrams(key)
+        postings = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not postings:
+            return []
+        # Shared-trigram count for every term in one pass. A term reaching the
+        # Dice threshold shares at least theta * n / (2 - theta) grams with
+        # an n-gram query, which cheaply prunes before computing Dice
+        theta = self.candidate_dice
+        overlap = np.bincount(np.concatenate(postings), minlength=len(self._keys))
+        candidates = np.flatnonzero(overlap >= math.ceil(theta * len(grams) / (2 - theta)))
+        dice = 2.0 * overlap[candidates] / (len(grams) + self._gram_counts[candidates])
+        keep = dice >= theta
+        candidates, dice = candidates[keep], dice[keep]
+        if len(candidates) > self.rerank:
+            top = np.argpartition(-dice, self.rerank)[:self.rerank]
+            candidates, dice = candidates[top], dice[top]
+
+        ranked = []
+        for index, dice_score in zip(candidates.tolist(), dice.tolist()):
+            score = max(dice_score, similarity(key, self._keys[index]))
+            if score >= self.min_score:
+                ranked.append(FuzzyCandidate(round(score, 3), self._terms[index], self._values[index],
+                                             self._priorities[index]))
+        ranked.sort(key=lambda c: (-c.score, c.priority))
+        return ranked[:limit]
+
+    def best_span(self, words: Sequence[str], max_words: int = 3,
+                  limit: int = 5) -> Tuple[List[FuzzyCandidate], int, int]:
+        """Best-scoring window of up to max_words words: (candidates, start, end)
+
+        Longer windows win ties, so "lucky mi" beats "lucky" alone.
+        """
+        best: List[FuzzyCandidate] = []
+        best_span = (0, 0)
+        best_rank = (0.0, 0)
+        for start in range(len(words)):
+            if words[start] in FILLER_WORDS:
+                continue
+            for end in range(start + 1, min(len(words), start + max_words) + 1):
+                if words[end - 1] in FILLER_WORDS:
+                    break
+                candidates = self.search(' '.join(words[start:end]), limit)
+                if candidates and (candidates[0].score, end - start) > best_rank:
+                    best, best_span, best_rank = candidates, (start, end), (candidates[0].score, end - start)
+        return best, best_span[0], best_span[1]
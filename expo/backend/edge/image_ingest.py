@@ -0,0 +1,131 @@
+"""
+Receipt image ingestion
+Decodes receipt photos straight to grayscale, and for large JPEGs at a
+reduced scale chosen from the header: libjpeg then skips most of the IDCT
+work, so a 12 MP phone photo never exists as a full-size BGR array. Input
+may be bytes, a memoryview, an mmap or a file path (mapped, not read);
+all are wrapped without copying. Camera frames are converted into
+per-thread buffers that are reused from frame to frame.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import threading
+from typing import Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Decode-time reductions OpenCV offers, largest first
+REDUCED_GRAYSCALE = ((8, cv2.IMREAD_REDUCED_GRAYSCALE_8), (4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+                     (2, cv2.IMREAD_REDUCED_GRAYSCALE_2))
+
+# JPEG start-of-frame markers (baseline, progressive, ...) carry the size
+_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+ImageInput = Union[bytes, bytearray, memoryview, mmap.mmap, np.ndarray, str]
+
+
+def image_size(data: np.ndarray) -> Optional[Tuple[int, int]]:
+    """(width, height) from a JPEG or PNG header, without decoding"""
+    head = data[:32].tobytes()
+    if head[:8] == b'\x89PNG\r\n\x1a\n' and head[12:16] == b'IHDR':
+        return struct.unpack('>II', head[16:24])
+    if head[:2] != b'\xff\xd8':
+        return None
+    pos, n = 2, len(data)
+    while pos + 9 < n:
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            pos += 1  # fill byte
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            pos += 2
+            continue
+        length = (int(data[pos + 2]) << 8) | int(data[pos + 3])
+        if marker in _SOF:
+            height = (int(data[pos + 5]) << 8) | int(data[pos + 6])
+            width = (int(data[pos + 7]) << 8) | int(data[pos + 8])
+            return width, height
+        pos += 2 + length
+    return None
+
+
+def reduction(size: Optional[Tuple[int, int]], max_side: int) -> int:
+    """Largest decode reduction that keeps the long side at or above max_side"""
+    if size is None or max_side <= 0:
+        return 1
+    long_side = max(size)
+    return next((factor for factor, _ in REDUCED_GRAYSCALE if long_side // factor >= max_side), 1)
+
+
+def encoded_view(data) -> np.ndarray:
+    """bytes, bytearray, memoryview or mmap as a uint8 array over the same memory"""
+    return np.frombuffer(data, np.uint8)
+
+
+class FrameBuffers:
+    """Named per-thread arrays, reallocated only when the frame size changes"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def get(self, name: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        buffers = self._local.__dict__.setdefault('buffers', {})
+        buf = buffers.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = buffers[name] = np.empty(shape, dtype)
+        return buf
+
+
+class ImageDecoder:
+    """Encoded images and camera frames -> grayscale at no more than the needed size"""
+
+    def __init__(self, max_side: int = 2000):
+        self.max_side = max_side
+        self.buffers = FrameBuffers()
+
+    def decode(self, data: ImageInput) -> np.ndarray:
+        if isinstance(data, (str, os.PathLike)):
+            return self.decode_file(data)
+        if isinstance(data, np.ndarray) and data.ndim >= 2:
+            return self.gray(data)
+        return self.decode_buffer(encoded_view(data))
+
+    def decode_buffer(self, view: np.ndarray) -> np.ndarray:
+        factor = reduction(image_size(view), self.max_side)
+        flag = dict(REDUCED_GRAYSCALE).get(factor, cv2.IMREAD_GRAYSCALE)
+        img = cv2.imdecode(view, flag)
+        if img is None:
+            raise ValueError("Image could not be decoded")
+        return img
+
+    def decode_file(self, path: str) -> np.ndarray:
+        """Decode from a read-only mapping of the file"""
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = encoded_view(mapped)
+            try:
+                return self.decode_buffer(view)
+            finally:
+                # The mapping cannot close while an array still exports it
+                del view
+
+    def gray(self, frame: np.ndarray) -> np.ndarray:
+        """A camera frame in grayscale, written into this thread's reused buffer"""
+        if frame.ndim == 3:
+            dst = self.buffers.get('gray', frame.shape[:2])
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=dst)
+            frame = dst
+        scale = self.max_side / max(frame.shape[:2])
+        if self.max_side > 0 and scale < 0.5:
+            shape = (round(frame.shape[0] * scale), round(frame.shape[1] * scale))
+            dst = self.buffers.get('scaled', shape)
+            cv2.resize(frame, shape[::-1], dst=dst, interpolation=cv2.INTER_AREA)
+            frame = dst
+        return frame
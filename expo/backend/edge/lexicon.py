@@ -0,0 +1,162 @@
+"""
+Compiled lexicon matcher for edge transaction parsing
+Aho-Corasick automaton over product variants, Filipino units and number words,
+built once at startup and scanned in a single pass per transcribed segment
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional
+
+# Resolution order when several terms cover the exact same span
+# (e.g. 'litro' is both a unit and a Coke variant): quantities, then units,
+# then products -- the same precedence the old sequential strip-and-scan used.
+KIND_RANK = {'numeral': 0, 'number': 1, 'unit': 2, 'product': 3}
+
+# Filipino linker suffixes that may trail a term ("dalawang", "isang", "kilong")
+LINKER_SUFFIXES = ('ng', 'g')
+
+
+class LexiconEntry(NamedTuple):
+    kind: str
+    value: Any
+    priority: int = 0
+
+
+class Match(NamedTuple):
+    start: int
+    end: int
+    term: str
+    entry: LexiconEntry
+
+
+class LexiconMatcher:
+    """Aho-Corasick automaton with word-boundary, leftmost-longest semantics"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._terms: List[Optional[str]] = [None]
+        self._out: List[List[int]] = [[]]
+        self._entries: Dict[str, List[LexiconEntry]] = {}
+        self._built = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, term: str, kind: str, value: Any, priority: int = 0):
+        """Register a term; the same term may carry several entries"""
+        term = term.lower().strip()
+        if not term:
+            return
+        if term not in self._entries:
+            self._entries[term] = []
+            self._insert(term)
+        self._entries[term].append(LexiconEntry(kind, value, priority))
+        self._built = False
+
+    def _insert(self, term: str):
+        node = 0
+        for ch in term:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._terms.append(None)
+                self._out.append([])
+                self._goto[node][ch] = nxt
+            node = nxt
+        self._terms[node] = term
+        self._out[node] = [node]
+
+    def build(self) -> 'LexiconMatcher':
+        """Compute failure links and merged outputs (BFS over the trie)"""
+        queue = []
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            queue.append(child)
+
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                own = [child] if self._terms[child] is not None else []
+                self._out[child] = own + self._out[self._fail[child]]
+
+        self._built = True
+        return self
+
+    @staticmethod
+    def _is_word_char(ch: str) -> bool:
+        return ch.isalnum()
+
+    def _right_boundary(self, text: str, end: int) -> Optional[int]:
+        """Return the end offset including any linker suffix, or None"""
+        n = len(text)
+        if end >= n or not self._is_word_char(text[end]):
+            return end
+        for suffix in LINKER_SUFFIXES:
+            stop = end + len(suffix)
+            if text.startswith(suffix, end) and (stop >= n or not self._is_word_char(text[stop])):
+                return stop
+        return None
+
+    def scan(self, text: str) -> List[Match]:
+        """Single pass over text returning non-overlapping leftmost-longest matches
+
+        Digit runs are emitted in the same pass as 'numeral' matches.
+        """
+        if not self._built:
+            self.build()
+
+        goto, fail, out, terms = self._goto, self._fail, self._out, self._terms
+        candidates = []
+        node = 0
+        digit_start = -1
+
+        for i, ch in enumerate(text):
+            if ch.isdigit():
+                if digit_start < 0:
+                    digit_start = i
+            elif digit_start >= 0:
+                candidates.append((digit_start, i, text[digit_start:i], None))
+                digit_start = -1
+
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+
+            for hit in out[node]:
+                term = terms[hit]
+                start = i + 1 - len(term)
+                if start > 0 and self._is_word_char(text[start - 1]):
+                    continue
+                end = self._right_boundary(text, i + 1)
+                if end is None:
+                    continue
+                candidates.append((start, end, term, self._entries[term]))
+
+        if digit_start >= 0:
+            candidates.append((digit_start, len(text), text[digit_start:], None))
+
+        candidates.sort(key=lambda c: (c[0], c[0] - c[1]))
+
+        matches = []
+        cursor = 0
+        for start, end, term, entries in candidates:
+            if start < cursor:
+                continue
+            if entries is None:
+                entry = LexiconEntry('numeral', int(term))
+            else:
+                entry = min(entries, key=lambda e: (KIND_RANK.get(e.kind, len(KIND_RANK)), e.priority))
+            matches.append(Match(start, end, term, entry))
+            cursor = end
+
+        return matches
@@ -0,0 +1,251 @@
+"""
+Fleet load generator for the central hub
+Simulates many stores and devices on one machine: each virtual device is an
+asyncio task that synthesizes Filipino transactions from the product
+catalog, parses them with the processor's real parser, and posts them to
+the hub at a Poisson rate through its own pooled BatchUploader. Injected
+network outages cut devices off so their offline backlog grows and then
+drains when they reconnect. Reports hub latency, status/error rates and
+backlog size over time as JSON.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from edge_bench import HubStub, percentiles
+from metrics import MetricsRegistry
+from txn_ids import TransactionIdGenerator
+from uploader import BatchUploader
+
+logger = logging.getLogger(__name__)
+
+
+def parse_outage(spec: str) -> Tuple[float, float]:
+    """'START:DURATION' in seconds from the start of the run"""
+    start, _, duration = spec.partition(':')
+    return float(start), float(duration)
+
+
+class TransactionSynthesizer:
+    """Spoken-style Filipino baskets built from catalog terms"""
+
+    def __init__(self, processor, rng: random.Random, max_items: int = 5):
+        self.processor = processor
+        self.rng = rng
+        self.max_items = max_items
+        self.terms = [term for product in processor.catalog.iter_products() for term in product['terms']]
+        self.units = list(processor.snapshot.units)
+        # 'dalawa' -> 'dalawang', 'apat' -> 'apat na'
+        self.quantities = [
+            word + 'ng' if word[-1] in 'aeiou' else word + ' na'
+            for word, value in processor.number_words.items() if value <= 10 and '-' not in word
+        ]
+
+    def phrase(self) -> str:
+        parts = []
+        for _ in range(self.rng.randint(1, self.max_items)):
+            part = f"{self.rng.choice(self.quantities)} "
+            if self.rng.random() < 0.3:
+                part += f"{self.rng.choice(self.units)} "
+            parts.append(part + self.rng.choice(self.terms))
+        return ', '.join(parts)
+
+    def items(self):
+        """Parsed items of a fresh phrase (retries phrases the parser drops)"""
+        for _ in range(5):
+            items = self.processor.parse_filipino_transaction(self.phrase())
+            if items:
+                return items
+        return []
+
+
+class VirtualDevice:
+    """One simulated Pi: its own identity, uploader and offline backlog"""
+
+    def __init__(self, store_id: str, device_id: str, api_endpoint: str, batch_size: int,
+                 metrics: MetricsRegistry):
+        self.store_id = store_id
+        self.device_id = device_id
+        self.txn_ids = TransactionIdGenerator(device_id)
+        self.uploader = BatchUploader(api_endpoint, pool_size=1, timeout=10, metrics=metrics)
+        self.batch_size = batch_size
+        self.backlog: List[Dict] = []
+        self.offline = False
+
+    def stamp(self, transaction: Dict) -> Dict:
+        transaction.update(
+            storeId=self.store_id,
+            deviceId=self.device_id,
+            transactionId=self.txn_ids.new_id(),
+        )
+        return transaction
+
+    def close(self):
+        self.uploader.close()
+
+
+class LoadGenerator:
+    """Drive a hub with N virtual devices at a target aggregate rate"""
+
+    def __init__(self, processor, api_endpoint: str, stores: int = 10, devices_per_store: int = 2,
+                 rate: float = 20.0, duration: float = 60.0, outages: Optional[List[Tuple[float, float]]] = None,
+                 outage_fraction: float = 1.0, batch_size: int = 25, concurrency: int = 64,
+                 report_interval: float = 5.0, seed: int = 0):
+        self.processor = processor
+        self.api_endpoint = api_endpoint
+        self.rate = rate
+        self.duration = duration
+        self.outages = outages or []
+        self.report_interval = report_interval
+        self.rng = random.Random(seed)
+        self.synthesizer = TransactionSynthesizer(processor, self.rng)
+        # Shared across device uploaders: per-attempt latency, status and retry counts
+        self.metrics = MetricsRegistry()
+        self.devices = [
+            VirtualDevice(f"LOAD-S{s:03d}", f"LOAD-S{s:03d}-D{d:02d}", api_endpoint, batch_size, self.metrics)
+            for s in range(1, stores + 1) for d in range(1, devices_per_store + 1)
+        ]
+        self.outage_devices = set(self.rng.sample(range(len(self.devices)),
+                                                  round(len(self.devices) * outage_fraction)))
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='loadgen')
+
+        self.latencies: List[float] = []
+        self.window_latencies: List[float] = []
+        self.generated = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.request_errors = 0
+        self.requests = 0
+        self.timeline: List[Dict] = []
+
+    def _in_outage(self, elapsed: float) -> bool:
+        return any(start <= elapsed < start + length for start, length in self.outages)
+
+    def _send(self, device: VirtualDevice, batch: List[Dict]) -> Tuple[List[Dict], float, bool]:
+        start = time.perf_counter()
+        try:
+            failed = device.uploader.send_batch(batch)
+            return failed, time.perf_counter() - start, False
+        except Exception:
+            return batch, time.perf_counter() - start, True
+
+    async def _device_loop(self, index: int, device: VirtualDevice, started: float):
+        loop = asyncio.get_running_loop()
+        per_device_rate = self.rate / len(self.devices)
+        # Stagger start-up so devices do not fire in lockstep
+        await asyncio.sleep(min(self.rng.random() / per_device_rate, self.duration))
+        while True:
+            elapsed = time.monotonic() - started
+            if elapsed >= self.duration:
+                break
+
+            transaction = device.stamp(self.processor.generate_transaction_json(self.synthesizer.items(), 0.0))
+            self.generated += 1
+            device.backlog.append(transaction)
+
+            device.offline = index in self.outage_devices and self._in_outage(elapsed)
+            # Online devices drain their backlog batch by batch, like the
+            # sender stage plus ReplayWorker, until a batch is not fully accepted
+            while not device.offline and device.backlog:
+                batch = device.backlog[:device.batch_size]
+                failed, latency, errored = await loop.run_in_executor(self._executor, self._send, device, batch)
+                failed_ids = {t['transactionId'] for t in failed}
+                device.backlog = [t for t in batch if t['transactionId'] in failed_ids] + device.backlog[len(batch):]
+                self.requests += 1
+                self.request_errors += errored
+                self.accepted += len(batch) - len(failed)
+                self.rejected += len(failed)
+                self.latencies.append(latency)
+                self.window_latencies.append(latency)
+                if failed:
+                    break
+
+            remaining = self.duration - (time.monotonic() - started)
+            await asyncio.sleep(min(self.rng.expovariate(per_device_rate), max(0.0, remaining)))
+
+    def _snapshot(self, elapsed: float, previous: Tuple[int, int, int]) -> Tuple[int, int, int]:
+        window, self.window_latencies = self.window_latencies, []
+        current = (self.accepted, self.rejected, self.requests)
+        point = {
+            't': round(elapsed, 1),
+            'offlineDevices': sum(device.offline for device in self.devices),
+            'backlog': sum(len(device.backlog) for device in self.devices),
+            'accepted': current[0] - previous[0],
+            'rejected': current[1] - previous[1],
+            'requests': current[2] - previous[2],
+        }
+        if window:
+            latency = percentiles(window)
+            point.update(p50Ms=latency['p50Ms'], p95Ms=latency['p95Ms'], p99Ms=latency['p99Ms'])
+        self.timeline.append(point)
+        logger.info(f"t={point['t']}s backlog={point['backlog']} accepted={point['accepted']}")
+        return current
+
+    async def _reporter(self, started: float):
+        previous = (0, 0, 0)
+        while True:
+            await asyncio.sleep(self.report_interval)
+            previous = self._snapshot(time.monotonic() - started, previous)
+
+    async def run(self) -> Dict:
+        started = time.monotonic()
+        reporter = asyncio.ensure_future(self._reporter(started))
+        try:
+            await asyncio.gather(*(self._device_loop(i, d, started) for i, d in enumerate(self.devices)))
+        finally:
+            reporter.cancel()
+            self._snapshot(time.monotonic() - started, (
+                sum(p['accepted'] for p in self.timeline),
+                sum(p['rejected'] for p in self.timeline),
+                sum(p['requests'] for p in self.timeline),
+            ))
+            self._executor.shutdown(wait=True)
+            for device in self.devices:
+                device.close()
+        elapsed = time.monotonic() - started
+
+        report = {
+            'devices': len(self.devices),
+            'targetRate': self.rate,
+            'durationS': round(elapsed, 2),
+            'outages': [{'startS': start, 'durationS': length} for start, length in self.outages],
+            'generated': self.generated,
+            'accepted': self.accepted,
+            'rejected': self.rejected,
+            'acceptedPerSecond': round(self.accepted / elapsed, 2) if elapsed else None,
+            'requests': self.requests,
+            'requestErrors': self.request_errors,
+            'rejectRate': round(self.rejected / max(1, self.accepted + self.rejected), 4),
+            'finalBacklog': sum(len(device.backlog) for device in self.devices),
+            'peakBacklog': max((point['backlog'] for point in self.timeline), default=0),
+            'uploads': self.metrics.summary()['counters'],
+            'timeline': self.timeline,
+        }
+        if self.latencies:
+            report['hubLatency'] = percentiles(self.latencies)
+        return report
+
+
+def run_load(processor_factory: Callable, target: Optional[str] = None, hub_error_rate: float = 0.0,
+             **options) -> Dict:
+    """Run a load test against target, or against a local HubStub when target is None"""
+    hub = None
+    if target is None:
+        hub = HubStub(error_rate=hub_error_rate)
+        target = hub.start()
+    processor = processor_factory()
+    try:
+        generator = LoadGenerator(processor, target, **options)
+        report = asyncio.run(generator.run())
+    finally:
+        processor.stop_processing()
+        if hub:
+            hub.stop()
+    report['target'] = 'stub' if hub else target
+    if hub:
+        report['hub'] = {'requests': hub.requests, 'transactions': hub.transactions, 'errors': hub.errors}
+    return report
@@ -0,0 +1,271 @@
+"""
+Lightweight in-process metrics
+Fixed-bucket histograms, counters and callback gauges rendered in the
+Prometheus text format on a local /metrics endpoint, plus a compact summary
+for the hub payload. Stage timings and counter increments taken inside
+forked CPU workers are captured and replayed into the parent's registry.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds; spans sub-millisecond parsing up to multi-second STT
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_SECONDS = 'edge_stage_seconds'
+
+_capture = threading.local()
+
+
+class Histogram:
+    """Cumulative-bucket histogram for one label set"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count', '_lock')
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+class CapturedMetrics:
+    """Stage spans and counter increments recorded while capturing"""
+
+    __slots__ = ('spans', 'counters')
+
+    def __init__(self):
+        self.spans: List[Tuple[str, float]] = []
+        self.counters: List[Tuple[str, Tuple, float]] = []
+
+
+class MetricsRegistry:
+    """Histograms, counters and gauges keyed by (name, labels)"""
+
+    def __init__(self):
+        self._histograms: Dict[str, Dict[Tuple, Histogram]] = {}
+        self._counters: Dict[str, Dict[Tuple, float]] = {}
+        self._gauges: Dict[str, Dict[Tuple, Callable[[], float]]] = {}
+        self._gauge_kinds: Dict[str, str] = {}
+        self._help: Dict[str, str] = {
+            STAGE_SECONDS: 'Wall time per processing stage',
+        }
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(labels: Dict[str, str]) -> Tuple:
+        return tuple(sorted(labels.items()))
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def observe(self, name: str, value: float, **labels):
+        series = self._histograms.get(name)
+        key = self._key(labels)
+        if series is None or key not in series:
+            with self._lock:
+                series = self._histograms.setdefault(name, {})
+                series.setdefault(key, Histogram())
+        series[key].observe(value)
+
+    def inc(self, name: str, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._add(name, key, amount)
+        captured = getattr(_capture, 'metrics', None)
+        if captured is not None:
+            captured.counters.append((name, key, amount))
+
+    def _add(self, name: str, key: Tuple, amount: float):
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def gauge(self, name: str, fn: Callable[[], float], kind: str = 'gauge', **labels):
+        """Register a value read at scrape time (kind='counter' for running totals)"""
+        with self._lock:
+            self._gauges.setdefault(name, {})[self._key(labels)] = fn
+            self._gauge_kinds[name] = kind
+
+    @contextmanager
+    def timer(self, stage: str):
+        """Time a block into edge_stage_seconds{stage=...}"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(stage, time.perf_counter() - start)
+
+    def record_stage(self, stage: str, seconds: float):
+        self.observe(STAGE_SECONDS, seconds, stage=stage)
+        captured = getattr(_capture, 'metrics', None)
+        if captured is not None:
+            captured.spans.append((stage, seconds))
+
+    def replay(self, captured: CapturedMetrics):
+        """Record stage spans and counter increments taken in another process"""
+        for stage, seconds in captured.spans:
+            self.observe(STAGE_SECONDS, seconds, stage=stage)
+        for name, key, amount in captured.counters:
+            self._add(name, key, amount)
+
+    # -- export -------------------------------------------------------------
+
+    @staticmethod
+    def _labels(key: Tuple, extra: Tuple = ()) -> str:
+        pairs = key + extra
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            histograms = {name: dict(series) for name, series in self._histograms.items()}
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+            kinds = dict(self._gauge_kinds)
+
+        for name, series in sorted(histograms.items()):
+            lines.append(f"# HELP {name} {self._help.get(name, name)}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, hist in sorted(series.items()):
+                cumulative = 0
+                for bound, count in zip(hist.buckets, hist.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{self._labels(key, (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_bucket{self._labels(key, (('le', '+Inf'),))} {hist.count}")
+                lines.append(f"{name}_sum{self._labels(key)} {hist.sum:.6f}")
+                lines.append(f"{name}_count{self._labels(key)} {hist.count}")
+
+        for name, series in sorted(counters.items()):
+            lines.append(f"# HELP {name} {self._help.get(name, name)}")
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(series.items()):
+                lines.append(f"{name}{self._labels(key)} {value:g}")
+
+        for name, series in sorted(gauges.items()):
+            lines.append(f"# HELP {name} {self._help.get(name, name)}")
+            lines.append(f"# TYPE {name} {kinds.get(name, 'gauge')}")
+            for key, fn in sorted(series.items()):
+                try:
+                    value = float(fn())
+                except Exception:
+                    continue
+                lines.append(f"{name}{self._labels(key)} {value:g}")
+
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> Dict:
+        """Compact per-stage counts and latency estimates for the hub"""
+        with self._lock:
+            stages = dict(self._histograms.get(STAGE_SECONDS, {}))
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+
+        result = {'stages': {}, 'counters': {}, 'gauges': {}}
+        for key, hist in stages.items():
+            p50, p95 = hist.quantile(0.5), hist.quantile(0.95)
+            result['stages'][dict(key)['stage']] = {
+                'count': hist.count,
+                'meanMs': round(hist.sum / hist.count * 1000, 2) if hist.count else None,
+                'p50Ms': round(p50 * 1000, 2) if p50 is not None and p50 != float('inf') else None,
+                'p95Ms': round(p95 * 1000, 2) if p95 is not None and p95 != float('inf') else None,
+            }
+        for name, series in counters.items():
+            for key, value in series.items():
+                label = ','.join(f"{k}={v}" for k, v in key)
+                result['counters'][f"{name}{{{label}}}" if label else name] = value
+        for name, series in gauges.items():
+            for key, fn in series.items():
+                label = ','.join(f"{k}={v}" for k, v in key)
+                try:
+                    result['gauges'][f"{name}{{{label}}}" if label else name] = float(fn())
+                except Exception:
+                    continue
+        return result
+
+
+@contextmanager
+def capture_metrics():
+    """Collect the stage spans and counter increments recorded by this thread
+    (for forked workers)"""
+    captured = CapturedMetrics()
+    previous = getattr(_capture, 'metrics', None)
+    _capture.metrics = captured
+    try:
+        yield captured
+    finally:
+        _capture.metrics = previous
+
+
+class MetricsServer:
+    """Serve GET /metrics from a daemon thread"""
+
+    def __init__(self, registry: MetricsRegistry, host: str = '127.0.0.1', port: int = 9108):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+
+    def start(self):
+        # http.server costs tens of ms at import; only devices serving /metrics pay it
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True).start()
+        logger.info(f"Metrics on http://{self.host}:{self.server_port}/metrics")
+
+    @property
+    def server_port(self) -> int:
+        return self._server.server_address[1] if self._server else self.port
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
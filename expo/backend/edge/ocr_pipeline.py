@@ -0,0 +1,244 @@
+"""
+Region-of-interest OCR for receipt images
+Deskews the page, finds text-line regions with OpenCV morphology, drops
+non-text areas, and recognizes the remaining lines in parallel on persistent
+Tesseract engines (tesserocr) with per-line confidences and per-word boxes.
+Falls back to a thread pool over pytesseract when tesserocr is not installed.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from image_ingest import FrameBuffers
+from ocr_types import OCRLine, OCRWord
+
+logger = logging.getLogger(__name__)
+
+# Tesseract: single text line, LSTM engine
+LINE_PSM = 7
+TESSERACT_LANG = 'eng+fil'
+
+
+def binarize(gray: np.ndarray, blurred: Optional[np.ndarray] = None,
+             out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Dark text on white, as Tesseract expects (into blurred/out when given)"""
+    blurred = cv2.medianBlur(gray, 3, dst=blurred)
+    return cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 15, dst=out)
+
+
+def _line_blobs(binary: np.ndarray):
+    """Contours of ink smeared horizontally so each text line becomes one blob"""
+    ink = cv2.morphologyEx(255 - binary, cv2.MORPH_OPEN, np.ones((2, 2), np.uint8))  # drop specks
+    # Page edges and rulings would otherwise be smeared into the text lines
+    h, w = binary.shape
+    rules = cv2.morphologyEx(ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(40, h // 8))))
+    rules |= cv2.morphologyEx(ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (max(40, w // 8), 1)))
+    ink = cv2.subtract(ink, cv2.dilate(rules, np.ones((3, 3), np.uint8)))
+    kernel_w = max(15, w // 25)
+    smeared = cv2.morphologyEx(ink, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_w, 3)))
+    smeared = cv2.morphologyEx(smeared, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5)))
+    contours, _ = cv2.findContours(smeared, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return ink, contours
+
+
+def estimate_skew(binary: np.ndarray, max_angle: float = 15.0) -> float:
+    """Median skew in degrees of the wide (line-shaped) ink blobs"""
+    _, contours = _line_blobs(binary)
+    angles = []
+    for contour in contours:
+        (_, _), (w, h), angle = cv2.minAreaRect(contour)
+        # minAreaRect reports angles in [-90, 90]; normalise to the long side
+        if w < h:
+            w, h = h, w
+            angle -= 90
+        while angle <= -45:
+            angle += 90
+        while angle > 45:
+            angle -= 90
+        if w > 4 * h and w > 40:
+            angles.append(angle)
+    if not angles:
+        return 0.0
+    angle = float(np.median(angles))
+    return angle if abs(angle) <= max_angle else 0.0
+
+
+def deskew(gray: np.ndarray, binary: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+    angle = estimate_skew(binary)
+    if abs(angle) < 0.3:
+        return gray, binary, 0.0
+    h, w = gray.shape
+    matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    gray = cv2.warpAffine(gray, matrix, (w, h), flags=cv2.INTER_LINEAR, borderValue=255)
+    binary = cv2.warpAffine(binary, matrix, (w, h), flags=cv2.INTER_NEAREST, borderValue=255)
+    return gray, binary, angle
+
+
+def find_text_lines(binary: np.ndarray, min_height: int = 8, max_height_ratio: float = 0.2,
+                    min_fill: float = 0.08, max_fill: float = 0.75) -> List[Tuple[int, int, int, int]]:
+    """Bounding boxes of text lines, top to bottom
+
+    Blobs that are too tall, too narrow or too solid (logos, photos, borders)
+    are dropped as non-text.
+    """
+    h, _ = binary.shape
+    ink, contours = _line_blobs(binary)
+
+    boxes = []
+    for contour in contours:
+        x, y, bw, bh = cv2.boundingRect(contour)
+        if bh < min_height or bh > h * max_height_ratio or bw < 2 * bh:
+            continue
+        fill = cv2.countNonZero(ink[y:y + bh, x:x + bw]) / float(bw * bh)
+        if not min_fill <= fill <= max_fill:
+            continue
+        boxes.append((x, y, bw, bh))
+    return sorted(boxes, key=lambda b: (b[1], b[0]))
+
+
+class _TesserocrPool:
+    """Persistent tesserocr engines, one per worker thread"""
+
+    def __init__(self, workers: int, lang: str):
+        import tesserocr
+
+        self._tesserocr = tesserocr
+        self._apis: queue.Queue = queue.Queue()
+        for _ in range(workers):
+            self._apis.put(tesserocr.PyTessBaseAPI(lang=lang, psm=LINE_PSM, oem=tesserocr.OEM.LSTM_ONLY))
+
+    def recognize(self, line: np.ndarray) -> Tuple[str, float, List[OCRWord]]:
+        from PIL import Image
+
+        level = self._tesserocr.RIL.WORD
+        api = self._apis.get()
+        try:
+            api.SetImage(Image.fromarray(line))
+            text = api.GetUTF8Text()
+            words = []
+            for word in self._tesserocr.iterate_level(api.GetIterator(), level):
+                box = word.BoundingBox(level)
+                word_text = word.GetUTF8Text(level)
+                if box and word_text and word_text.strip():
+                    x1, y1, x2, y2 = box
+                    words.append(OCRWord(word_text.strip(), word.Confidence(level) / 100.0, (x1, y1, x2 - x1, y2 - y1)))
+            return text.strip(), api.MeanTextConf() / 100.0, words
+        finally:
+            self._apis.put(api)
+
+    def close(self):
+        while not self._apis.empty():
+            self._apis.get().End()
+
+
+class _PytesseractPool:
+    """Fallback: one tesseract subprocess per line (still parallel across threads)"""
+
+    def __init__(self, lang: str):
+        import pytesseract
+
+        self._pytesseract = pytesseract
+        self._config = f'--oem 3 --psm {LINE_PSM} -l {lang}'
+
+    def recognize(self, line: np.ndarray) -> Tuple[str, float, List[OCRWord]]:
+        data = self._pytesseract.image_to_data(line, config=self._config,
+                                               output_type=self._pytesseract.Output.DICT)
+        words = [
+            OCRWord(t.strip(), float(c) / 100.0, (x, y, w, h))
+            for t, c, x, y, w, h in zip(data['text'], data['conf'], data['left'], data['top'],
+                                        data['width'], data['height'])
+            if t.strip() and float(c) >= 0
+        ]
+        if not words:
+            return '', 0.0, []
+        return ' '.join(w.text for w in words), sum(w.confidence for w in words) / len(words), words
+
+    def close(self):
+        pass
+
+
+class OCRPipeline:
+    """Deskew -> line ROIs -> parallel line recognition"""
+
+    def __init__(self, workers: int = 4, lang: str = TESSERACT_LANG, pad: int = 4,
+                 min_confidence: float = 0.3):
+        self.workers = workers
+        self.lang = lang
+        self.pad = pad
+        self.min_confidence = min_confidence
+        self.load_time: Optional[float] = None
+        self._engine = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Blur and threshold outputs are reused across receipts of the same size
+        self.buffers = FrameBuffers()
+
+    def _ensure_engine(self):
+        if self._engine is not None:
+            return
+        with self._lock:
+            if self._engine is not None:
+                return
+            start = time.perf_counter()
+            try:
+                self._engine = _TesserocrPool(self.workers, self.lang)
+                logger.info(f"OCR: {self.workers} persistent tesserocr engine(s)")
+            except ImportError:
+                self._engine = _PytesseractPool(self.lang)
+                logger.info("OCR: tesserocr not installed, using pytesseract per line")
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ocr-line')
+            self.load_time = time.perf_counter() - start
+
+    def warm(self) -> 'OCRPipeline':
+        """Create the engines now instead of on the first receipt"""
+        self._ensure_engine()
+        return self
+
+    def line_images(self, gray: np.ndarray) -> Tuple[List[np.ndarray], List[Tuple[int, int, int, int]]]:
+        """Deskewed, padded binary crops of every detected text line"""
+        binary = binarize(gray, self.buffers.get('blurred', gray.shape), self.buffers.get('binary', gray.shape))
+        gray, binary, _ = deskew(gray, binary)
+        boxes = find_text_lines(binary)
+        h, w = binary.shape
+        crops = []
+        for x, y, bw, bh in boxes:
+            y0, y1 = max(0, y - self.pad), min(h, y + bh + self.pad)
+            x0, x1 = max(0, x - self.pad), min(w, x + bw + self.pad)
+            # Copied out: the binary buffer is overwritten by the next receipt
+            crops.append(binary[y0:y1, x0:x1].copy())
+        return crops, boxes
+
+    def recognize(self, img: np.ndarray) -> List[OCRLine]:
+        gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        crops, boxes = self.line_images(gray)
+        return self.recognize_lines(crops, boxes)
+
+    def recognize_lines(self, crops: List[np.ndarray], boxes: List[Tuple[int, int, int, int]]) -> List[OCRLine]:
+        """Run the line crops from line_images through the engines in parallel"""
+        if not crops:
+            return []
+        self._ensure_engine()
+
+        results = self._executor.map(self._engine.recognize, crops)
+        lines = []
+        for (text, confidence, words), box in zip(results, boxes):
+            if text and confidence >= self.min_confidence:
+                # Word boxes come back relative to the padded crop
+                x0, y0 = max(0, box[0] - self.pad), max(0, box[1] - self.pad)
+                words = [OCRWord(w.text, w.confidence, (w.box[0] + x0, w.box[1] + y0, w.box[2], w.box[3]))
+                         for w in words]
+                lines.append(OCRLine(text, confidence, box, words or None))
+        return lines
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=True)
+        if self._engine:
+            self._engine.close()
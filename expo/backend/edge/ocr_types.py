@@ -0,0 +1,23 @@
+"""
+OCR result types
+Recognized words and lines, kept apart from ocr_pipeline so receipt parsing
+and the fusion harness can use them without loading OpenCV.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+
+@dataclass
+class OCRWord:
+    text: str
+    confidence: float  # 0..1
+    box: Tuple[int, int, int, int]  # x, y, w, h in the deskewed page
+
+
+@dataclass
+class OCRLine:
+    text: str
+    confidence: float  # 0..1
+    box: Tuple[int, int, int, int]  # x, y, w, h in the deskewed page
+    words: Optional[List[OCRWord]] = None  # None when the engine gave no word boxes
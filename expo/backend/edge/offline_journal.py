@@ -0,0 +1,309 @@
+"""
+Durable offline journal for transactions the hub did not accept
+Append-only SQLite (WAL) outbox on persistent storage with group-committed
+fsyncs, an in-order replay worker that checkpoints as batches are
+acknowledged, and compaction of acknowledged records. Only the hub's
+rejections count against a record; one rejected max_attempts times moves
+to a dead-letter table instead of being retried forever
+"""
+
+import glob
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from transaction_format import pack, unpack
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    transaction_id TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dead_letter (
+    seq INTEGER PRIMARY KEY,
+    transaction_id TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    attempts INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    dead_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class OfflineJournal:
+    """Append-only outbox; appends are buffered and committed in groups"""
+
+    def __init__(self, path: str, flush_interval: float = 1.0, flush_max_records: int = 200,
+                 max_attempts: int = 20):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_max_records = flush_max_records
+        self.max_attempts = max_attempts
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # auto_vacuum only takes effect if set before the file is initialised
+        self._db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.executescript(SCHEMA)
+        # Older versions counted unreachable-hub retries as attempts and then
+        # skipped the record for good; give those records back to replay
+        stranded = self._db.execute("UPDATE outbox SET attempts = 0 WHERE attempts >= ?",
+                                    (max_attempts,)).rowcount
+        if stranded:
+            logger.warning(f"Requeued {stranded} offline transaction(s) that had exhausted retries")
+
+        self._db_lock = threading.Lock()
+        self._pending: List[Tuple[str, bytes, float]] = []
+        self._pending_lock = threading.Condition()
+        self.has_records = threading.Event()
+        self._closed = False
+
+        if self.count():
+            self.has_records.set()
+
+        self._flusher = threading.Thread(target=self._flush_loop, name='journal-flush', daemon=True)
+        self._flusher.start()
+
+    # -- writes -------------------------------------------------------------
+
+    def append(self, transaction_data: Dict):
+        """Queue a transaction for the next group commit"""
+        payload = pack(transaction_data)
+        with self._pending_lock:
+            self._pending.append((transaction_data['transactionId'], payload, time.time()))
+            if len(self._pending) >= self.flush_max_records:
+                self._pending_lock.notify()
+
+    def flush(self):
+        """Commit buffered appends in one transaction (one fsync)"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        with self._db_lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.executemany(
+                "INSERT INTO outbox (transaction_id, payload, created_at) VALUES (?, ?, ?)", pending
+            )
+            self._db.execute("COMMIT")
+        self.has_records.set()
+        logger.info(f"Journaled {len(pending)} offline transaction(s)")
+
+    def _flush_loop(self):
+        while not self._closed:
+            with self._pending_lock:
+                if len(self._pending) < self.flush_max_records:
+                    self._pending_lock.wait(self.flush_interval)
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.error(f"Offline journal flush error: {e}")
+
+    # -- replay -------------------------------------------------------------
+
+    def checkpoint(self) -> int:
+        """Sequence number replay has fully processed up to"""
+        with self._db_lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'replay_checkpoint'").fetchone()
+        return int(row[0]) if row else 0
+
+    def read_batch(self, after_seq: int, limit: int) -> List[Tuple[int, Dict]]:
+        """Next records in append order"""
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT seq, payload FROM outbox WHERE seq > ? ORDER BY seq LIMIT ?", (after_seq, limit)
+            ).fetchall()
+        return [(seq, unpack(payload)) for seq, payload in rows]
+
+    def iter_pending(self, batch_size: int = 500) -> Iterator[Tuple[int, Dict]]:
+        """Stream every replayable record without loading the whole outbox"""
+        cursor = 0
+        while True:
+            batch = self.read_batch(cursor, batch_size)
+            if not batch:
+                return
+            yield from batch
+            cursor = batch[-1][0]
+
+    def acknowledge(self, acked: List[int], rejected: List[int]) -> int:
+        """Drop acknowledged records, count an attempt on each rejected one,
+        dead-letter the ones that have run out, and advance the checkpoint
+        past the contiguous prefix that is done. Records that were not
+        delivered at all are simply left for the next pass. Returns how
+        many records were dead-lettered."""
+        dead = 0
+        with self._db_lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            if acked:
+                self._db.executemany("DELETE FROM outbox WHERE seq = ?", [(s,) for s in acked])
+            if rejected:
+                self._db.executemany(
+                    "UPDATE outbox SET attempts = attempts + 1 WHERE seq = ?", [(s,) for s in rejected]
+                )
+                dead = self._db.execute(
+                    "INSERT INTO dead_letter (seq, transaction_id, payload, attempts, created_at, dead_at) "
+                    "SELECT seq, transaction_id, payload, attempts, created_at, ? FROM outbox WHERE attempts >= ?",
+                    (time.time(), self.max_attempts)
+                ).rowcount
+                if dead:
+                    self._db.execute("DELETE FROM outbox WHERE attempts >= ?", (self.max_attempts,))
+            head = self._db.execute("SELECT MIN(seq) FROM outbox").fetchone()[0]
+            if head is None:
+                head = self._db.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM sqlite_sequence "
+                                        "WHERE name = 'outbox'").fetchone()[0]
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('replay_checkpoint', ?)", (str(head - 1),)
+            )
+            self._db.execute("COMMIT")
+        if dead:
+            logger.warning(f"Moved {dead} offline transaction(s) to the dead-letter table after "
+                           f"{self.max_attempts} rejections")
+        return dead
+
+    def compact(self):
+        """Return freed pages to the filesystem and truncate the WAL"""
+        with self._db_lock:
+            freelist = self._db.execute("PRAGMA freelist_count").fetchone()[0]
+            if freelist:
+                self._db.executescript("PRAGMA incremental_vacuum;")
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    # -- housekeeping -------------------------------------------------------
+
+    def count(self) -> int:
+        with self._db_lock:
+            return self._db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def dead_letter_count(self) -> int:
+        with self._db_lock:
+            return self._db.execute("SELECT COUNT(*) FROM dead_letter").fetchone()[0]
+
+    def import_legacy_dir(self, directory: str) -> int:
+        """Move one-file-per-transaction JSON left by older versions into the journal"""
+        files = []
+        for filename in sorted(glob.glob(os.path.join(directory, '*.json')), key=os.path.getmtime):
+            try:
+                with open(filename) as f:
+                    self.append(json.load(f))
+                files.append(filename)
+            except (OSError, ValueError) as e:
+                logger.error(f"Skipping unreadable offline file {filename}: {e}")
+        self.flush()
+        for filename in files:
+            os.remove(filename)
+        if files:
+            logger.info(f"Imported {len(files)} legacy offline transaction(s) from {directory}")
+        return len(files)
+
+    def close(self):
+        self._closed = True
+        with self._pending_lock:
+            self._pending_lock.notify()
+        self._flusher.join(timeout=5)
+        self.flush()
+        with self._db_lock:
+            self._db.close()
+
+
+class ReplayWorker:
+    """Streams journaled transactions back through the sender in order"""
+
+    def __init__(self, journal: OfflineJournal, deliver: Callable[[List[Dict]], Tuple[List[Dict], List[Dict]]],
+                 batch_size: int = 50, min_backoff: float = 5.0, max_backoff: float = 300.0,
+                 compact_every: int = 5000):
+        self.journal = journal
+        self.deliver = deliver
+        self.batch_size = batch_size
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.compact_every = compact_every
+        self.stop_event = threading.Event()
+        self.replayed = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='journal-replay', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self.stop_event.set()
+        self.journal.has_records.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def replay_once(self) -> Tuple[int, int, int]:
+        """Send one batch from the checkpoint; returns (acked, rejected, undelivered)"""
+        batch = self.journal.read_batch(self.journal.checkpoint(), self.batch_size)
+        if not batch:
+            return 0, 0, 0
+
+        rejected_records, undelivered_records = self.deliver([record for _, record in batch])
+        rejected_ids = {record['transactionId'] for record in rejected_records}
+        undelivered_ids = {record['transactionId'] for record in undelivered_records}
+        acked, rejected = [], []
+        for seq, record in batch:
+            if record['transactionId'] in rejected_ids:
+                rejected.append(seq)
+            elif record['transactionId'] not in undelivered_ids:
+                acked.append(seq)
+        self.journal.acknowledge(acked, rejected)
+        return len(acked), len(rejected), len(batch) - len(acked) - len(rejected)
+
+    def _run(self):
+        backoff = self.min_backoff
+        since_compact = 0
+        while not self.stop_event.is_set():
+            # Block until something is journaled rather than polling
+            self.journal.has_records.wait()
+            if self.stop_event.is_set():
+                return
+
+            try:
+                acked, rejected, undelivered = self.replay_once()
+            except Exception as e:
+                logger.error(f"Offline replay error: {e}")
+                acked, rejected, undelivered = 0, 0, 1
+
+            if acked == 0 and rejected == 0 and undelivered == 0:
+                self.journal.has_records.clear()
+                if self.journal.read_batch(self.journal.checkpoint(), 1):
+                    self.journal.has_records.set()
+                elif since_compact:
+                    self.journal.compact()
+                    since_compact = 0
+                continue
+
+            self.replayed += acked
+            since_compact += acked
+            if since_compact >= self.compact_every:
+                self.journal.compact()
+                since_compact = 0
+
+            if rejected:
+                # The attempt is recorded; replay carries on with the rest of
+                # the backlog until the record is dead-lettered
+                logger.warning(f"Offline replay: {rejected} record(s) rejected by the hub")
+            if undelivered:
+                # Hub unreachable or failing: back off before retrying in order
+                logger.warning(f"Offline replay: {undelivered} record(s) not delivered, retrying in {backoff:.0f}s")
+                self.stop_event.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+            else:
+                backoff = self.min_backoff
+                if acked:
+                    logger.info(f"Replayed {acked} offline transaction(s)")
@@ -0,0 +1,185 @@
+"""
+Pipeline scheduler for the edge processor
+Bounded queues feeding per-stage worker threads that block on get() instead
+of sleep-polling, with optional process-pool offload for CPU-bound stages,
+size/time-bounded batching and an ordered, draining shutdown
+"""
+
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Placed on a stage queue once per worker to stop it after the queue drains
+_STOP = object()
+
+
+class PipelineStage:
+    """A named queue plus the worker threads that consume it
+
+    With batch_size > 1 the handler receives a list of up to batch_size items,
+    flushed early once batch_timeout seconds pass after the first item.
+    """
+
+    def __init__(self, name: str, handler: Callable[[Any], None], input_queue: queue.Queue,
+                 workers: int = 1, poll_timeout: float = 1.0,
+                 batch_size: int = 1, batch_timeout: float = 0.0):
+        self.name = name
+        self.handler = handler
+        self.queue = input_queue
+        self.workers = max(1, workers)
+        self.poll_timeout = poll_timeout
+        self.batch_size = max(1, batch_size)
+        self.batch_timeout = batch_timeout
+        self.threads: List[threading.Thread] = []
+        self.processed = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def start(self, stop_event: threading.Event):
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._run, args=(stop_event,),
+                name=f"{self.name}-{index}", daemon=False
+            )
+            thread.start()
+            self.threads.append(thread)
+
+    def _run(self, stop_event: threading.Event):
+        while not stop_event.is_set():
+            try:
+                item = self.queue.get(timeout=self.poll_timeout)
+            except queue.Empty:
+                # The timeout only bounds how long an aborted worker lingers;
+                # normal shutdown arrives as a sentinel behind queued work
+                if stop_event.is_set():
+                    return
+                continue
+
+            if item is _STOP:
+                self.queue.task_done()
+                return
+
+            if self.batch_size == 1:
+                self._handle(item, 1)
+                continue
+
+            batch, stopping = self._collect_batch(item)
+            self._handle(batch, len(batch))
+            if stopping:
+                self.queue.task_done()
+                return
+
+    def _collect_batch(self, first: Any):
+        """Gather up to batch_size items without waiting past batch_timeout"""
+        batch = [first]
+        deadline = time.monotonic() + self.batch_timeout
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _handle(self, payload: Any, count: int):
+        try:
+            self.handler(payload)
+            with self._lock:
+                self.processed += count
+        except Exception as e:
+            with self._lock:
+                self.errors += count
+            logger.error(f"{self.name} stage error: {e}")
+        finally:
+            for _ in range(count):
+                self.queue.task_done()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Let workers finish everything already queued, then join them"""
+        for _ in self.threads:
+            self.queue.put(_STOP)
+        self.join(timeout)
+
+    def join(self, timeout: Optional[float] = None):
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = [t for t in self.threads if t.is_alive()]
+
+
+class Pipeline:
+    """Ordered set of stages; shutdown drains upstream stages first"""
+
+    def __init__(self, poll_timeout: float = 1.0):
+        self.poll_timeout = poll_timeout
+        self.stages: List[PipelineStage] = []
+        self.abort_event = threading.Event()
+        self._executors: Dict[str, Executor] = {}
+
+    def add_stage(self, name: str, handler: Callable[[Any], None], input_queue: queue.Queue,
+                  workers: int = 1, batch_size: int = 1, batch_timeout: float = 0.0) -> PipelineStage:
+        stage = PipelineStage(name, handler, input_queue, workers, self.poll_timeout,
+                              batch_size, batch_timeout)
+        self.stages.append(stage)
+        return stage
+
+    def process_pool(self, name: str, workers: int, initializer: Optional[Callable] = None,
+                     start_method: Optional[str] = None) -> Executor:
+        """Shared process pool for CPU-bound work, created once per name"""
+        if name not in self._executors:
+            context = multiprocessing.get_context(start_method) if start_method else None
+            self._executors[name] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=context, initializer=initializer
+            )
+        return self._executors[name]
+
+    def start(self):
+        for stage in self.stages:
+            stage.start(self.abort_event)
+            logger.info(f"Stage {stage.name} started with {stage.workers} worker(s)")
+
+    def shutdown(self, drain: bool = True, timeout: Optional[float] = None,
+                 on_stage_stopped: Optional[Callable[[str], None]] = None):
+        """Stop all stages in pipeline order
+
+        With drain=True every queued item is processed first, so in-flight
+        results still reach the sender; drain=False abandons queued work.
+        on_stage_stopped runs after each stage stops, before the next one
+        is drained, so state held between stages can be flushed downstream.
+        """
+        if not drain:
+            self.abort_event.set()
+        for stage in self.stages:
+            pending = stage.queue.qsize()
+            if drain and pending:
+                logger.info(f"Draining {pending} item(s) from {stage.name}")
+            if drain:
+                stage.stop(timeout)
+            else:
+                stage.join(timeout)
+            if stage.threads:
+                logger.warning(f"Stage {stage.name} did not stop within {timeout}s")
+            if on_stage_stopped:
+                on_stage_stopped(stage.name)
+        for executor in self._executors.values():
+            executor.shutdown(wait=drain)
+        self._executors.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            stage.name: {
+                'queued': stage.queue.qsize(),
+                'processed': stage.processed,
+                'errors': stage.errors,
+                'workers': stage.workers,
+            }
+            for stage in self.stages
+        }
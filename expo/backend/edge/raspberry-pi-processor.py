@@ -5,60 +5,65 @@ Real-time STT + OpenCV processing for sari-sari store transactions
 Outputs JSON to central hub via API calls
 """
 
-import json
-import cv2
+import argparse
 import numpy as np
-import speech_recognition as sr
-import requests
 import time
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
 import threading
 import queue
 import os
-from dataclasses import dataclass, asdict
+from concurrent.futures import Future
+import signal
 import logging
-from PIL import Image
-import pytesseract
-import whisper
 import re
 
+from lexicon import LexiconMatcher
+from fuzzy_index import FuzzyIndex
+from filipino_numbers import NUMBER_WORDS, Quantity, read_quantities, split_transaction
+from pipeline import Pipeline
+from uploader import BatchUploader
+from offline_journal import OfflineJournal, ReplayWorker
+from audio_stream import MicrophoneSource, StreamingTranscriber, WavFileSource
+from stt_backends import LazySTT, create_backend
+from ocr_types import OCRLine
+from receipt_parser import parse_receipt
+from catalog_store import CatalogSyncWorker, ProductCatalog, stable_sku
+from catalog_snapshot import CatalogSnapshot, FileWatcher, SnapshotManager, read_catalog_config
+from transaction_format import TransactionItem, TransactionOutput, dumps, to_dict
+from txn_ids import TransactionIdGenerator
+from aggregates import RollingAggregator
+from fusion import IMAGE, VOICE, FusedResult, TransactionFuser
+from fanin import FairScheduler, InputSource, SourceWork, read_sources
+from metrics import MetricsRegistry, MetricsServer, capture_metrics
+
+# OpenCV and the OCR/camera modules load only on devices that read receipts
+if TYPE_CHECKING:
+    from image_ingest import ImageInput
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
-class TransactionItem:
-    brandName: Optional[str]
-    productName: str
-    genericName: Optional[str]
-    localName: Optional[str]
-    sku: Optional[str]
-    quantity: int
-    unit: str
-    unitPrice: float
-    totalPrice: float
-    category: str
-    isUnbranded: bool
-    isBulk: bool
-    detectionMethod: str
-    confidence: float
-    brandConfidence: Optional[float] = None
-    suggestedBrands: Optional[List[str]] = None
-    notes: Optional[str] = None
-
-@dataclass
-class TransactionOutput:
-    storeId: str
-    deviceId: str
-    timestamp: str
-    transactionId: str
-    items: List[TransactionItem]
-    totals: Dict[str, float]
-    insights: Dict[str, any]
-    paymentMethod: str
-    processingTime: float
-    edgeVersion: str
+# Last-resort prices for products the catalog has no price for
+DEFAULT_CATEGORY_PRICES = {
+    'beverage': 65.0,
+    'food': 15.0,
+    'snacks': 25.0,
+    'staple': 55.0,
+    'fresh': 8.0,
+    'cooking': 85.0
+}
+
+# EDGE_ROLE -> capture capabilities. Heavy dependencies are imported only
+# for the capabilities a role has: a voice-only device never loads OpenCV,
+# an OCR-only one never loads an STT model, and 'parse' loads neither
+ROLES = {
+    'full': ('voice', 'ocr'),
+    'voice': ('voice',),
+    'ocr': ('ocr',),
+    'parse': (),
+}
 
 class RaspberryPiProcessor:
     def __init__(self):
@@ -66,16 +71,148 @@ class RaspberryPiProcessor:
         self.device_id = os.getenv('DEVICE_ID', 'RPI-001')
         self.api_endpoint = os.getenv('API_ENDPOINT', 'http://localhost:4000')
         self.edge_version = "v1.0.0"
+        self.pretty_json = os.getenv('PRETTY_JSON', '0') == '1'
+        
+        # Which capture paths this device runs (see ROLES)
+        self.role = os.getenv('EDGE_ROLE', 'full')
+        if self.role not in ROLES:
+            raise ValueError(f"Unknown EDGE_ROLE '{self.role}' (expected one of {', '.join(ROLES)})")
+        self.capabilities = ROLES[self.role]
+        
+        # Pipeline configuration
+        self.audio_workers = int(os.getenv('AUDIO_WORKERS', '1'))
+        self.image_workers = int(os.getenv('IMAGE_WORKERS', '1'))
+        self.sender_workers = int(os.getenv('SENDER_WORKERS', '2'))
+        self.cpu_executor = os.getenv('CPU_EXECUTOR', 'process')  # 'process' or 'thread'
+        queue_size = int(os.getenv('QUEUE_SIZE', '64'))
+        self.batch_size = int(os.getenv('UPLOAD_BATCH_SIZE', '25'))
+        self.batch_max_wait = float(os.getenv('UPLOAD_BATCH_MAX_WAIT', '2.0'))
+        
+        # Stage latencies, queue depths and error counts; served on
+        # METRICS_PORT and summarized into a payload every interval
+        self.metrics = MetricsRegistry()
+        self.metrics_port = int(os.getenv('METRICS_PORT', '9108'))
+        self.metrics_host = os.getenv('METRICS_HOST', '127.0.0.1')
+        self.metrics_server = None
+        self.metrics_summary_interval = float(os.getenv('METRICS_SUMMARY_INTERVAL', '300'))
+        self._last_metrics_summary = float('-inf')
+        self._utterance_seconds: Dict[Tuple[str, int], float] = {}
+        
+        # Rolling hour/day store counters; the delta since the last summary
+        # rides on the first payload of every AGG_SUMMARY_INTERVAL seconds
+        self.aggregates = RollingAggregator(
+            hours=int(os.getenv('AGG_HOURS', '24')),
+            days=int(os.getenv('AGG_DAYS', '7')),
+            capacity=int(os.getenv('AGG_CAPACITY', '200')),
+            pair_capacity=int(os.getenv('AGG_PAIR_CAPACITY', '500')),
+            min_support=int(os.getenv('AGG_MIN_SUPPORT', '5')),
+            min_confidence=float(os.getenv('AGG_MIN_CONFIDENCE', '0.3')),
+            metrics=self.metrics
+        )
+        self.aggregate_summary_interval = float(os.getenv('AGG_SUMMARY_INTERVAL', '300'))
+        self._last_aggregate_summary = time.monotonic()
+        
+        # Pooled uploader (UPLOAD_MODE=single posts one transaction per request)
+        self.uploader = BatchUploader(
+            self.api_endpoint,
+            pool_size=self.sender_workers,
+            batch_mode=os.getenv('UPLOAD_MODE', 'batch') == 'batch',
+            metrics=self.metrics
+        )
+        
+        # Durable outbox for transactions the hub did not accept
+        self.offline_dir = os.getenv('OFFLINE_DIR', 'offline_transactions')
+        self.journal = OfflineJournal(os.path.join(self.offline_dir, 'journal.db'))
+        self.journal.import_legacy_dir('/tmp/offline_transactions')
+        self.replay_worker = ReplayWorker(self.journal, self.uploader.deliver)
+        
+        # Input sources: by default one counter with streaming voice capture
+        # from AUDIO_SOURCE ('mic', 'mic:<index>', a WAV file path, or empty)
+        # and camera ingestion from CAMERA_SOURCE (device index, a video file
+        # path, or empty). INPUT_SOURCES names a JSON file listing several
+        # counters, each with its own deviceId, inputs and priority
+        self.sources: Dict[str, InputSource] = {}
+        for source in read_sources(os.getenv('INPUT_SOURCES', ''), InputSource(
+                'default', self.device_id, os.getenv('AUDIO_SOURCE', ''), os.getenv('CAMERA_SOURCE', ''))):
+            if source.audio and 'voice' not in self.capabilities:
+                logger.warning(f"Audio for source {source.name} ignored: role '{self.role}' has no voice capture")
+                source.audio = ''
+            if source.camera and 'ocr' not in self.capabilities:
+                logger.warning(f"Camera for source {source.name} ignored: role '{self.role}' has no receipt OCR")
+                source.camera = ''
+            self.sources[source.name] = source
+        self.default_source = next(iter(self.sources))
+        self.audio_streams = []
+        self.camera_resolution = tuple(int(v) for v in os.getenv('CAMERA_RESOLUTION', '1920x1080').split('x'))
+        self.camera_stable_frames = int(os.getenv('CAMERA_STABLE_FRAMES', '5'))
+        self.cameras = []
         
-        # Initialize components
-        self.audio_queue = queue.Queue()
-        self.image_queue = queue.Queue()
-        self.result_queue = queue.Queue()
+        # Time-ordered IDs double as the hub's idempotency key (one generator per device identity)
+        self.txn_ids = {s.device_id: TransactionIdGenerator(s.device_id) for s in self.sources.values()}
+        
+        # One sale heard by the mic and seen by the camera is merged into a
+        # single transaction when both results land within FUSION_WINDOW
+        # seconds (0 sends each result on its own, the default unless this
+        # device has both inputs)
+        self.fuser = TransactionFuser(
+            self.emit_fused,
+            window=float(os.getenv('FUSION_WINDOW', '6' if any(s.audio and s.camera for s in self.sources.values())
+                                   else '0')),
+            max_pending=int(os.getenv('FUSION_MAX_PENDING', '16')),
+            metrics=self.metrics
+        )
         
-        # Load models
-        self.whisper_model = whisper.load_model("base")
+        # Initialize components (bounded queues apply backpressure to capture).
+        # Audio and image work waits in per-source lanes so every counter gets
+        # its share of the STT and OCR engines by priority; a saturated device
+        # skips camera frames older than IMAGE_MAX_AGE seconds, and a full
+        # camera lane drops its stalest frame for the newest. Voice work only
+        # expires when AUDIO_MAX_AGE is set
+        self.audio_queue = FairScheduler('audio', queue_size, self.metrics)
+        self.image_queue = FairScheduler('image', queue_size, self.metrics)
+        image_max_age = float(os.getenv('IMAGE_MAX_AGE', '10'))
+        audio_max_age = float(os.getenv('AUDIO_MAX_AGE', '0'))
+        for source in self.sources.values():
+            self.audio_queue.add_source(source.name, source.priority, max_age=audio_max_age)
+            self.image_queue.add_source(source.name, source.priority, max_age=image_max_age, drop_oldest=True)
+        self.result_queue = queue.Queue(maxsize=queue_size)
+        for name, stage_queue in (('audio', self.audio_queue), ('image', self.image_queue),
+                                  ('result', self.result_queue)):
+            self.metrics.gauge('edge_queue_depth', stage_queue.qsize, queue=name)
+        self.metrics.gauge('edge_offline_pending', self.journal.count)
+        self.metrics.gauge('edge_offline_dead_letter', self.journal.dead_letter_count)
+        self.pipeline = None
+        self.cpu_pool = None
+        self.stop_event = threading.Event()
+        self.ready_event = threading.Event()
+        
+        # Speech-to-text is loaded lazily on the first audio it sees
+        self.stt = None
+        if 'voice' in self.capabilities:
+            self.stt = LazySTT(create_backend(
+                os.getenv('STT_BACKEND', 'openai-whisper'),
+                model=os.getenv('STT_MODEL', 'base'),
+                threads=int(os.getenv('STT_THREADS', '0')),
+                compute_type=os.getenv('STT_COMPUTE_TYPE', 'int8'),
+                model_path=os.getenv('STT_MODEL_PATH')
+            ))
+        
+        # Built-in brand templates (the catalog config file can add more)
         self.brand_templates = self.load_brand_templates()
-        self.product_database = self.load_product_database()
+        self.brand_budget_ms = float(os.getenv('BRAND_BUDGET_MS', '150'))
+        self.template_dir = os.getenv('TEMPLATE_DIR', 'templates')
+        
+        # Line-level OCR; tesseract engines are created on first use so each
+        # forked worker gets its own. Receipt photos are decoded to grayscale
+        # with a long side of about IMAGE_MAX_SIDE pixels (0 decodes at full size)
+        self.ocr = None
+        self.image_decoder = None
+        if 'ocr' in self.capabilities:
+            from image_ingest import ImageDecoder
+            from ocr_pipeline import OCRPipeline
+            
+            self.ocr = OCRPipeline(workers=int(os.getenv('OCR_WORKERS', '4')))
+            self.image_decoder = ImageDecoder(max_side=int(os.getenv('IMAGE_MAX_SIDE', '2000')))
         
         # Filipino units mapping
         self.filipino_units = {
@@ -101,53 +238,243 @@ class RaspberryPiProcessor:
             'tinapay': {'generic': 'Bread', 'category': 'bakery', 'unbranded': True},
         }
         
+        # Common Filipino number words (compound numbers are read by filipino_numbers)
+        self.number_words = NUMBER_WORDS
+        
+        # Fuzzy product matches below this score are dropped
+        self.fuzzy_min_score = float(os.getenv('FUZZY_MIN_SCORE', '0.75'))
+        
+        # Local SKU/price catalog, seeded on first run and kept in sync with the hub
+        self.catalog = self.load_product_database()
+        self.catalog_sync = CatalogSyncWorker(
+            self.catalog, self.fetch_catalog_delta,
+            interval=float(os.getenv('CATALOG_SYNC_INTERVAL', '300')),
+            on_change=lambda: self.catalog_snapshots.request_reload('hub sync')
+        )
+        
+        # Lexicon, fuzzy index, units, fallback prices and brand templates
+        # are swapped in as one snapshot whenever the catalog or the local
+        # catalog config file changes, without a restart
+        self.catalog_config = os.getenv('CATALOG_CONFIG', '')
+        self.catalog_snapshots = SnapshotManager(self.build_snapshot, self.metrics)
+        self.catalog_watcher = FileWatcher(
+            self.catalog_config, self.on_catalog_config_change,
+            interval=float(os.getenv('CATALOG_WATCH_INTERVAL', '2'))
+        )
+        # The watcher only reports edits made from now on, so products in the
+        # config file as it stands are applied before the first snapshot
+        self.apply_config_products()
+        self.catalog_snapshots.reload('startup')
+        
         logger.info(f"Initialized Raspberry Pi Processor for store {self.store_id}")
 
     def start_processing(self):
-        """Start all processing threads"""
-        logger.info("Starting edge processing threads...")
+        """Start all processing stages"""
+        logger.info("Starting edge processing pipeline...")
+        
+        self.pipeline = Pipeline()
         
-        # Start audio processing thread
-        audio_thread = threading.Thread(target=self.audio_processor, daemon=True)
-        audio_thread.start()
+        # Fork CPU workers before any stage threads exist; when the device
+        # takes audio the STT model is warmed first so forked children share
+        # its pages copy-on-write instead of each loading a copy
+        cpu_workers = self.audio_workers * ('voice' in self.capabilities) + self.image_workers * ('ocr' in self.capabilities)
+        if self.cpu_executor == 'process' and cpu_workers:
+            if self.stt and (any(s.audio for s in self.sources.values()) or os.getenv('STT_PRELOAD') == '1'):
+                self.stt.warm()
+            global _worker_processor
+            _worker_processor = self
+            self.cpu_pool = self.pipeline.process_pool('cpu', cpu_workers, start_method='fork')
+            for future in [self.cpu_pool.submit(_warm_worker) for _ in range(cpu_workers)]:
+                future.result()
         
-        # Start image processing thread
-        image_thread = threading.Thread(target=self.image_processor, daemon=True)
-        image_thread.start()
+        if 'voice' in self.capabilities:
+            self.pipeline.add_stage('audio', self.audio_processor, self.audio_queue, self.audio_workers)
+        if 'ocr' in self.capabilities:
+            self.pipeline.add_stage('image', self.image_processor, self.image_queue, self.image_workers)
+        self.pipeline.add_stage(
+            'sender', self.result_sender, self.result_queue, self.sender_workers,
+            batch_size=self.batch_size, batch_timeout=self.batch_max_wait
+        )
+        self.pipeline.start()
+        self.fuser.start()
+        for stage in self.pipeline.stages:
+            self.metrics.gauge('edge_pipeline_processed_total', lambda s=stage: s.processed, kind='counter', stage=stage.name)
+            self.metrics.gauge('edge_pipeline_errors_total', lambda s=stage: s.errors, kind='counter', stage=stage.name)
+        if self.metrics_port:
+            self.metrics_server = MetricsServer(self.metrics, self.metrics_host, self.metrics_port)
+            self.metrics_server.start()
+        self.replay_worker.start()
+        self.catalog_sync.start()
+        self.catalog_watcher.start()
         
-        # Start result sender thread
-        sender_thread = threading.Thread(target=self.result_sender, daemon=True)
-        sender_thread.start()
+        # systemd stops the service with SIGTERM; treat it like Ctrl-C
+        # (handlers can only be installed from the main thread)
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda signum, frame: self.stop_event.set())
         
-        logger.info("All threads started. Ready for transactions.")
+        logger.info("All stages started. Ready for transactions.")
+        self.ready_event.set()
         
         # Main loop
         try:
-            while True:
-                self.listen_for_input()
-                time.sleep(0.1)
+            self.listen_for_input()
+            self.start_camera()
+            while not self.stop_event.is_set():
+                self.stop_event.wait(1.0)
         except KeyboardInterrupt:
-            logger.info("Shutting down...")
+            pass
+        
+        self.stop_processing()
+
+    def stop_processing(self, drain: bool = True):
+        """Stop capture and drain queued work through to the sender"""
+        logger.info("Shutting down...")
+        self.stop_event.set()
+        for stream in self.audio_streams:
+            stream.stop(timeout=10)
+        self.audio_streams = []
+        for camera in self.cameras:
+            camera.stop(timeout=10)
+        self.cameras = []
+        if self.pipeline:
+            if not self.capabilities:
+                # No capture stage to flush after; flush before the sender drains
+                self.fuser.stop(flush=drain)
+            self.pipeline.shutdown(drain=drain, on_stage_stopped=self.on_stage_stopped)
+            self.pipeline = None
+            self.cpu_pool = None
+        self.replay_worker.stop()
+        if self.metrics_server:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        self.catalog_sync.stop(timeout=5)
+        self.catalog_watcher.stop(timeout=5)
+        self.catalog_snapshots.wait_idle(timeout=30)
+        self.catalog.close()
+        if self.ocr:
+            self.ocr.close()
+        self.journal.close()
+        self.uploader.close()
+        logger.info("Shutdown complete")
+
+    def run_cpu_bound(self, fn, data):
+        """Run a CPU-heavy step in the process pool when configured"""
+        if self.cpu_pool is not None:
+            result, captured = self.cpu_pool.submit(fn, data).result()
+            # Stage timings and counters taken in the worker process land in
+            # this registry
+            self.metrics.replay(captured)
+            return result
+        result, _ = fn(data, self)
+        return result
 
     def listen_for_input(self):
-        """Listen for voice input or image capture"""
-        # Simulate voice input detection
-        # In real implementation, this would use microphone
-        pass
+        """Start streaming voice capture from every source with an audio input"""
+        if 'voice' not in self.capabilities or self.audio_streams:
+            return
+        
+        for name, input_source in self.sources.items():
+            if not input_source.audio:
+                continue
+            if input_source.audio == 'mic':
+                source = MicrophoneSource()
+            elif input_source.audio.startswith('mic:'):
+                source = MicrophoneSource(int(input_source.audio[4:]))
+            else:
+                source = WavFileSource(input_source.audio)
+            
+            stream = StreamingTranscriber(
+                source,
+                transcribe_fn=lambda chunk, name=name: self.transcribe_streamed(chunk, name),
+                split_fn=self.split_segments,
+                parse_fn=self.parse_streamed_segment,
+                on_items=lambda utterance_id, items, final, name=name: self.handle_streamed_items(
+                    utterance_id, items, final, name)
+            )
+            stream.start()
+            self.audio_streams.append(stream)
+            logger.info(f"Listening on audio source: {input_source.audio} ({name})")
+
+    def start_camera(self):
+        """Watch every source's camera and queue each new, stable scene for OCR"""
+        if self.cameras:
+            return
+        
+        for name, input_source in self.sources.items():
+            if not input_source.camera:
+                continue
+            from camera_stream import CameraIngest, SceneChangeDetector, VideoSource
+            
+            source = int(input_source.camera) if input_source.camera.isdigit() else input_source.camera
+            camera = CameraIngest(
+                VideoSource(source, self.camera_resolution, realtime=True),
+                on_frame=lambda frame, name=name: self.enqueue_frame(frame, name),
+                detector=SceneChangeDetector(stable_frames=self.camera_stable_frames)
+            )
+            camera.start()
+            self.cameras.append(camera)
+            logger.info(f"Watching camera source: {input_source.camera} ({name})")
+
+    def enqueue_frame(self, frame: np.ndarray, source: Optional[str] = None) -> bool:
+        """Queue a camera frame for OCR; a full lane sheds its stalest frame instead of stalling capture"""
+        self.image_queue.submit(source or self.default_source, frame)
+        return True
+
+    def submit_audio(self, audio_data: bytes, source: Optional[str] = None):
+        """Queue a recorded voice clip for STT, waiting while the source's lane is full"""
+        self.audio_queue.submit(source or self.default_source, audio_data)
+
+    def transcribe_streamed(self, chunk, source: Optional[str] = None) -> str:
+        """Transcribe a streamed chunk in its source's turn, accumulating its utterance's processing time"""
+        source = source or self.default_source
+        start = time.perf_counter()
+        reply = Future()
+        self.audio_queue.submit(source, chunk, reply)
+        # None when the chunk was shed as stale
+        text = reply.result() or ''
+        elapsed = time.perf_counter() - start
+        key = (source, chunk.utterance_id)
+        self._utterance_seconds[key] = self._utterance_seconds.get(key, 0.0) + elapsed
+        return text
+
+    def parse_streamed_segment(self, segment: str) -> Optional[TransactionItem]:
+        with self.metrics.timer('parse'):
+            return self.parse_transaction_segment(segment)
+
+    def transcribe_chunk(self, chunk) -> str:
+        """Transcribe one VAD-gated audio chunk"""
+        with self.metrics.timer('stt'):
+            return self.stt.transcribe(chunk.samples, language="fil")
+
+    def handle_streamed_items(self, utterance_id: int, items: List[TransactionItem], final: bool,
+                              source: Optional[str] = None):
+        """Emit partial items as segments parse; send the transaction at utterance end"""
+        source = source or self.default_source
+        if not final:
+            for item in items:
+                logger.info(f"Utterance {source}/{utterance_id}: {item.quantity} {item.unit} {item.productName}")
+            return
+        
+        processing_time = self._utterance_seconds.pop((source, utterance_id), 0.0)
+        self.fuser.add(self.sources[source].device_id, VOICE, items, processing_time)
 
     def process_voice_transaction(self, audio_data: bytes) -> List[TransactionItem]:
         """Process voice input using Whisper STT"""
+        if self.stt is None:
+            logger.error(f"Voice input dropped: role '{self.role}' has no voice capture")
+            return []
         start_time = time.time()
         
         try:
-            # Transcribe audio using Whisper
-            result = self.whisper_model.transcribe(audio_data, language="fil")
-            transcription = result["text"]
+            # Transcribe audio with the configured STT backend
+            with self.metrics.timer('stt'):
+                transcription = self.stt.transcribe(audio_data, language="fil")
             
             logger.info(f"Transcribed: {transcription}")
             
             # Parse Filipino transaction
-            items = self.parse_filipino_transaction(transcription)
+            with self.metrics.timer('parse'):
+                items = self.parse_filipino_transaction(transcription)
             
             processing_time = time.time() - start_time
             logger.info(f"Voice processing completed in {processing_time:.2f}s")
@@ -156,66 +483,194 @@ class RaspberryPiProcessor:
             
         except Exception as e:
             logger.error(f"Voice processing error: {e}")
+            self.metrics.inc('edge_errors_total', stage='voice')
             return []
 
     def parse_filipino_transaction(self, transcription: str) -> List[TransactionItem]:
         """Parse Filipino transaction text into structured items"""
         items = []
         
-        # Common Filipino number words
-        number_words = {
-            'isa': 1, 'dalawa': 2, 'tatlo': 3, 'apat': 4, 'lima': 5,
-            'anim': 6, 'pito': 7, 'walo': 8, 'siyam': 9, 'sampu': 10,
-            'labing-isa': 11, 'labindalawa': 12, 'dalawampu': 20,
-            'tatlumpu': 30, 'apatnapu': 40, 'limampu': 50
-        }
-        
-        # Split by common separators
-        segments = re.split(r'[,.]|\s+at\s+|\s+tsaka\s+', transcription.lower())
-        
-        for segment in segments:
-            segment = segment.strip()
-            if not segment:
-                continue
-                
-            item = self.parse_transaction_segment(segment, number_words)
+        # Tokenize once: segments carry the quantities already read from them.
+        # One snapshot for the whole transcription, even if a reload lands mid-parse
+        snapshot = self.snapshot
+        for segment in split_transaction(transcription.lower()):
+            item = self.parse_transaction_segment(segment.text, segment.quantities, snapshot)
             if item:
                 items.append(item)
         
         return items
 
-    def parse_transaction_segment(self, segment: str, number_words: dict) -> Optional[TransactionItem]:
-        """Parse individual transaction segment"""
-        
-        # Extract quantity
-        quantity = 1
-        for word, num in number_words.items():
-            if word in segment:
-                quantity = num
-                segment = segment.replace(word, '').strip()
-                break
-        
-        # Check for numeric quantity
-        qty_match = re.search(r'(\d+)', segment)
-        if qty_match:
-            quantity = int(qty_match.group(1))
-            segment = re.sub(r'\d+', '', segment).strip()
-        
-        # Extract unit
-        unit = 'pc'
-        for filipino_unit, standard_unit in self.filipino_units.items():
-            if filipino_unit in segment:
-                unit = standard_unit
-                segment = segment.replace(filipino_unit, '').strip()
-                break
-        
-        # Identify product
-        product_info = self.identify_product(segment)
-        if not product_info:
-            return None
+    def split_segments(self, transcription: str) -> List[str]:
+        """Split a transcription into per-item segments"""
+        # Commas and joiners split, but not inside "1.5" or "isang daan at lima"
+        return [segment.text for segment in split_transaction(transcription.lower())]
+
+    def product_terms(self) -> List[Tuple[str, Dict, int]]:
+        """(term, product info, priority) for every catalog term
+
+        Catalog products come back in priority order (Filipino staples
+        first); a shared term keeps only its highest-priority product, which
+        is the one parse_transaction_segment would pick anyway
+        """
+        terms = []
+        seen = set()
+        for product in self.catalog.iter_products():
+            info = {
+                'sku': product['sku'],
+                'name': product['name'],
+                'brand': product['brand'],
+                'local': product['local'],
+                'generic': product['generic'],
+                'category': product['category'],
+                'unitPrice': product['unitPrice'],
+                'unbranded': product['unbranded']
+            }
+            for term in product['terms']:
+                if term not in seen:
+                    seen.add(term)
+                    terms.append((term, info, product['priority']))
+        return terms
+
+    def build_lexicon(self, product_terms: Optional[List[Tuple[str, Dict, int]]] = None,
+                      units: Optional[Dict[str, str]] = None) -> LexiconMatcher:
+        """Compile units and product terms into one matcher"""
+        lexicon = LexiconMatcher()
+        
+        for filipino_unit, standard_unit in (units or self.filipino_units).items():
+            lexicon.add(filipino_unit, 'unit', standard_unit)
+        
+        for term, info, priority in product_terms or self.product_terms():
+            lexicon.add(term, 'product', info, priority)
+        
+        return lexicon.build()
+
+    def build_fuzzy_index(self, product_terms: Optional[List[Tuple[str, Dict, int]]] = None) -> FuzzyIndex:
+        """Phonetic trigram index for product names the exact lexicon misses"""
+        index = FuzzyIndex(min_score=self.fuzzy_min_score)
+        for term, info, priority in product_terms or self.product_terms():
+            index.add(term, info, priority)
+        return index.build()
+
+    def build_snapshot(self, previous: Optional[CatalogSnapshot], version: int, reason: str) -> CatalogSnapshot:
+        """Everything parsing reads from the catalog, built off to the side"""
+        start = time.perf_counter()
+        config = read_catalog_config(self.catalog_config)
+        units = {**self.filipino_units, **config.get('units', {})}
+        brand_templates = {**self.brand_templates, **config.get('brandTemplates', {})}
+        product_terms = self.product_terms()
+        
+        # Template images only need reloading when the template set changes
+        # (and only on devices that read receipts)
+        if 'ocr' not in self.capabilities:
+            brand_detector = None
+        elif previous is not None and previous.brand_templates == brand_templates:
+            brand_detector = previous.brand_detector
+        else:
+            from brand_detector import BrandDetector
+            
+            brand_detector = BrandDetector(budget_ms=self.brand_budget_ms)
+            brand_detector.load_templates(brand_templates, self.template_dir)
         
-        # Estimate price (in real implementation, this would come from POS or database)
-        unit_price = self.estimate_price(product_info, unit)
+        return CatalogSnapshot(
+            version=version,
+            source=reason,
+            lexicon=self.build_lexicon(product_terms, units),
+            fuzzy=self.build_fuzzy_index(product_terms),
+            units=units,
+            category_prices={**DEFAULT_CATEGORY_PRICES, **config.get('categoryPrices', {})},
+            brand_templates=brand_templates,
+            brand_detector=brand_detector,
+            products=len({info['sku'] for _, info, _ in product_terms}),
+            cursor=self.catalog.sync_cursor(),
+            build_seconds=time.perf_counter() - start
+        )
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        """Live catalog snapshot (swapped atomically on reload)"""
+        return self.catalog_snapshots.current
+
+    def apply_config_products(self):
+        """Upsert the products listed in the catalog config file into the local catalog"""
+        products = read_catalog_config(self.catalog_config).get('products')
+        if products:
+            self.catalog.upsert_products(products)
+
+    def on_catalog_config_change(self):
+        """Apply products from the catalog config file and rebuild in the background"""
+        self.apply_config_products()
+        self.catalog_snapshots.request_reload('config file')
+
+    def fuzzy_product(self, segment: str, spans: List[Tuple[int, int]],
+                      snapshot: Optional[CatalogSnapshot] = None) -> Tuple[List, str]:
+        """Ranked fuzzy candidates for the words no exact match or quantity consumed"""
+        # Quantities and units split the segment; product names sit between them
+        residual = list(segment)
+        for start, end in spans:
+            residual[start:end] = ['|'] * (end - start)
+        best, heard = [], ''
+        for run in ''.join(residual).split('|'):
+            words = re.findall(r'[^\W\d_]+', run)
+            if not words:
+                continue
+            candidates, start, end = (snapshot or self.snapshot).fuzzy.best_span(words)
+            if candidates and (not best or candidates[0].score > best[0].score):
+                best, heard = candidates, ' '.join(words[start:end])
+        return best, heard
+
+    def parse_transaction_segment(self, segment: str, quantities: Optional[List[Quantity]] = None,
+                                  snapshot: Optional[CatalogSnapshot] = None) -> Optional[TransactionItem]:
+        """Parse individual transaction segment in a single lexicon pass"""
+        if quantities is None:
+            quantities = read_quantities(segment)
+        snapshot = snapshot or self.snapshot
+        unit = None
+        product = None
+        product_start = 0
+        confidence = 0.85
+        suggested_brands = None
+        notes = None
+        
+        matches = snapshot.lexicon.scan(segment)
+        for match in matches:
+            entry = match.entry
+            # Digits are read with the number words, so lexicon numerals are skipped
+            if entry.kind == 'unit':
+                if unit is None:
+                    unit = entry.value
+            elif entry.kind == 'product':
+                if product is None or entry.priority < product.priority:
+                    product, product_start = entry, match.start
+        
+        if product is None:
+            # Misheard names ("koka", "lucky mi") fall back to the fuzzy index
+            spans = [(m.start, m.end) for m in matches] + [(q.start, q.end) for q in quantities]
+            candidates, heard = self.fuzzy_product(segment, spans, snapshot)
+            if not candidates:
+                return None
+            product, product_start = candidates[0], segment.find(heard)
+            confidence = round(confidence * product.score, 3)
+            notes = f"fuzzy: '{heard}' -> '{product.term}'"
+            chosen_brand = product.value.get('brand')
+            suggested_brands = list(dict.fromkeys(
+                c.value['brand'] for c in candidates[1:] if c.value.get('brand') and c.value['brand'] != chosen_brand
+            ))
+        
+        product_info = product.value
+        quantity, amount = self.choose_quantity(quantities, product_start)
+        unit = unit or 'pc'
+        
+        # A spoken amount ("bente pesos", "tig-singko") is the price paid;
+        # otherwise estimate it (in real implementation, this would come from POS or database)
+        if amount is None:
+            unit_price = self.estimate_price(product_info, unit, snapshot)
+            total_price = unit_price * quantity
+        elif amount.each:
+            unit_price = float(amount.value)
+            total_price = unit_price * quantity
+        else:
+            unit_price = round(amount.value / quantity, 2)
+            total_price = float(amount.value)
         
         return TransactionItem(
             brandName=product_info.get('brand'),
@@ -226,71 +681,69 @@ class RaspberryPiProcessor:
             quantity=quantity,
             unit=unit,
             unitPrice=unit_price,
-            totalPrice=unit_price * quantity,
+            totalPrice=total_price,
             category=product_info['category'],
             isUnbranded=product_info.get('unbranded', False),
             isBulk=quantity > 10 and unit in ['kg', 'L'],
             detectionMethod='stt',
-            confidence=0.85,
-            suggestedBrands=product_info.get('suggested_brands', [])
+            confidence=confidence,
+            suggestedBrands=suggested_brands or product_info.get('suggested_brands', []),
+            notes=notes
         )
 
-    def identify_product(self, text: str) -> Optional[Dict]:
+    def choose_quantity(self, quantities: List[Quantity], product_start: int) -> Tuple[float, Optional[Quantity]]:
+        """(count, spoken amount) for one item
+
+        The count is the number said before the product ("dalawang coke"),
+        else the first one after it ("coke dalawa"). Peso amounts are prices,
+        as is a "tig-" number following the count ("tatlong coke tig-bente").
+        """
+        counts = [q for q in quantities if not q.peso]
+        amount = next((q for q in quantities if q.peso), None)
+        if len(counts) > 1 and counts[1].each and amount is None:
+            amount = counts.pop(1)._replace(peso=True)
+        count = next((q for q in counts if q.start < product_start), counts[0] if counts else None)
+        return (count.value if count else 1), amount
+
+    def identify_product(self, text: str, snapshot: Optional[CatalogSnapshot] = None) -> Optional[Dict]:
         """Identify product from text"""
-        text = text.lower().strip()
-        
-        # Check against Filipino patterns first
-        for local_name, info in self.filipino_patterns.items():
-            if local_name in text:
-                return {
-                    'name': info['generic'],
-                    'local': local_name,
-                    'generic': info['generic'],
-                    'category': info['category'],
-                    'unbranded': info['unbranded']
-                }
-        
-        # Check against brand database
-        for product in self.product_database:
-            if any(variant.lower() in text for variant in product['variants']):
-                return {
-                    'name': product['name'],
-                    'brand': product.get('brand'),
-                    'category': product['category'],
-                    'unbranded': False
-                }
-        
-        # Generic product detection
-        if 'coke' in text or 'cola' in text:
-            return {
-                'name': 'Coke 1.5L',
-                'brand': 'Coca-Cola',
-                'category': 'beverage',
-                'unbranded': False
-            }
+        best = None
+        snapshot = snapshot or self.snapshot
+        matches = snapshot.lexicon.scan(text.lower().strip())
+        for match in matches:
+            if match.entry.kind == 'product':
+                if best is None or match.entry.priority < best.priority:
+                    best = match.entry
         
-        return None
+        if best is None:
+            text = text.lower().strip()
+            spans = [(m.start, m.end) for m in matches] + [(q.start, q.end) for q in read_quantities(text)]
+            candidates, _ = self.fuzzy_product(text, spans, snapshot)
+            return candidates[0].value if candidates else None
+        return best.value
 
-    def process_image_transaction(self, image_data: bytes) -> List[TransactionItem]:
-        """Process receipt image using OpenCV + OCR"""
+    def process_image_transaction(self, image_data: 'ImageInput') -> List[TransactionItem]:
+        """Process a receipt image (encoded bytes, a file path or a camera frame) using OpenCV + OCR"""
+        if self.ocr is None:
+            logger.error(f"Receipt image dropped: role '{self.role}' has no receipt OCR")
+            return []
         start_time = time.time()
         
         try:
-            # Convert bytes to OpenCV image
-            nparr = np.frombuffer(image_data, np.uint8)
-            img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            
-            # Preprocess image
-            processed_img = self.preprocess_image(img)
+            # Grayscale at reduced scale; camera frames go through reused buffers
+            with self.metrics.timer('decode'):
+                img = self.image_decoder.decode(image_data)
             
-            # Detect brands using template matching
-            detected_brands = self.detect_brands(processed_img)
+            # Detect brands on the camera image (logos do not survive thresholding)
+            with self.metrics.timer('brands'):
+                detected_brands = self.detect_brands(img)
             
-            # Extract text using OCR
-            ocr_text = self.extract_text_tesseract(processed_img)
+            # Extract text line by line
+            ocr_lines = self.extract_text_tesseract(img)
             
             # Parse transaction items
-            items = self.parse_receipt_text(ocr_text, detected_brands)
+            with self.metrics.timer('parse'):
+                items = self.parse_receipt_text(ocr_lines, detected_brands)
             
             processing_time = time.time() - start_time
             logger.info(f"Image processing completed in {processing_time:.2f}s")
@@ -299,40 +752,25 @@ class RaspberryPiProcessor:
             
         except Exception as e:
             logger.error(f"Image processing error: {e}")
+            self.metrics.inc('edge_errors_total', stage='image')
             return []
 
-    def preprocess_image(self, img):
-        """Preprocess image for better OCR"""
-        # Convert to grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
-        # Apply adaptive threshold
-        binary = cv2.adaptiveThreshold(
-            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-            cv2.THRESH_BINARY, 11, 2
-        )
-        
-        # Noise reduction
-        kernel = np.ones((1, 1), np.uint8)
-        cleaned = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel)
-        
-        return cleaned
-
-    def extract_text_tesseract(self, img):
-        """Extract text using Tesseract OCR"""
-        # Configure Tesseract for Filipino text
-        config = '--oem 3 --psm 6 -l eng+fil'
-        
-        # Extract text
-        text = pytesseract.image_to_string(img, config=config)
-        
-        return text
+    def extract_text_tesseract(self, img) -> List[OCRLine]:
+        """Deskew, find text lines and recognize them in parallel"""
+        with self.metrics.timer('preprocess'):
+            gray = img if img.ndim == 2 else self.image_decoder.gray(img)
+            crops, boxes = self.ocr.line_images(gray)
+        with self.metrics.timer('ocr'):
+            return self.ocr.recognize_lines(crops, boxes)
 
     def generate_transaction_json(self, items: List[TransactionItem], 
-                                processing_time: float) -> Dict:
+                                processing_time: float, device_id: Optional[str] = None) -> Dict:
         """Generate final JSON output"""
         
-        transaction_id = f"TXN-{int(time.time())}"
+        device_id = device_id or self.device_id
+        if device_id not in self.txn_ids:
+            self.txn_ids[device_id] = TransactionIdGenerator(device_id)
+        transaction_id = self.txn_ids[device_id].new_id()
         timestamp = datetime.now().isoformat()
         
         # Calculate totals
@@ -349,111 +787,105 @@ class RaspberryPiProcessor:
         }
         
         # Generate insights
+        self.aggregates.update(items)
         insights = self.generate_insights(items)
         
         # Create final output
         output = TransactionOutput(
             storeId=self.store_id,
-            deviceId=self.device_id,
+            deviceId=device_id,
             timestamp=timestamp,
             transactionId=transaction_id,
             items=items,
             totals=totals,
             insights=insights,
             paymentMethod='cash',  # Default, could be detected
-            processingTime=processing_time,
-            edgeVersion=self.edge_version
+            processingTime=round(processing_time, 3),
+            edgeVersion=self.edge_version,
+            edgeMetrics=self.metrics_summary_due(),
+            edgeAggregates=self.aggregate_summary_due()
         )
         
-        return asdict(output)
+        return to_dict(output)
+
+    def metrics_summary_due(self) -> Optional[Dict]:
+        """Metrics summary to attach to the first payload of each interval"""
+        if self.metrics_summary_interval <= 0:
+            return None
+        now = time.monotonic()
+        if now - self._last_metrics_summary < self.metrics_summary_interval:
+            return None
+        self._last_metrics_summary = now
+        return self.metrics.summary()
+
+    def aggregate_summary_due(self) -> Optional[Dict]:
+        """Store counters since the previous summary, once per interval"""
+        if self.aggregate_summary_interval <= 0:
+            return None
+        now = time.monotonic()
+        if now - self._last_aggregate_summary < self.aggregate_summary_interval:
+            return None
+        self._last_aggregate_summary = now
+        return self.aggregates.take_delta()
+
+    def echo_transaction(self, transaction_data: Dict):
+        """Log a finished transaction to the console (one line unless PRETTY_JSON=1)"""
+        print(dumps(transaction_data, pretty=self.pretty_json).decode('utf-8'))
 
     def send_to_api(self, transaction_data: Dict) -> bool:
         """Send transaction data to central API"""
+        return self.uploader.send_one(transaction_data)
+
+    def audio_processor(self, work: SourceWork):
+        """Audio stage handler: a streamed chunk to transcribe, or a whole clip"""
+        start = time.perf_counter()
         try:
-            response = requests.post(
-                f"{self.api_endpoint}/api/transactions",
-                json=transaction_data,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                logger.info(f"Transaction sent successfully: {transaction_data['transactionId']}")
-                return True
-            else:
-                logger.error(f"API error: {response.status_code}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Failed to send transaction: {e}")
-            return False
-
-    def audio_processor(self):
-        """Background audio processing thread"""
-        while True:
-            try:
-                if not self.audio_queue.empty():
-                    audio_data = self.audio_queue.get()
-                    items = self.process_voice_transaction(audio_data)
-                    
-                    if items:
-                        json_output = self.generate_transaction_json(items, 0.5)
-                        self.result_queue.put(json_output)
-                        
-                        # Print JSON to console
-                        print(json.dumps(json_output, indent=2, default=str))
-                        
-            except Exception as e:
-                logger.error(f"Audio processor error: {e}")
-            
-            time.sleep(0.1)
-
-    def image_processor(self):
-        """Background image processing thread"""
-        while True:
-            try:
-                if not self.image_queue.empty():
-                    image_data = self.image_queue.get()
-                    items = self.process_image_transaction(image_data)
-                    
-                    if items:
-                        json_output = self.generate_transaction_json(items, 1.2)
-                        self.result_queue.put(json_output)
-                        
-                        # Print JSON to console
-                        print(json.dumps(json_output, indent=2, default=str))
-                        
-            except Exception as e:
-                logger.error(f"Image processor error: {e}")
-            
-            time.sleep(0.1)
-
-    def result_sender(self):
-        """Background result sender thread"""
-        while True:
-            try:
-                if not self.result_queue.empty():
-                    transaction_data = self.result_queue.get()
-                    success = self.send_to_api(transaction_data)
-                    
-                    if not success:
-                        # Store locally for retry
-                        self.store_offline(transaction_data)
-                        
-            except Exception as e:
-                logger.error(f"Result sender error: {e}")
-            
-            time.sleep(1)
+            if work.reply is not None:
+                try:
+                    work.reply.set_result(self.run_cpu_bound(_chunk_worker, work.payload))
+                except Exception as e:
+                    work.reply.set_exception(e)
+                return
+            items = self.run_cpu_bound(_voice_worker, work.payload)
+            self.fuser.add(self.sources[work.source].device_id, VOICE, items, time.perf_counter() - start)
+        finally:
+            self.audio_queue.done(work, time.perf_counter() - start)
 
-    def store_offline(self, transaction_data: Dict):
-        """Store transaction offline for later sync"""
-        offline_dir = "/tmp/offline_transactions"
-        os.makedirs(offline_dir, exist_ok=True)
+    def image_processor(self, work: SourceWork):
+        """Image stage handler"""
+        start = time.perf_counter()
+        try:
+            items = self.run_cpu_bound(_image_worker, work.payload)
+            self.fuser.add(self.sources[work.source].device_id, IMAGE, items, time.perf_counter() - start)
+        finally:
+            self.image_queue.done(work, time.perf_counter() - start)
+
+    def emit_fused(self, device_id: str, result: FusedResult):
+        """Queue one transaction per sale once fusion has paired (or timed out) its results"""
+        if len(result.sources) > 1:
+            logger.info(f"Fused voice + receipt: {result.matched} matched item(s) after {result.waited:.2f}s")
+        json_output = self.generate_transaction_json(result.items, result.processing_time, device_id)
+        self.result_queue.put(json_output)
         
-        filename = f"{offline_dir}/{transaction_data['transactionId']}.json"
-        with open(filename, 'w') as f:
-            json.dump(transaction_data, f, indent=2, default=str)
+        self.echo_transaction(json_output)
+
+    def on_stage_stopped(self, stage: str):
+        """Flush results waiting for a partner once no producer stage is left"""
+        if stage == ('image' if 'ocr' in self.capabilities else 'audio'):
+            self.fuser.stop(flush=not self.pipeline.abort_event.is_set())
+
+    def result_sender(self, batch: List[Dict]):
+        """Sender stage handler; receives size/time-bounded batches"""
+        failed = self.uploader.send_batch(batch)
         
-        logger.info(f"Stored offline: {filename}")
+        for transaction_data in failed:
+            # Store locally for retry
+            self.store_offline(transaction_data)
+
+    def store_offline(self, transaction_data: Dict):
+        """Journal transaction for in-order replay once the hub is reachable"""
+        self.journal.append(transaction_data)
+        logger.info(f"Stored offline: {transaction_data['transactionId']}")
 
     def load_brand_templates(self) -> Dict:
         """Load brand templates for CV detection"""
@@ -464,54 +896,78 @@ class RaspberryPiProcessor:
             'Jack n Jill': 'template_jnj.png',
         }
 
-    def load_product_database(self) -> List[Dict]:
-        """Load product database"""
-        return [
+    def load_product_database(self) -> ProductCatalog:
+        """Open the local product/price catalog, seeding it on first run"""
+        catalog = ProductCatalog(os.getenv('CATALOG_DB', 'catalog.db'), store_id=self.store_id)
+        if not catalog.count():
+            catalog.upsert_products(self.seed_products())
+            logger.info(f"Seeded product catalog with {catalog.count()} product(s)")
+        return catalog
+
+    def seed_products(self) -> List[Dict]:
+        """Built-in products used until the first sync from the hub"""
+        products = []
+        for priority, (local_name, info) in enumerate(self.filipino_patterns.items()):
+            products.append({
+                'sku': stable_sku(info['generic']),
+                'name': info['generic'],
+                'genericName': info['generic'],
+                'localName': local_name,
+                'category': info['category'],
+                'unitPrice': DEFAULT_CATEGORY_PRICES.get(info['category'], 20.0),
+                'unbranded': info['unbranded'],
+                'priority': priority
+            })
+        
+        branded = [
             {
                 'name': 'Coke',
                 'brand': 'Coca-Cola',
-                'variants': ['Coke', 'Coca-Cola', '1.5L', 'Litro'],
+                'variants': ['Coke', 'Coca-Cola', '1.5L', 'Litro', 'Cola'],
                 'category': 'beverage',
-                'price_range': [55, 75]
+                'unitPrice': 65.0
             },
             {
                 'name': 'Pancit Canton',
                 'brand': 'Lucky Me',
                 'variants': ['Lucky Me', 'Canton', 'Pancit'],
                 'category': 'food',
-                'price_range': [12, 18]
+                'unitPrice': 15.0
             },
             {
                 'name': 'Chippy',
                 'brand': 'Jack n Jill',
                 'variants': ['Chippy', 'Jack'],
                 'category': 'snacks',
-                'price_range': [20, 30]
+                'unitPrice': 25.0
             }
         ]
+        for priority, product in enumerate(branded, start=len(products)):
+            products.append(dict(product, sku=stable_sku(product['name'], product['brand']), priority=priority))
+        
+        return products
 
-    def estimate_price(self, product_info: Dict, unit: str) -> float:
-        """Estimate product price based on database"""
-        # In real implementation, this would query local price database
-        base_prices = {
-            'beverage': 65.0,
-            'food': 15.0,
-            'snacks': 25.0,
-            'staple': 55.0,
-            'fresh': 8.0,
-            'cooking': 85.0
-        }
+    def fetch_catalog_delta(self, cursor: Optional[str]) -> Optional[Dict]:
+        """Fetch catalog changes since cursor from the hub"""
+        params = {'storeId': self.store_id}
+        if cursor:
+            params['since'] = cursor
+        return self.uploader.get_json('/api/catalog', params)
+
+    def estimate_price(self, product_info: Dict, unit: str, snapshot: Optional[CatalogSnapshot] = None) -> float:
+        """Price from the local catalog (store override, unit price, base price)"""
+        if product_info.get('sku'):
+            price = self.catalog.price(product_info['sku'], unit)
+            if price is not None:
+                return price
+        if product_info.get('unitPrice') is not None:
+            return product_info['unitPrice']
         
-        return base_prices.get(product_info['category'], 20.0)
+        return (snapshot or self.snapshot).category_prices.get(product_info['category'], 20.0)
 
     def generate_sku(self, product_info: Dict) -> str:
-        """Generate SKU for product"""
-        if product_info.get('brand'):
-            brand_code = product_info['brand'][:3].upper()
-            product_code = product_info['name'][:4].upper()
-            return f"{brand_code}-{product_code}-{int(time.time()) % 1000000}"
-        else:
-            return f"UNB-{product_info['name'][:4].upper()}-{int(time.time()) % 1000000}"
+        """Catalog SKU, or a stable code derived from brand and name"""
+        return product_info.get('sku') or stable_sku(product_info['name'], product_info.get('brand'))
 
     def generate_insights(self, items: List[TransactionItem]) -> Dict:
         """Generate transaction insights"""
@@ -540,66 +996,158 @@ class RaspberryPiProcessor:
         )
 
     def get_suggestions(self, items: List[TransactionItem]) -> List[str]:
-        """Get upsell suggestions"""
-        suggestions = []
-        
-        # Check for common combinations
-        has_rice = any('rice' in item.productName.lower() for item in items)
-        has_oil = any('oil' in item.productName.lower() for item in items)
-        
-        if has_rice and not has_oil:
-            suggestions.append("Suggest cooking oil with rice purchase")
-        
-        return suggestions
+        """Upsell suggestions from this store's basket co-occurrence"""
+        return self.aggregates.suggestions(items)
 
     def detect_brands(self, img) -> List[Dict]:
-        """Detect brands using template matching"""
-        # Simplified brand detection
-        return []
+        """Detect brand logos with the indexed ORB template matcher"""
+        detector = self.snapshot.brand_detector
+        return detector.detect(img) if detector else []
 
-    def parse_receipt_text(self, text: str, brands: List[Dict]) -> List[TransactionItem]:
-        """Parse receipt text into items"""
-        items = []
-        lines = text.split('\n')
+    def parse_receipt_text(self, lines: List[OCRLine], brands: List[Dict]) -> List[TransactionItem]:
+        """Parse recognized receipt lines into items named from the catalog"""
+        receipt = parse_receipt(lines)
+        if receipt.balanced is False:
+            self.metrics.inc('edge_receipt_unbalanced_total')
+            logger.info(f"Receipt items add up to {receipt.items_sum:.2f}, printed {receipt.expected:.2f}")
+        snapshot = self.snapshot
         
-        for line in lines:
-            line = line.strip()
-            if not line or 'TOTAL' in line.upper():
-                continue
+        items = []
+        for line in receipt.items:
+            product_info = self.identify_product(line.name, snapshot) if line.name else None
+            if product_info is None:
+                product_info = {'name': line.name.title() or 'Unknown item', 'category': 'unknown'}
+            else:
+                line.notes.insert(0, f"receipt: '{line.name}'")
+            # Attach a detected logo when the line or its catalog product names that brand
+            brand = next((b for b in brands if b['brand'].lower() in line.name.lower()
+                          or b['brand'] == product_info.get('brand')), None)
+            brand_name = brand['brand'] if brand else product_info.get('brand')
             
-            # Simple parsing - in real implementation would be more sophisticated
-            parts = line.split()
-            if len(parts) >= 2:
-                try:
-                    quantity = int(parts[0])
-                    product_name = ' '.join(parts[1:-1])
-                    price = float(parts[-1])
-                    
-                    item = TransactionItem(
-                        brandName=None,
-                        productName=product_name,
-                        genericName=product_name,
-                        localName=None,
-                        sku=f"OCR-{int(time.time()) % 1000000}",
-                        quantity=quantity,
-                        unit='pc',
-                        unitPrice=price / quantity,
-                        totalPrice=price,
-                        category='unknown',
-                        isUnbranded=True,
-                        isBulk=False,
-                        detectionMethod='ocr',
-                        confidence=0.8
-                    )
-                    items.append(item)
-                except (ValueError, IndexError):
-                    continue
+            items.append(TransactionItem(
+                brandName=brand_name,
+                productName=product_info['name'],
+                genericName=product_info.get('generic', line.name),
+                localName=product_info.get('local'),
+                sku=self.generate_sku(dict(product_info, brand=brand_name)),
+                quantity=line.quantity,
+                unit='pc',
+                unitPrice=line.unit_price,
+                totalPrice=line.total,
+                category=product_info['category'],
+                isUnbranded=brand_name is None,
+                isBulk=False,
+                detectionMethod='hybrid' if brand else 'ocr',
+                confidence=line.confidence,
+                brandConfidence=brand['confidence'] if brand else None,
+                suggestedBrands=[b['brand'] for b in brands] or None,
+                notes='; '.join(line.notes) or None
+            ))
         
         return items
 
+# Processor shared with forked CPU workers (see start_processing)
+_worker_processor: Optional[RaspberryPiProcessor] = None
+
+def _warm_worker():
+    """Force the pool to fork its workers up front"""
+    return os.getpid()
+
+def _voice_worker(audio_data: bytes, processor: Optional[RaspberryPiProcessor] = None):
+    with capture_metrics() as captured:
+        items = (processor or _worker_processor).process_voice_transaction(audio_data)
+    return items, captured
+
+def _chunk_worker(chunk, processor: Optional[RaspberryPiProcessor] = None):
+    with capture_metrics() as captured:
+        text = (processor or _worker_processor).transcribe_chunk(chunk)
+    return text, captured
+
+def _image_worker(image_data: 'ImageInput', processor: Optional[RaspberryPiProcessor] = None):
+    with capture_metrics() as captured:
+        items = (processor or _worker_processor).process_image_transaction(image_data)
+    return items, captured
+
 def main():
     """Main function to run the Raspberry Pi processor"""
+    parser = argparse.ArgumentParser(description="Raspberry Pi edge transaction processor")
+    parser.add_argument('--run', action='store_true', help="start real-time processing")
+    parser.add_argument('--test', action='store_true', help="parse the sample transaction and exit (default)")
+    parser.add_argument('--bench', metavar='DIR',
+                        help="benchmark on a corpus of *.wav clips, receipt images and *.txt transcripts")
+    parser.add_argument('--parse-only', action='store_true', help="benchmark only the text path on the transcripts")
+    parser.add_argument('--repeat', type=int, default=1, help="passes over the transcripts in parse-only mode")
+    parser.add_argument('--catalog', help="catalog DB to benchmark against (default: a fresh seeded copy)")
+    parser.add_argument('--output', help="also write the benchmark or load report to this file")
+    parser.add_argument('--role', choices=list(ROLES),
+                        help="capture capabilities to load (overrides EDGE_ROLE; default full)")
+    load = parser.add_argument_group('fleet load generation')
+    load.add_argument('--loadgen', action='store_true', help="simulate many devices posting to the hub")
+    load.add_argument('--target', help="hub base URL (default: a local stub hub)")
+    load.add_argument('--stores', type=int, default=10)
+    load.add_argument('--devices-per-store', type=int, default=2)
+    load.add_argument('--rate', type=float, default=20.0, help="transactions per second across the fleet")
+    load.add_argument('--duration', type=float, default=60.0, help="seconds")
+    load.add_argument('--outage', action='append', default=[], metavar='START:SECONDS',
+                      help="cut devices off the network for a window (repeatable)")
+    load.add_argument('--outage-fraction', type=float, default=1.0, help="share of devices hit by outages")
+    load.add_argument('--hub-error-rate', type=float, default=0.0, help="stub hub only: share of posts answered 503")
+    load.add_argument('--seed', type=int, default=0)
+    fusion = parser.add_argument_group('voice + receipt fusion')
+    fusion.add_argument('--fusion', action='store_true', help="run the fusion fixtures and windowing checks")
+    fusion.add_argument('--pairs', metavar='DIR', help="also fuse real <name>.wav + <name>.jpg/.png pairs")
+    fusion.add_argument('--fusion-window', type=float, default=6.0, help="seconds")
+    fanin = parser.add_argument_group('multi-source fan-in')
+    fanin.add_argument('--fanin', action='store_true',
+                       help="simulate several counters sharing the STT/OCR engines and report per-source latency")
+    fanin.add_argument('--fanin-duration', type=float, default=20.0, help="seconds per run")
+    fanin.add_argument('--stt-ms', type=float, default=400.0, help="simulated STT time per clip")
+    fanin.add_argument('--ocr-ms', type=float, default=120.0, help="simulated OCR time per frame")
+    fanin.add_argument('--no-fifo', action='store_true', help="skip the single-FIFO comparison run")
+    args = parser.parse_args()
+    if args.role:
+        os.environ['EDGE_ROLE'] = args.role
+    
+    if args.bench or args.loadgen or args.fusion or args.fanin:
+        logging.getLogger().setLevel(logging.WARNING)
+        if args.fanin:
+            from fanin_harness import run_fanin_harness
+            
+            report = run_fanin_harness(RaspberryPiProcessor, duration=args.fanin_duration, stt_ms=args.stt_ms,
+                                       ocr_ms=args.ocr_ms, compare_fifo=not args.no_fifo, seed=args.seed)
+        elif args.fusion:
+            from fusion_harness import run_fusion_harness
+            
+            report = run_fusion_harness(RaspberryPiProcessor, pairs_dir=args.pairs, window=args.fusion_window)
+        elif args.bench:
+            from edge_bench import run_benchmark
+            
+            report = run_benchmark(RaspberryPiProcessor, args.bench, parse_only=args.parse_only,
+                                   repeat=args.repeat, catalog_db=args.catalog)
+        else:
+            from load_generator import parse_outage, run_load
+            
+            report = run_load(
+                RaspberryPiProcessor, target=args.target, hub_error_rate=args.hub_error_rate,
+                stores=args.stores, devices_per_store=args.devices_per_store, rate=args.rate,
+                duration=args.duration, outages=[parse_outage(spec) for spec in args.outage],
+                outage_fraction=args.outage_fraction, seed=args.seed
+            )
+        text = dumps(report, pretty=True).decode('utf-8')
+        if args.output:
+            with open(args.output, 'w') as f:
+                f.write(text)
+        print(text)
+        if args.fusion and report['fixtures']['failures']:
+            raise SystemExit(1)
+        if args.fanin and not all(report['checks'].values()):
+            raise SystemExit(1)
+        return
+    
     processor = RaspberryPiProcessor()
+    if args.run:
+        processor.start_processing()
+        return
     
     # Example usage - simulate a transaction
     print("=== RASPBERRY PI TRANSACTION PROCESSOR ===")
@@ -607,15 +1155,13 @@ def main():
     
     # Simulate voice input
     sample_transcription = "Dalawang Coke 1.5 litro, tatlong Lucky Me pancit canton, isang kilo bigas, sampung itlog"
+    start = time.perf_counter()
     items = processor.parse_filipino_transaction(sample_transcription)
     
     if items:
-        json_output = processor.generate_transaction_json(items, 0.8)
+        json_output = processor.generate_transaction_json(items, time.perf_counter() - start)
         print("\n=== JSON OUTPUT ===")
-        print(json.dumps(json_output, indent=2, default=str))
-    
-    # Start real-time processing
-    # processor.start_processing()
+        print(dumps(json_output, pretty=True).decode('utf-8'))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
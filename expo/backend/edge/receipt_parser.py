@@ -0,0 +1,310 @@
+"""
+Structured receipt parsing
+Reads recognized receipt lines as columns instead of splitting text on
+whitespace. Each line's words carry boxes (from Tesseract, or estimated
+from character positions for monospaced text); amounts, quantities and
+names are told apart by what they look like and where they sit:
+
+    COKE 1.5L            x2     130.00     name, quantity, line total
+    LUCKY ME CANTON                        name only ...
+       3 @ 15.00                45.00      ... quantity and prices below it
+    ITLOG          2    8.00    16.00      quantity column, unit price, total
+    RICE 25KG            ₱1,250.00 V       peso sign, thousands, tax flag
+
+The rightmost amount on a line is its total and amounts before it (or
+after "@") are unit prices. The right edge shared by line totals is the
+price column; a line with no name whose total sits in it continues the
+item above. Bare numbers stacked in a column after the names are
+quantities, while numbers inside a name ("25KG", "555 SARDINES") stay part
+of it. Everything after TOTAL (cash, change) is ignored, and the item sum
+is checked against SUBTOTAL/TOTAL.
+"""
+
+import re
+from dataclasses import dataclass, field
+from statistics import median
+from typing import List, Optional, Tuple
+
+from ocr_types import OCRLine, OCRWord
+
+# Amounts: optional peso sign, thousands separators, two decimals
+_MONEY = re.compile(r'^(?:₱|P|PHP)?(\d{1,3}(?:,\d{3})+|\d+)\.(\d{2})-?$')
+_WHOLE_MONEY = re.compile(r'^(?:₱|PHP)(\d{1,3}(?:,\d{3})+|\d+)$')
+_INT = re.compile(r'^\d{1,3}$')
+_TIMES = re.compile(r'^(?:[xX*](\d{1,3})|(\d{1,3})[xX*]|[xX*@])$')
+# Single-letter VAT/exempt flags printed after the amount
+_FLAGS = {'V', 'X', 'T', 'E', 'Z', 'N', '*'}
+_PESO = {'₱', 'P', 'PHP'}
+# Digits OCR reads as letters inside amounts
+_DIGIT_FIXES = str.maketrans({'O': '0', 'o': '0', 'D': '0', 'l': '1', 'I': '1', '|': '1', 'S': '5', 'B': '8'})
+
+SUBTOTAL = 'subtotal'
+TOTAL = 'total'
+DISCOUNT = 'discount'
+PAYMENT = 'payment'
+# Keyword -> summary kind, matched on a line's letters
+_SUMMARY = [
+    (re.compile(r'^SUB ?-?TOTAL'), SUBTOTAL),
+    (re.compile(r'^(?:GRAND |AMOUNT |TOTAL )?(?:TOTAL|DUE)\b(?! ?(?:QTY|ITEMS?))'), TOTAL),
+    (re.compile(r'^(?:LESS|DISC(?:OUNT)?|SC ?DISC|PWD)\b'), DISCOUNT),
+    (re.compile(r'^(?:CASH|CHANGE|SUKLI|TENDERED|GCASH|CARD|VAT|VATABLE|VAT-?EXEMPT|TAX|TOTAL ?(?:QTY|ITEMS?))'), PAYMENT),
+]
+
+# Item sum vs. printed subtotal/total, in pesos
+TOTAL_TOLERANCE = 0.05
+# Confidence factors for items on receipts whose sum does / does not match
+BALANCED_BOOST = 0.5  # halves the remaining doubt
+UNBALANCED_PENALTY = 0.8
+
+
+@dataclass
+class ReceiptItem:
+    name: str
+    quantity: float
+    unit_price: float
+    total: float
+    confidence: float
+    line: int  # index of the line holding the name
+    notes: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ReceiptParse:
+    items: List[ReceiptItem]
+    items_sum: float
+    subtotal: Optional[float] = None
+    discount: Optional[float] = None
+    total: Optional[float] = None
+
+    @property
+    def expected(self) -> Optional[float]:
+        """What the items should add up to, from the printed summary"""
+        if self.subtotal is not None:
+            return self.subtotal
+        if self.total is not None:
+            return self.total + (self.discount or 0.0)
+        return None
+
+    @property
+    def balanced(self) -> Optional[bool]:
+        """True/False when the receipt prints a total to check against, else None"""
+        expected = self.expected
+        return None if expected is None else abs(self.items_sum - expected) <= TOTAL_TOLERANCE
+
+
+def money(text: str) -> Optional[float]:
+    """An amount token ("130.00", "₱1,250.00", "2O.00") as a float"""
+    if not any(c.isdigit() for c in text):
+        return None
+    match = _MONEY.match(text) or _MONEY.match(text.translate(_DIGIT_FIXES))
+    if match:
+        return float(match.group(1).replace(',', '') + '.' + match.group(2))
+    match = _WHOLE_MONEY.match(text)
+    return float(match.group(1).replace(',', '')) if match else None
+
+
+def line_words(line: OCRLine) -> List[OCRWord]:
+    """The engine's word boxes, or boxes estimated from character positions"""
+    if line.words:
+        return line.words
+    x, y, _, h = line.box
+    # Thermal receipts print monospaced, about half as wide as tall
+    char_w = max(1.0, h * 0.5)
+    return [OCRWord(m.group(), line.confidence, (int(x + m.start() * char_w), y, int(len(m.group()) * char_w), h))
+            for m in re.finditer(r'\S+', line.text)]
+
+
+def _char_width(words: List[OCRWord]) -> float:
+    return median(w.box[2] / max(1, len(w.text)) for w in words)
+
+
+def _right(word: OCRWord) -> int:
+    return word.box[0] + word.box[2]
+
+
+def _center(word: OCRWord) -> float:
+    return word.box[0] + word.box[2] / 2
+
+
+def summary_kind(words: List[OCRWord]) -> Optional[str]:
+    letters = ' '.join(w.text for w in words if not any(c.isdigit() for c in w.text)).upper()
+    for pattern, kind in _SUMMARY:
+        if pattern.match(letters):
+            return kind
+    return None
+
+
+@dataclass
+class _Line:
+    index: int
+    words: List[OCRWord]
+    confidence: float
+    kind: Optional[str]
+    amounts: List[Tuple[OCRWord, float]]
+
+
+def _prepare(lines: List[OCRLine]) -> List[_Line]:
+    prepared = []
+    for index, line in enumerate(lines):
+        words = [w for w in line_words(line) if w.text not in _PESO]
+        # Drop tax flags trailing the last amount
+        while len(words) > 1 and words[-1].text.upper() in _FLAGS and money(words[-2].text) is not None:
+            words.pop()
+        if not words:
+            continue
+        amounts = [(w, value) for w, value in ((w, money(w.text)) for w in words) if value is not None]
+        prepared.append(_Line(index, words, line.confidence, summary_kind(words), amounts))
+    return prepared
+
+
+def _column(values: List[float]) -> Optional[float]:
+    return median(values) if values else None
+
+
+def _quantity_column(lines: List[_Line], tolerance: float) -> Optional[float]:
+    """x-centre shared by bare integers after the name on two or more lines"""
+    centers = sorted(_center(w) for line in lines for w in line.words[1:]
+                     if _INT.match(w.text) and money(w.text) is None)
+    best, best_count = None, 1
+    for i, center in enumerate(centers):
+        count = sum(1 for other in centers[i:] if other - center <= tolerance)
+        if count > best_count:
+            best, best_count = center, count
+    return best
+
+
+class _Fields:
+    """Name words, quantity and amounts read off one item line"""
+
+    def __init__(self, line: _Line, qty_col: Optional[float], tolerance: float):
+        self.name: List[str] = []
+        self.quantity: Optional[float] = None
+        self.unit_price: Optional[float] = None
+        self.total: Optional[float] = None
+        amounts = {id(w): value for w, value in line.amounts}
+        last = line.amounts[-1][0] if line.amounts else None
+        words = line.words
+        after_at = False
+        for position, word in enumerate(words):
+            text = word.text
+            value = amounts.get(id(word))
+            if value is not None:
+                # The rightmost amount is the line total; "@ 65.00" and
+                # amounts left of the total are unit prices
+                if word is last and not after_at:
+                    self.total = value
+                else:
+                    self.unit_price = value
+                after_at = False
+                continue
+            times = _TIMES.match(text)
+            if times:
+                count = times.group(1) or times.group(2)
+                if count:
+                    self.quantity = float(count)
+                after_at = text == '@'
+                continue
+            if self.quantity is None and _INT.match(text) and self._is_quantity(position, words, amounts, qty_col,
+                                                                               tolerance):
+                self.quantity = float(text)
+                continue
+            self.name.append(text)
+
+    def _is_quantity(self, position: int, words: List[OCRWord], amounts, qty_col: Optional[float],
+                     tolerance: float) -> bool:
+        word = words[position]
+        if qty_col is not None and abs(_center(word) - qty_col) <= tolerance:
+            return True
+        if position == 0:
+            # "2 COKE"; three digits up front are more likely a name ("555 SARDINES")
+            return len(word.text) <= 2 or len(words) == 1
+        following = words[position + 1] if position + 1 < len(words) else None
+        return bool(self.name) and following is not None and (
+            id(following) in amounts or _TIMES.match(following.text) is not None)
+
+
+def _close(fields: _Fields, line: _Line, notes: List[str]) -> Optional[ReceiptItem]:
+    """An item once its line total (or quantity x unit price) is known"""
+    quantity, unit_price, total = fields.quantity, fields.unit_price, fields.total
+    if total is None and unit_price is None:
+        return None
+    if total is None:
+        total = round(unit_price * (quantity or 1), 2)
+    if quantity is None:
+        quantity = round(total / unit_price) if unit_price else 1.0
+        quantity = quantity or 1.0
+    if unit_price is None:
+        unit_price = round(total / quantity, 2)
+    elif abs(unit_price * quantity - total) > TOTAL_TOLERANCE:
+        notes.append(f"line: {quantity:g} x {unit_price:.2f} != {total:.2f}")
+    return ReceiptItem(' '.join(fields.name), quantity, unit_price, total, round(line.confidence, 3), line.index,
+                       notes)
+
+
+def parse_receipt(lines: List[OCRLine]) -> ReceiptParse:
+    """Items, summary amounts and the totals check for one receipt"""
+    prepared = _prepare(lines)
+    if not prepared:
+        return ReceiptParse([], 0.0)
+
+    char_w = _char_width([w for line in prepared for w in line.words])
+    tolerance = max(3 * char_w, 4.0)
+    body = []
+    for line in prepared:
+        if line.kind == TOTAL:
+            break
+        if line.kind is None:
+            body.append(line)
+    price_col = _column([_right(line.amounts[-1][0]) for line in body if line.amounts])
+    qty_col = _quantity_column(body, tolerance)
+
+    result = ReceiptParse([], 0.0)
+    pending: Optional[Tuple[_Fields, _Line]] = None
+    for line in prepared:
+        if line.kind is not None:
+            pending = None
+            value = line.amounts[-1][1] if line.amounts else None
+            if line.kind == SUBTOTAL and value is not None:
+                result.subtotal = value
+            elif line.kind == DISCOUNT and value is not None:
+                result.discount = (result.discount or 0.0) + value
+            elif line.kind == TOTAL:
+                if value is not None:
+                    result.total = value
+                break
+            continue
+
+        fields = _Fields(line, qty_col, tolerance)
+        if not fields.name:
+            # Quantity and prices printed under the name they belong to,
+            # ending in the price column
+            if pending is not None and (fields.total is None or price_col is None
+                                        or abs(_right(line.amounts[-1][0]) - price_col) <= tolerance):
+                above, name_line = pending
+                above.quantity = fields.quantity or above.quantity
+                above.unit_price = fields.unit_price if fields.unit_price is not None else above.unit_price
+                above.total = fields.total if fields.total is not None else above.total
+                item = _close(above, name_line, ['price on next line'])
+                if item is not None:
+                    result.items.append(item)
+                    pending = None
+            continue
+
+        item = _close(fields, line, [])
+        if item is not None:
+            result.items.append(item)
+            pending = None
+        else:
+            # A name with no amount yet: the next line may carry it
+            pending = (fields, line)
+
+    result.items_sum = round(sum(item.total for item in result.items), 2)
+    balanced = result.balanced
+    if balanced is not None:
+        for item in result.items:
+            if balanced:
+                item.confidence = round(item.confidence + (1.0 - item.confidence) * BALANCED_BOOST, 3)
+            else:
+                item.confidence = round(item.confidence * UNBALANCED_PENALTY, 3)
+                item.notes.append(f"receipt total {result.expected:.2f}, items {result.items_sum:.2f}")
+    return result
@@ -0,0 +1,160 @@
+"""
+Speech-to-text backends for the edge processor
+openai-whisper (PyTorch), faster-whisper (CTranslate2, int8 by default) and
+whisper.cpp (pywhispercpp) behind one interface, selected by config and
+loaded lazily on first use
+"""
+
+import io
+import logging
+import threading
+import time
+import wave
+from typing import Dict, Optional, Type, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+# Whisper has no 'fil' code; Filipino is transcribed as Tagalog
+LANGUAGE_ALIASES = {'fil': 'tl'}
+
+AudioInput = Union[str, bytes, np.ndarray]
+
+
+def to_float32(audio: AudioInput) -> Union[str, np.ndarray]:
+    """Normalise WAV bytes / raw PCM16 bytes to float32 samples; paths pass through"""
+    if isinstance(audio, (str, np.ndarray)):
+        return audio
+    if audio[:4] == b'RIFF':
+        with wave.open(io.BytesIO(audio), 'rb') as wav:
+            if wav.getframerate() != SAMPLE_RATE or wav.getsampwidth() != 2:
+                raise ValueError("expected 16 kHz 16-bit WAV audio")
+            pcm = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+            if wav.getnchannels() > 1:
+                pcm = pcm.reshape(-1, wav.getnchannels()).mean(axis=1).astype(np.int16)
+    else:
+        pcm = np.frombuffer(audio, dtype=np.int16)
+    return pcm.astype(np.float32) / 32768.0
+
+
+class STTBackend:
+    """Base class; subclasses implement _load and _transcribe"""
+
+    name = 'base'
+
+    def __init__(self, model: str = 'base', threads: int = 0, **options):
+        self.model_name = model
+        self.threads = threads
+        self.options = options
+        self.model = None
+
+    def load(self):
+        self.model = self._load()
+
+    def transcribe(self, audio: AudioInput, language: str = 'fil') -> str:
+        return self._transcribe(to_float32(audio), LANGUAGE_ALIASES.get(language, language)).strip()
+
+    def _load(self):
+        raise NotImplementedError
+
+    def _transcribe(self, audio, language: str) -> str:
+        raise NotImplementedError
+
+
+class OpenAIWhisperBackend(STTBackend):
+    """Reference PyTorch implementation (full precision on CPU)"""
+
+    name = 'openai-whisper'
+
+    def _load(self):
+        import whisper
+
+        if self.threads:
+            import torch
+            torch.set_num_threads(self.threads)
+        return whisper.load_model(self.model_name)
+
+    def _transcribe(self, audio, language: str) -> str:
+        return self.model.transcribe(audio, language=language, fp16=False)['text']
+
+
+class FasterWhisperBackend(STTBackend):
+    """CTranslate2 implementation with int8 quantized weights"""
+
+    name = 'faster-whisper'
+
+    def _load(self):
+        from faster_whisper import WhisperModel
+
+        return WhisperModel(
+            self.model_name, device='cpu',
+            compute_type=self.options.get('compute_type', 'int8'),
+            cpu_threads=self.threads
+        )
+
+    def _transcribe(self, audio, language: str) -> str:
+        segments, _ = self.model.transcribe(audio, language=language, beam_size=1, vad_filter=False)
+        return ''.join(segment.text for segment in segments)
+
+
+class WhisperCppBackend(STTBackend):
+    """whisper.cpp through the pywhispercpp bindings (quantized ggml models)"""
+
+    name = 'whisper-cpp'
+
+    def _load(self):
+        from pywhispercpp.model import Model
+
+        kwargs = {'n_threads': self.threads} if self.threads else {}
+        return Model(self.options.get('model_path') or self.model_name, **kwargs)
+
+    def _transcribe(self, audio, language: str) -> str:
+        segments = self.model.transcribe(audio, language=language)
+        return ''.join(segment.text for segment in segments)
+
+
+BACKENDS: Dict[str, Type[STTBackend]] = {
+    backend.name: backend
+    for backend in (OpenAIWhisperBackend, FasterWhisperBackend, WhisperCppBackend)
+}
+
+
+def create_backend(name: str, **options) -> STTBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown STT backend '{name}' (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name](**options)
+
+
+class LazySTT:
+    """Loads the backend on first transcription; one warm model shared by all callers"""
+
+    def __init__(self, backend: STTBackend):
+        self.backend = backend
+        self.load_time: Optional[float] = None
+        self._lock = threading.Lock()
+        self._transcribe_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.load_time is not None
+
+    def warm(self) -> 'LazySTT':
+        """Load now (e.g. before forking CPU workers so they share the pages)"""
+        if not self.loaded:
+            with self._lock:
+                if not self.loaded:
+                    start = time.perf_counter()
+                    self.backend.load()
+                    self.load_time = time.perf_counter() - start
+                    logger.info(f"Loaded {self.backend.name} model '{self.backend.model_name}' "
+                                f"in {self.load_time:.2f}s")
+        return self
+
+    def transcribe(self, audio: AudioInput, language: str = 'fil') -> str:
+        self.warm()
+        # Backends use all cores per call; serialising avoids thrashing
+        with self._transcribe_lock:
+            return self.backend.transcribe(audio, language)
@@ -0,0 +1,38 @@
+"""
+Shared fixtures for the edge tests
+The edge modules import each other as top-level modules, so the edge
+directory goes on sys.path. The processor is loaded from its hyphenated
+file in the parse role, with storage in a temporary directory.
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+EDGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, EDGE_DIR)
+
+
+@pytest.fixture(scope='session')
+def processor(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp('edge')
+    env = {
+        'EDGE_ROLE': 'parse', 'METRICS_PORT': '0', 'AUDIO_SOURCE': '', 'CAMERA_SOURCE': '', 'INPUT_SOURCES': '',
+        'CATALOG_CONFIG': '', 'CATALOG_SYNC_INTERVAL': '0',
+        'OFFLINE_DIR': str(workdir / 'offline'), 'CATALOG_DB': str(workdir / 'catalog.db'),
+    }
+    saved = {key: os.environ.get(key) for key in env}
+    os.environ.update(env)
+    spec = importlib.util.spec_from_file_location('edge_processor', os.path.join(EDGE_DIR, 'raspberry-pi-processor.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    instance = module.RaspberryPiProcessor()
+    yield instance
+    instance.stop_processing()
+    for key, value in saved.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
@@ -0,0 +1,53 @@
+import pytest
+
+from catalog_store import ProductCatalog
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = ProductCatalog(str(tmp_path / 'catalog.db'), store_id='SM-001')
+    yield catalog
+    catalog.close()
+
+
+def product(sku, name, **fields):
+    return dict(sku=sku, name=name, category='beverage', unit='pc', unitPrice=10.0, **fields)
+
+
+def test_sync_pages_with_the_hub_cursor(catalog):
+    pages = {
+        None: {'products': [product('A', 'Coke')], 'cursor': 'c1', 'hasMore': True},
+        'c1': {'products': [product('B', 'Sprite')], 'cursor': 'c2', 'hasMore': False},
+    }
+    asked = []
+
+    def fetch(cursor):
+        asked.append(cursor)
+        return pages[cursor]
+
+    assert catalog.sync(fetch) == 2
+    assert asked == [None, 'c1']
+    assert catalog.sync_cursor() == 'c2'
+    assert catalog.find('sprite')[0]['sku'] == 'B'
+
+
+def test_deactivation_counts_as_a_change(catalog):
+    catalog.upsert_products([product('A', 'Coke')])
+    changes = catalog.sync(lambda cursor: {'products': [{'sku': 'A', 'active': False}], 'cursor': 'c1'})
+    assert changes == 1
+    assert catalog.get('A') is None
+    assert catalog.find('coke') == []
+
+
+def test_store_price_changes_count(catalog):
+    catalog.upsert_products([product('A', 'Coke')])
+    delta = {'storePrices': [{'sku': 'A', 'unit': 'pc', 'price': 12.5}], 'cursor': 'c1'}
+    assert catalog.sync(lambda cursor: delta) == 1
+    assert catalog.price('A', 'pc') == 12.5
+    removal = {'storePrices': [{'sku': 'A', 'unit': 'pc', 'price': None}], 'cursor': 'c2'}
+    assert catalog.sync(lambda cursor: removal) == 1
+    assert catalog.price('A', 'pc') == 10.0
+
+
+def test_empty_delta_is_no_change(catalog):
+    assert catalog.sync(lambda cursor: {'products': [], 'storePrices': [], 'cursor': None}) == 0
@@ -0,0 +1,99 @@
+import json
+import queue
+
+import pytest
+
+from fanin import FairScheduler, InputSource, read_sources
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def serve(scheduler, count, cost=1.0):
+    """Dispatch count items, charging each its cost; returns the sources served"""
+    served = []
+    for _ in range(count):
+        item = scheduler.get(timeout=0)
+        scheduler.done(item, cost)
+        served.append(item.source)
+    return served
+
+
+def test_busy_source_cannot_starve_a_quiet_one():
+    scheduler = FairScheduler('image', capacity=100)
+    scheduler.add_source('busy')
+    scheduler.add_source('quiet')
+    for i in range(50):
+        scheduler.submit('busy', i)
+    scheduler.submit('quiet', 0)
+    assert 'quiet' in serve(scheduler, 3)
+
+
+def test_priority_weights_engine_time():
+    scheduler = FairScheduler('audio', capacity=100)
+    scheduler.add_source('express', priority=2.0)
+    scheduler.add_source('counter', priority=1.0)
+    for i in range(60):
+        scheduler.submit('express', i)
+        scheduler.submit('counter', i)
+    served = serve(scheduler, 60)
+    assert 35 <= served.count('express') <= 45
+
+
+def test_full_lane_drops_its_oldest_frame():
+    scheduler = FairScheduler('image', capacity=2)
+    scheduler.add_source('cam', drop_oldest=True)
+    for frame in range(3):
+        scheduler.submit('cam', frame)
+    assert [scheduler.get(timeout=0).payload for _ in range(2)] == [1, 2]
+    assert scheduler.stats()['cam']['shed']['overflow'] == 1
+
+
+def test_full_lane_without_drop_refuses_new_work():
+    scheduler = FairScheduler('audio', capacity=1)
+    scheduler.add_source('mic')
+    scheduler.submit('mic', 0)
+    with pytest.raises(queue.Full):
+        scheduler.submit('mic', 1, block=False)
+
+
+def test_stale_work_is_skipped_at_dispatch():
+    clock = Clock()
+    scheduler = FairScheduler('image', clock=clock)
+    scheduler.add_source('cam', max_age=1.0)
+    scheduler.submit('cam', 'old')
+    clock.now = 2.0
+    scheduler.submit('cam', 'new')
+    assert scheduler.get(timeout=0).payload == 'new'
+    assert scheduler.stats()['cam']['shed']['stale'] == 1
+
+
+def test_stop_sentinel_waits_for_queued_work():
+    scheduler = FairScheduler('audio')
+    scheduler.add_source('mic')
+    stop = object()
+    scheduler.submit('mic', 'clip')
+    scheduler.put(stop)
+    assert scheduler.get(timeout=0).payload == 'clip'
+    assert scheduler.get(timeout=0) is stop
+
+
+def test_read_sources(tmp_path):
+    default = InputSource('default', 'RPI-001')
+    assert read_sources('', default) == [default]
+
+    path = tmp_path / 'sources.json'
+    path.write_text(json.dumps([{'name': 'a', 'audio': 'mic:1'}, {'name': 'b', 'deviceId': 'RPI-B', 'priority': 2}]))
+    sources = read_sources(str(path), default)
+    assert [(s.name, s.device_id, s.audio, s.priority) for s in sources] == [
+        ('a', 'RPI-001-a', 'mic:1', 1.0), ('b', 'RPI-B', '', 2.0),
+    ]
+
+    path.write_text(json.dumps([{'name': 'a'}, {'name': 'a'}]))
+    with pytest.raises(ValueError):
+        read_sources(str(path), default)
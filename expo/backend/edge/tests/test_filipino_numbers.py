@@ -0,0 +1,43 @@
+import pytest
+
+from filipino_numbers import read_quantities, split_transaction
+
+
+@pytest.mark.parametrize('text, value, each, peso', [
+    ("dalawampu't limang", 25, False, False),
+    ('tatlong daan at limampu', 350, False, False),
+    ('labing-isa', 11, False, False),
+    ('labindalawa', 12, False, False),
+    ('kalahating kilo', 0.5, False, False),
+    ("isa't kalahati", 1.5, False, False),
+    ('tig-dalawa', 2, True, False),
+    ('bente singko pesos', 25, False, True),
+    ('₱25', 25, False, True),
+    ("kwarenta'y singko", 45, False, False),
+    ('1.5 litro', 1.5, False, False),
+])
+def test_docstring_examples(text, value, each, peso):
+    quantities = read_quantities(text)
+    assert len(quantities) == 1
+    assert quantities[0].value == value
+    assert quantities[0].each is each
+    assert quantities[0].peso is peso
+
+
+def test_split_on_punctuation_and_joiners():
+    segments = split_transaction("Dalawang Coke 1.5 litro, tatlong Lucky Me pancit canton at isang kilo bigas")
+    assert [s.text for s in segments] == ['Dalawang Coke 1.5 litro', 'tatlong Lucky Me pancit canton',
+                                          'isang kilo bigas']
+    assert [[q.value for q in s.quantities] for s in segments] == [[2, 1.5], [3], [1]]
+
+
+def test_joiner_inside_number_does_not_split():
+    segments = split_transaction('isang daan at lima na asukal')
+    assert len(segments) == 1
+    assert [q.value for q in segments[0].quantities] == [105]
+
+
+def test_quantity_offsets_are_relative_to_segment():
+    segment = split_transaction('isang coke, dalawang sprite')[1]
+    quantity = segment.quantities[0]
+    assert segment.text[quantity.start:quantity.end] == 'dalawang'
@@ -0,0 +1,50 @@
+import pytest
+
+from fusion import IMAGE, VOICE, TransactionFuser
+from fusion_harness import FIXTURES, SimulatedClock, receipt_lines, run_fixture
+
+WINDOW = 6.0
+
+
+@pytest.mark.parametrize('fixture', FIXTURES, ids=[fixture[0] for fixture in FIXTURES])
+def test_harness_fixture(processor, fixture):
+    assert run_fixture(processor, fixture, WINDOW) is None
+
+
+def fuser_with_output():
+    clock = SimulatedClock()
+    emitted = []
+    fuser = TransactionFuser(lambda device, result: emitted.append((device, result)), window=WINDOW, clock=clock)
+    return fuser, clock, emitted
+
+
+def test_unrelated_results_are_not_merged(processor):
+    fuser, clock, emitted = fuser_with_output()
+    fuser.add('D1', VOICE, processor.parse_filipino_transaction('isang gatas'), 0.0)
+    clock.now = 1.0
+    fuser.add('D1', IMAGE, processor.parse_receipt_text(receipt_lines(['1 TINAPAY 20.00']), []), 0.0)
+    assert emitted == []
+    fuser.flush()
+    assert [result.sources for _, result in emitted] == [(VOICE,), (IMAGE,)]
+
+
+def test_receipt_pairs_with_the_matching_sale_not_the_oldest(processor):
+    fuser, clock, emitted = fuser_with_output()
+    fuser.add('D1', VOICE, processor.parse_filipino_transaction('isang gatas'), 0.0)
+    clock.now = 1.0
+    fuser.add('D1', VOICE, processor.parse_filipino_transaction('dalawang coke'), 0.0)
+    clock.now = 2.0
+    fuser.add('D1', IMAGE, processor.parse_receipt_text(receipt_lines(['2 COKE 1.5L 130.00']), []), 0.0)
+    assert len(emitted) == 1
+    result = emitted[0][1]
+    assert result.sources == (VOICE, IMAGE)
+    assert result.matched == 1
+    assert [item.detectionMethod for item in result.items] == ['hybrid']
+
+
+def test_results_from_different_devices_never_pair(processor):
+    fuser, _, emitted = fuser_with_output()
+    fuser.add('D1', VOICE, processor.parse_filipino_transaction('dalawang coke'), 0.0)
+    fuser.add('D2', IMAGE, processor.parse_receipt_text(receipt_lines(['2 COKE 1.5L 130.00']), []), 0.0)
+    fuser.flush()
+    assert sorted((device, result.sources) for device, result in emitted) == [('D1', (VOICE,)), ('D2', (IMAGE,))]
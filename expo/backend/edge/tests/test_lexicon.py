@@ -0,0 +1,38 @@
+from lexicon import LexiconMatcher
+
+
+def matcher() -> LexiconMatcher:
+    m = LexiconMatcher()
+    m.add('coke', 'product', 'COKE')
+    m.add('lucky', 'product', 'LUCKY')
+    m.add('lucky me', 'product', 'LUCKY-ME')
+    m.add('litro', 'product', 'COKE-L')
+    m.add('litro', 'unit', 'L')
+    m.add('isa', 'number', 1)
+    return m.build()
+
+
+def terms(matches):
+    return [(m.term, m.entry.kind) for m in matches]
+
+
+def test_leftmost_longest():
+    assert terms(matcher().scan('lucky me pancit')) == [('lucky me', 'product')]
+
+
+def test_linker_suffix_extends_match():
+    match = matcher().scan('isang coke')[0]
+    assert (match.term, match.start, match.end) == ('isa', 0, 5)
+
+
+def test_word_boundaries():
+    assert matcher().scan('cokes decoke') == []
+
+
+def test_units_win_over_products_on_same_span():
+    assert terms(matcher().scan('litro')) == [('litro', 'unit')]
+
+
+def test_digits_are_numerals():
+    assert terms(matcher().scan('2 coke')) == [('2', 'numeral'), ('coke', 'product')]
+
@@ -0,0 +1,23 @@
+from metrics import MetricsRegistry, capture_metrics
+
+
+def test_captured_counters_and_spans_replay_into_another_registry():
+    worker = MetricsRegistry()
+    with capture_metrics() as captured:
+        worker.inc('edge_errors_total', stage='image')
+        worker.inc('edge_errors_total', stage='image')
+        worker.record_stage('ocr', 0.2)
+
+    parent = MetricsRegistry()
+    parent.replay(captured)
+    summary = parent.summary()
+    assert summary['counters']['edge_errors_total{stage=image}'] == 2
+    assert summary['stages']['ocr']['count'] == 1
+
+
+def test_nothing_is_captured_outside_the_block():
+    registry = MetricsRegistry()
+    with capture_metrics() as captured:
+        pass
+    registry.inc('edge_errors_total', stage='voice')
+    assert captured.counters == [] and captured.spans == []
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+from offline_journal import OfflineJournal, ReplayWorker
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = OfflineJournal(str(tmp_path / 'journal.db'), max_attempts=3)
+    yield journal
+    journal.close()
+
+
+def fill(journal, count):
+    for i in range(count):
+        journal.append({'transactionId': f"TXN-{i:04d}"})
+    journal.flush()
+
+
+def drain(worker, limit=100):
+    for _ in range(limit):
+        if worker.replay_once() == (0, 0, 0):
+            return
+    raise AssertionError('replay did not finish')
+
+
+def test_replays_in_order_exactly_once(journal):
+    fill(journal, 120)
+    delivered = []
+
+    def deliver(batch):
+        delivered.extend(t['transactionId'] for t in batch)
+        return [], []
+
+    drain(ReplayWorker(journal, deliver, batch_size=50))
+    assert delivered == [f"TXN-{i:04d}" for i in range(120)]
+    assert journal.count() == 0
+
+
+def test_undelivered_records_keep_their_attempts(journal):
+    fill(journal, 5)
+    worker = ReplayWorker(journal, lambda batch: ([], batch))
+    for _ in range(10):
+        assert worker.replay_once() == (0, 0, 5)
+    assert journal.count() == 5
+    assert journal.dead_letter_count() == 0
+
+
+def test_rejected_record_is_dead_lettered_without_blocking_the_rest(journal):
+    fill(journal, 10)
+    delivered = []
+
+    def deliver(batch):
+        delivered.extend(t['transactionId'] for t in batch if t['transactionId'] != 'TXN-0000')
+        return [t for t in batch if t['transactionId'] == 'TXN-0000'], []
+
+    drain(ReplayWorker(journal, deliver, batch_size=4))
+    assert sorted(set(delivered)) == [f"TXN-{i:04d}" for i in range(1, 10)]
+    assert journal.count() == 0
+    assert journal.dead_letter_count() == 1
+
+
+def test_rejections_do_not_back_off(journal):
+    fill(journal, 100)
+    worker = ReplayWorker(journal, lambda batch: (batch[:1], []), batch_size=10, min_backoff=60)
+    worker.start()
+    try:
+        deadline = time.monotonic() + 5
+        while journal.count() and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        worker.stop(timeout=5)
+    assert journal.count() == 0
+
+
+def test_exhausted_records_from_older_versions_are_requeued(tmp_path):
+    path = str(tmp_path / 'journal.db')
+    journal = OfflineJournal(path, max_attempts=3)
+    fill(journal, 2)
+    journal._db.execute("UPDATE outbox SET attempts = 3")
+    journal.close()
+
+    reopened = OfflineJournal(path, max_attempts=3)
+    try:
+        assert len(reopened.read_batch(0, 10)) == 2
+    finally:
+        reopened.close()
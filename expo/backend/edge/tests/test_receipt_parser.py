@@ -0,0 +1,62 @@
+import pytest
+
+from ocr_types import OCRLine
+from receipt_parser import parse_receipt, money
+
+
+def lines(*texts):
+    """Monospaced receipt lines without engine word boxes"""
+    return [OCRLine(text, 0.9, (0, 24 * i, 12 * len(text), 20)) for i, text in enumerate(texts)]
+
+
+DOCSTRING_RECEIPT = (
+    'COKE 1.5L            x2     130.00',
+    'LUCKY ME CANTON',
+    '   3 @ 15.00                45.00',
+    'ITLOG          2    8.00    16.00',
+    'RICE 25KG            ₱1,250.00 V',
+    'TOTAL                     1,441.00',
+    'CASH                      1,500.00',
+    'CHANGE                       59.00',
+)
+
+
+def test_docstring_columns():
+    receipt = parse_receipt(lines(*DOCSTRING_RECEIPT))
+    assert [(i.name, i.quantity, i.unit_price, i.total) for i in receipt.items] == [
+        ('COKE 1.5L', 2, 65.0, 130.0),
+        ('LUCKY ME CANTON', 3, 15.0, 45.0),
+        ('ITLOG', 2, 8.0, 16.0),
+        ('RICE 25KG', 1, 1250.0, 1250.0),
+    ]
+    assert receipt.items[1].notes == ['price on next line']
+
+
+def test_totals_check_and_tender_lines_ignored():
+    receipt = parse_receipt(lines(*DOCSTRING_RECEIPT))
+    assert receipt.total == 1441.0
+    assert receipt.items_sum == 1441.0
+    assert receipt.balanced is True
+
+
+def test_unbalanced_receipt_lowers_confidence():
+    balanced = parse_receipt(lines('COKE        130.00', 'TOTAL       130.00'))
+    unbalanced = parse_receipt(lines('COKE        130.00', 'TOTAL       150.00'))
+    assert unbalanced.balanced is False
+    assert unbalanced.items[0].confidence < balanced.items[0].confidence
+
+
+def test_no_total_is_unchecked():
+    assert parse_receipt(lines('COKE        130.00')).balanced is None
+
+
+@pytest.mark.parametrize('text, value', [
+    ('130.00', 130.0),
+    ('₱1,250.00', 1250.0),
+    ('2O.00', 20.0),  # OCR read a zero as a letter
+    ('PHP45', 45.0),
+    ('25KG', None),
+    ('COKE', None),
+])
+def test_money(text, value):
+    assert money(text) == value
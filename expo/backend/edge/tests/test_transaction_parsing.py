@@ -0,0 +1,29 @@
+import pytest
+
+
+def items(processor, text):
+    return [(item.productName, item.quantity, item.unit) for item in processor.parse_filipino_transaction(text)]
+
+
+def test_sample_transcript(processor):
+    assert items(processor, 'Dalawang Coke 1.5 litro, tatlong Lucky Me pancit canton, isang kilo bigas, sampung itlog') == [
+        ('Coke', 2, 'L'), ('Pancit Canton', 3, 'pc'), ('Rice', 1, 'kg'), ('Eggs', 10, 'pc'),
+    ]
+
+
+@pytest.mark.parametrize('text, quantity', [
+    ('isang coke', 1),
+    ('labindalawang itlog', 12),
+    ("dalawampu't limang itlog", 25),
+    ('kalahating kilo bigas', 0.5),
+])
+def test_spoken_quantities(processor, text, quantity):
+    assert items(processor, text)[0][1] == quantity
+
+
+def test_receipt_text_to_items(processor):
+    from fusion_harness import receipt_lines
+
+    parsed = processor.parse_receipt_text(receipt_lines(['2 COKE 1.5L 130.00', '1 LUCKY ME CANTON 15.00',
+                                                         'TOTAL 145.00']), [])
+    assert [(item.quantity, item.totalPrice) for item in parsed] == [(2, 130.0), (1, 15.0)]
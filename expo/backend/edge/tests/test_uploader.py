@@ -0,0 +1,87 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+pytest.importorskip('requests')
+
+from uploader import BatchUploader  # noqa: E402
+
+BATCH = [{'transactionId': f"TXN-{i}"} for i in range(3)]
+
+
+@pytest.fixture
+def hub():
+    """Local hub answering every POST with the (status, body) set on it"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers['Content-Length']))
+            status, body = server.reply
+            self.send_response(status)
+            self.end_headers()
+            self.wfile.write(body.encode('utf-8'))
+
+        def log_message(self, format, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+    yield server
+    server.shutdown()
+
+
+def deliver(hub, status, body, batch=BATCH, batch_mode=True):
+    hub.reply = (status, body if isinstance(body, str) else json.dumps(body))
+    uploader = BatchUploader(f"http://127.0.0.1:{hub.server_port}", retries=0, batch_mode=batch_mode)
+    rejected, undelivered = uploader.deliver(batch)
+    return [t['transactionId'] for t in rejected], [t['transactionId'] for t in undelivered]
+
+
+def results(*outcomes):
+    return {'results': [dict(transactionId=f"TXN-{i}", **outcome) for i, outcome in enumerate(outcomes)]}
+
+
+def test_confirmed_batch(hub):
+    ok = {'success': True}
+    assert deliver(hub, 200, results(ok, ok, ok)) == ([], [])
+
+
+def test_html_200_is_undelivered(hub):
+    assert deliver(hub, 200, '<html>Sign in to Wi-Fi</html>') == ([], ['TXN-0', 'TXN-1', 'TXN-2'])
+
+
+def test_items_missing_from_results_are_undelivered(hub):
+    assert deliver(hub, 200, results({'success': True})) == ([], ['TXN-1', 'TXN-2'])
+
+
+def test_only_non_retryable_failures_are_rejections(hub):
+    body = results({'success': True}, {'success': False, 'retryable': False}, {'success': False, 'retryable': True})
+    assert deliver(hub, 207, body) == (['TXN-1'], ['TXN-2'])
+
+
+def test_failure_without_retryable_flag_is_undelivered(hub):
+    body = results({'success': True}, {'success': False}, {'success': True})
+    assert deliver(hub, 207, body) == ([], ['TXN-1'])
+
+
+@pytest.mark.parametrize('status, outcome', [
+    (400, (['TXN-0'], [])),
+    (422, (['TXN-0'], [])),
+    (429, ([], ['TXN-0'])),
+    (500, ([], ['TXN-0'])),
+    (503, ([], ['TXN-0'])),
+])
+def test_single_post_status(hub, status, outcome):
+    assert deliver(hub, status, {'error': 'x'}, BATCH[:1], batch_mode=False) == outcome
+
+
+def test_single_post_needs_confirmation(hub):
+    assert deliver(hub, 200, '<html></html>', BATCH[:1], batch_mode=False) == ([], ['TXN-0'])
+    assert deliver(hub, 200, {'success': True}, BATCH[:1], batch_mode=False) == ([], [])
+
+
+def test_unreachable_hub_is_undelivered():
+    uploader = BatchUploader('http://127.0.0.1:1', retries=0)
+    rejected, undelivered = uploader.deliver(BATCH)
+    assert rejected == [] and len(undelivered) == 3
@@ -0,0 +1,119 @@
+"""
+Transaction records and their wire format
+Slotted dataclasses for items and transactions, a shallow field-by-field
+conversion to dicts (instead of dataclasses.asdict's deep copy), and a
+schema-versioned encoder: compact JSON via orjson for the hub, with a
+msgpack framing for local storage. Both fall back to the standard library
+when the faster packages are not installed.
+"""
+
+import json
+import sys
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the device image
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the device image
+    msgpack = None
+
+# Bump when fields are added, removed or change meaning; the hub keys
+# validation on it and the offline journal keeps old payloads readable
+SCHEMA_VERSION = 1
+
+# Local payloads starting with this byte are msgpack; anything else is JSON
+MSGPACK_TAG = b'\x01'
+
+# slots=True needs Python 3.10; older Pi OS images get plain dataclasses
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
+class TransactionItem:
+    brandName: Optional[str]
+    productName: str
+    genericName: Optional[str]
+    localName: Optional[str]
+    sku: Optional[str]
+    quantity: float
+    unit: str
+    unitPrice: float
+    totalPrice: float
+    category: str
+    isUnbranded: bool
+    isBulk: bool
+    detectionMethod: str
+    confidence: float
+    brandConfidence: Optional[float] = None
+    suggestedBrands: Optional[List[str]] = None
+    notes: Optional[str] = None
+
+
+@dataclass(**_SLOTS)
+class TransactionOutput:
+    storeId: str
+    deviceId: str
+    timestamp: str
+    transactionId: str
+    items: List[TransactionItem]
+    totals: Dict[str, float]
+    insights: Dict[str, Any]
+    paymentMethod: str
+    processingTime: float
+    edgeVersion: str
+    schemaVersion: int = SCHEMA_VERSION
+    edgeMetrics: Optional[Dict[str, Any]] = None  # periodic stage summary, see metrics.py
+    edgeAggregates: Optional[Dict[str, Any]] = None  # periodic store counters, see aggregates.py
+
+
+ITEM_FIELDS = tuple(f.name for f in fields(TransactionItem))
+OUTPUT_FIELDS = tuple(f.name for f in fields(TransactionOutput))
+
+
+def item_to_dict(item: TransactionItem) -> Dict:
+    return {name: getattr(item, name) for name in ITEM_FIELDS}
+
+
+def to_dict(output: TransactionOutput) -> Dict:
+    """Shallow conversion; nested dicts and lists are shared, not copied"""
+    data = {name: getattr(output, name) for name in OUTPUT_FIELDS}
+    data['items'] = [item_to_dict(item) for item in output.items]
+    return data
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    """Compact UTF-8 JSON (indented when pretty) for the hub and logs"""
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        return orjson.dumps(obj, default=str, option=option)
+    if pretty:
+        return json.dumps(obj, indent=2, default=str, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), default=str, ensure_ascii=False).encode('utf-8')
+
+
+def loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def pack(obj: Any) -> bytes:
+    """Smallest available encoding for local storage"""
+    if msgpack is not None:
+        return MSGPACK_TAG + msgpack.packb(obj, default=str, use_bin_type=True)
+    return dumps(obj)
+
+
+def unpack(data: bytes) -> Any:
+    """Decode pack() output, including JSON written before msgpack was installed"""
+    data = bytes(data)
+    if data[:1] == MSGPACK_TAG:
+        if msgpack is None:
+            raise ValueError("msgpack payload but msgpack is not installed")
+        return msgpack.unpackb(data[1:], raw=False)
+    return loads(data)
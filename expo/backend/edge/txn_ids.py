@@ -0,0 +1,88 @@
+"""
+Time-ordered transaction IDs
+128-bit ULID-compatible identifiers rendered in Crockford base32:
+
+    48 bits  milliseconds since the Unix epoch (monotonic within a process)
+    20 bits  device key (hash of deviceId)
+    20 bits  per-process nonce (re-drawn after fork)
+    40 bits  per-process sequence
+
+IDs sort by creation time as plain strings, and generation is lock-free:
+the sequence comes from itertools.count, whose increment is atomic under
+the GIL, so concurrent threads always get distinct values.
+"""
+
+import itertools
+import os
+import secrets
+import time
+import weakref
+import zlib
+
+CROCKFORD = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+_DECODE = {ch: i for i, ch in enumerate(CROCKFORD)}
+
+
+def encode_base32(value: int, length: int = 26) -> str:
+    chars = []
+    for _ in range(length):
+        chars.append(CROCKFORD[value & 31])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+
+def decode_base32(text: str) -> int:
+    value = 0
+    for ch in text.upper():
+        value = (value << 5) | _DECODE[ch]
+    return value
+
+
+# Live generators, reseeded together in a forked child by one process-wide
+# hook rather than a hook per instance that would keep every one alive
+_generators: 'weakref.WeakSet[TransactionIdGenerator]' = weakref.WeakSet()
+
+
+def _reseed_after_fork():
+    for generator in list(_generators):
+        generator._reseed()
+
+
+# Forked CPU workers must not replay the parent's sequence
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reseed_after_fork)
+
+
+class TransactionIdGenerator:
+    """Sortable, collision-free IDs for one device"""
+
+    def __init__(self, device_id: str, prefix: str = 'TXN-'):
+        self.device_id = device_id
+        self.prefix = prefix
+        self._device_key = zlib.crc32(device_id.encode('utf-8')) & 0xFFFFF
+        self._reseed()
+        _generators.add(self)
+
+    def _reseed(self):
+        self._nonce = secrets.randbits(20)
+        self._counter = itertools.count(secrets.randbits(24))
+        # Anchor the wall clock once and advance it with the monotonic clock,
+        # so NTP steps cannot make IDs go backwards within a process
+        self._wall_anchor_ms = time.time_ns() // 1_000_000
+        self._mono_anchor_ns = time.monotonic_ns()
+
+    def now_ms(self) -> int:
+        return self._wall_anchor_ms + (time.monotonic_ns() - self._mono_anchor_ns) // 1_000_000
+
+    def new_id(self) -> str:
+        sequence = next(self._counter) & 0xFFFFFFFFFF
+        value = (self.now_ms() << 80) | (self._device_key << 60) | (self._nonce << 40) | sequence
+        return self.prefix + encode_base32(value)
+
+    def __call__(self) -> str:
+        return self.new_id()
+
+
+def id_timestamp_ms(transaction_id: str) -> int:
+    """Creation time encoded in an ID from TransactionIdGenerator"""
+    return decode_base32(transaction_id[-26:]) >> 80
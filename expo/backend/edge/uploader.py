@@ -0,0 +1,221 @@
+"""
+Pooled, batching uploader for the central API
+Reuses one keep-alive HTTP session and posts gzip-compressed batches to
+/api/transactions/batch, falling back to single posts when the hub has no
+bulk route or a batch request fails outright. requests is imported when the
+session is first needed, not at startup.
+"""
+
+import gzip
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from metrics import MetricsRegistry
+from transaction_format import SCHEMA_VERSION, dumps
+
+logger = logging.getLogger(__name__)
+
+# Gateway and overload responses worth retrying before giving up
+RETRY_STATUSES = (502, 503, 504)
+# Client errors that say "not now" rather than "not this transaction"
+TRANSIENT_STATUSES = (408, 429)
+
+
+def _json_body(response) -> Optional[Dict]:
+    """The response's JSON object, or None when the body is anything else"""
+    try:
+        body = response.json()
+    except ValueError:
+        return None
+    return body if isinstance(body, dict) else None
+
+
+def is_rejection(status: int) -> bool:
+    """Whether the hub refused the transaction itself (a 4xx), as opposed
+    to being unreachable, overloaded or failing on its side"""
+    return 400 <= status < 500 and status not in TRANSIENT_STATUSES
+
+
+class BatchUploader:
+    """Send transactions to the hub over a pooled session"""
+
+    def __init__(self, api_endpoint: str, timeout: float = 10, pool_size: int = 4,
+                 batch_mode: bool = True, compress: bool = True, compress_min_bytes: int = 1024,
+                 retries: int = 2, retry_backoff: float = 0.2,
+                 metrics: Optional[MetricsRegistry] = None):
+        self.api_endpoint = api_endpoint.rstrip('/')
+        self.timeout = timeout
+        self.batch_mode = batch_mode
+        self.compress = compress
+        self.compress_min_bytes = compress_min_bytes
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.pool_size = pool_size
+        self.metrics = metrics or MetricsRegistry()
+        self.bytes_sent = 0
+        self.requests_sent = 0
+        self._lock = threading.Lock()
+        self._session = None
+
+    @property
+    def session(self):
+        """The pooled session, created on first use"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    session.headers.update({
+                        'Content-Type': 'application/json',
+                        'X-Edge-Schema-Version': str(SCHEMA_VERSION),
+                    })
+                    self._session = session
+        return self._session
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+    def _post(self, path: str, payload, idempotency_key: Optional[str] = None):
+        import requests
+
+        headers = {}
+        if idempotency_key:
+            headers['Idempotency-Key'] = idempotency_key
+        with self.metrics.timer('serialize'):
+            body = dumps(payload)
+            if self.compress and len(body) >= self.compress_min_bytes:
+                body = gzip.compress(body, compresslevel=6)
+                headers['Content-Encoding'] = 'gzip'
+
+        # Transaction IDs make deliveries idempotent on the hub, so transient
+        # failures are retried here before the caller falls back or journals
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.metrics.inc('edge_upload_retries_total')
+            start = time.perf_counter()
+            status = 'error'
+            try:
+                response = self.session.post(
+                    f"{self.api_endpoint}{path}", data=body, headers=headers, timeout=self.timeout
+                )
+                status = str(response.status_code)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    break
+            finally:
+                self.metrics.record_stage('upload', time.perf_counter() - start)
+                self.metrics.inc('edge_upload_requests_total', status=status)
+                with self._lock:
+                    self.bytes_sent += len(body)
+                    self.requests_sent += 1
+            time.sleep(self.retry_backoff * (2 ** attempt))
+        return response
+
+    def send_one(self, transaction_data: Dict) -> bool:
+        """POST a single transaction to /api/transactions"""
+        return self._deliver_one(transaction_data) is True
+
+    def _deliver_one(self, transaction_data: Dict) -> Optional[bool]:
+        """True if accepted, False if rejected, None if it never got a verdict"""
+        try:
+            response = self._post('/api/transactions', transaction_data,
+                                  idempotency_key=transaction_data['transactionId'])
+            if response.status_code == 200:
+                body = _json_body(response)
+                if body is None or body.get('success') is not True:
+                    # Not the hub's answer (a captive portal or proxy page)
+                    logger.error(f"Unconfirmed 200 for {transaction_data['transactionId']}; will retry")
+                    return None
+                logger.info(f"Transaction sent successfully: {transaction_data['transactionId']}")
+                return True
+            logger.error(f"API error: {response.status_code}")
+            return False if is_rejection(response.status_code) else None
+        except Exception as e:
+            logger.error(f"Failed to send transaction: {e}")
+            return None
+
+    def _deliver_singles(self, transactions: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        rejected, undelivered = [], []
+        for t in transactions:
+            outcome = self._deliver_one(t)
+            if outcome is False:
+                rejected.append(t)
+            elif outcome is None:
+                undelivered.append(t)
+        return rejected, undelivered
+
+    def send_batch(self, transactions: List[Dict]) -> List[Dict]:
+        """Send transactions, returning the ones the hub did not accept"""
+        rejected, undelivered = self.deliver(transactions)
+        failed = {id(t) for t in rejected + undelivered}
+        return [t for t in transactions if id(t) in failed]
+
+    def deliver(self, transactions: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """Send transactions and return (rejected, undelivered)
+
+        Rejected ones got a verdict from the hub - a 4xx, or a per-item
+        failure the hub marks as not retryable (invalid data) - and will not
+        go through as they are. Undelivered ones hit a transport error, a
+        5xx or a failure storing them on the hub, or were never confirmed,
+        and are worth sending again.
+        """
+        if not transactions:
+            return [], []
+        if not self.batch_mode or len(transactions) == 1:
+            return self._deliver_singles(transactions)
+
+        try:
+            response = self._post('/api/transactions/batch', {'transactions': transactions})
+        except Exception as e:
+            logger.error(f"Batch upload failed, falling back to single posts: {e}")
+            return self._deliver_singles(transactions)
+
+        if response.status_code in (404, 405, 501):
+            logger.warning("Hub has no batch route; switching to single posts")
+            self.batch_mode = False
+            return self._deliver_singles(transactions)
+
+        if response.status_code not in (200, 207):
+            logger.error(f"Batch API error: {response.status_code}; falling back to single posts")
+            return self._deliver_singles(transactions)
+
+        # Only what the hub confirmed item by item counts as delivered; a body
+        # that is not the hub's answer (a captive portal or proxy page) or
+        # leaves transactions out says nothing about them
+        body = _json_body(response)
+        results = body.get('results') if body is not None else None
+        if not isinstance(results, list):
+            logger.error(f"Batch response {response.status_code} has no per-item results; will retry")
+            return [], list(transactions)
+        # A per-item failure is a rejection only when the hub says retrying
+        # cannot help; store errors during a hub database outage are not
+        outcomes = {}
+        for r in results:
+            if isinstance(r, dict):
+                outcomes[r.get('transactionId')] = True if r.get('success') is True else (
+                    False if r.get('retryable') is False else None)
+        rejected = [t for t in transactions if outcomes.get(t['transactionId']) is False]
+        undelivered = [t for t in transactions if outcomes.get(t['transactionId']) is None]
+
+        logger.info(f"Batch of {len(transactions)} sent, {len(rejected)} rejected, "
+                    f"{len(undelivered)} unconfirmed")
+        return rejected, undelivered
+
+    def get_json(self, path: str, params: Optional[Dict] = None) -> Optional[Dict]:
+        """GET a JSON document from the hub over the pooled session"""
+        response = self.session.get(f"{self.api_endpoint}{path}", params=params, timeout=self.timeout)
+        if response.status_code != 200:
+            logger.warning(f"GET {path} returned {response.status_code}")
+            return None
+        return response.json()